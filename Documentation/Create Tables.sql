@@ -21,6 +21,67 @@ CREATE TABLE hired_employees (
     FOREIGN KEY (job_id) REFERENCES jobs(id)
 );
 
+-- Agregado de contrataciones por departamento, trabajo, año y trimestre.
+-- Se actualiza en cada lote de carga; para backfill: flask --app main rebuild-hiring-stats
+CREATE TABLE hiring_stats (
+    department_id INT NOT NULL,
+    job_id INT NOT NULL,
+    year INT NOT NULL,
+    quarter INT NOT NULL,
+    hires INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (year, department_id, job_id, quarter),
+    FOREIGN KEY (department_id) REFERENCES departments(id),
+    FOREIGN KEY (job_id) REFERENCES jobs(id)
+);
+
+-- Avance confirmado por archivo y versión (ETag) de blob, para reanudar /upload-files
+CREATE TABLE ingestion_checkpoints (
+    blob_name VARCHAR(255) NOT NULL,
+    etag VARCHAR(100) NOT NULL,
+    rows_done INT NOT NULL DEFAULT 0,
+    total_rows INT NULL,
+    completed BIT NOT NULL DEFAULT 0,
+    updated_at DATETIME2 NOT NULL,
+    PRIMARY KEY (blob_name, etag)
+);
+
+-- Trabajos de /upload-files y su progreso
+CREATE TABLE ingestion_jobs (
+    id VARCHAR(36) PRIMARY KEY,
+    status VARCHAR(20) NOT NULL,
+    stage VARCHAR(50) NULL,
+    total_rows INT NULL,
+    rows_done INT NOT NULL DEFAULT 0,
+    resumed_rows INT NOT NULL DEFAULT 0,
+    summary NVARCHAR(MAX) NULL,
+    error NVARCHAR(MAX) NULL,
+    created_at DATETIME2 NOT NULL,
+    started_at DATETIME2 NULL,
+    updated_at DATETIME2 NOT NULL,
+    finished_at DATETIME2 NULL
+);
+
+-- Última versión sincronizada de cada blob y hash de cada ventana, para la carga delta
+CREATE TABLE blob_sync_state (
+    blob_name VARCHAR(255) PRIMARY KEY,
+    etag VARCHAR(100) NOT NULL,
+    byte_length BIGINT NOT NULL,
+    window_size INT NOT NULL,
+    updated_at DATETIME2 NOT NULL
+);
+
+CREATE TABLE blob_sync_windows (
+    blob_name VARCHAR(255) NOT NULL,
+    window_number INT NOT NULL,
+    byte_offset BIGINT NOT NULL,
+    byte_length INT NOT NULL,
+    row_count INT NOT NULL,
+    content_hash CHAR(40) NOT NULL,
+    has_errors BIT NOT NULL DEFAULT 0,
+    dimensions_fingerprint CHAR(16) NULL,
+    PRIMARY KEY (blob_name, window_number)
+);
+
 -----------------------------
 SELECT COUNT(1) FROM departments;
 SELECT COUNT(1) FROM jobs;
@@ -0,0 +1,15 @@
+import click
+from flask.cli import with_appcontext
+from infra.db.connection import SessionLocal
+from infra.db.hiring_stats import rebuild_hiring_stats
+from core.report_cache import report_cache
+
+
+@click.command("rebuild-hiring-stats")
+@with_appcontext
+def rebuild_hiring_stats_command():
+    """Recalcula la tabla hiring_stats desde hired_employees."""
+    with SessionLocal() as session:
+        rows = rebuild_hiring_stats(session)
+    report_cache.bump_version()
+    click.echo(f"hiring_stats rebuilt: {rows} rows")
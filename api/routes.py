@@ -1,15 +1,73 @@
 import os
+import time
 import redis
-from core.services import DataIngestionService
-from sqlalchemy import text
 from infra.db.connection import SessionLocal
-from flask import Blueprint, request, jsonify
-from core.tasks import load_employees_task
-from celery.result import AsyncResult
-from celery_worker import celery_app
+from datetime import date, datetime, timezone
+from functools import partial
+from flask import Blueprint, Response, g, request, jsonify, make_response, stream_with_context
+from api.streaming import INPUT_FORMATS, BatchTooLarge, negotiate_format, read_rows, serialize_rows
+from config import EXPORT_CHUNK_ROWS, INGEST_BATCH_MAX_ROWS, REPORT_CACHE_MAX_ROWS, REPORT_ENGINE, REPORT_ENGINES, REPORT_YIELD_PER
+from core.analytics import report_engine
+from core.report_cache import report_cache
+from core.dimension_cache import dimension_cache
+from core.export import EXPORT_FORMATS, ExportFilters, export_chunks, gzip_chunks
+from core.reports import (ReportFilters, hired_by_quarter_statement, hiring_above_average_statement,
+                          name_departments, name_hired_by_quarter, name_quarter_rows)
+from infra.broker.task_registry import format_cursor, get_task_registry, parse_cursor
+from infra.metrics import HTTP_REQUEST_SECONDS, render_metrics
+from infra.profiling import should_profile, start_profile, stop_profile
 
 router = Blueprint("routes", __name__)
-service = DataIngestionService()
+_service = None
+_service_pid = None
+
+def get_service():
+    # Se crea en el primer request que la usa, una vez por proceso: importar las
+    # rutas no carga pandas ni el SDK de Azure, y un worker hijo no hereda la del padre
+    global _service, _service_pid
+    if _service is None or _service_pid != os.getpid():
+        from core.services import DataIngestionService
+        _service, _service_pid = DataIngestionService(), os.getpid()
+    return _service
+
+@router.before_request
+def start_timer():
+    g.request_started = time.perf_counter()
+
+@router.before_request
+def begin_profile():
+    requested = request.headers.get("X-Profile") == "1" or request.args.get("profile") == "1"
+    if request.endpoint != "routes.metrics" and should_profile(requested):
+        g.profile = start_profile(request.endpoint or "unmatched")
+        g.profile_requested = requested
+
+@router.after_request
+def observe_latency(response):
+    # En los reportes en streaming mide hasta que se entrega la respuesta, no el último byte
+    started = g.pop("request_started", None)
+    if started is not None and request.endpoint != "routes.metrics":
+        endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+        HTTP_REQUEST_SECONDS.labels(endpoint, request.method, response.status_code).observe(time.perf_counter() - started)
+    return response
+
+@router.after_request
+def end_profile(response):
+    # Como la latencia, en las respuestas en streaming cubre hasta entregar la respuesta
+    run = g.pop("profile", None)
+    if run is not None:
+        stop_profile(run)
+        if g.pop("profile_requested", False):
+            response.headers["X-Profile"] = run.header()
+        else:
+            print(f"Sampled profile {run.name}: {run.header()}")
+    return response
+
+@router.teardown_request
+def discard_profile(exc):
+    # Si el request terminó en una excepción no pasó por after_request: el perfil no debe seguir activo
+    run = g.pop("profile", None)
+    if run is not None:
+        stop_profile(run)
 
 @router.route("/")
 def root():
@@ -35,67 +93,75 @@ def health():
     except redis.ConnectionError:
         return {"status": "error", "redis": "unreachable"}, 500
 
+@router.route("/metrics")
+def metrics():
+    body, content_type = render_metrics()
+    return Response(body, content_type=content_type)
+
 @router.route("/upload-files", methods=["POST"])
 def upload_files():
-    employees_result = []
+    from core.tasks import upload_files_task
+    from core.upload_job import create_upload_job, fail_upload_job
+    # Sin batch_size el tamaño del lote sale del presupuesto de memoria del worker
+    batch_size = request.args.get("batch_size", type=int)
+    restart = request.args.get("restart", "false").lower() == "true"
+    delta = request.args.get("mode", "full") == "delta"
 
+    service = get_service()
+    job_id = create_upload_job(service, restart=restart)
     try:
-        departments_result = service.load_departments()
+        # El id de la tarea es el del trabajo: /task-list y /upload-files/<id> hablan de lo mismo
+        upload_files_task.apply_async(kwargs={"job_id": job_id, "batch_size": batch_size, "delta": delta}, task_id=job_id)
     except Exception as e:
-        departments_result = {"error": str(e)}
+        fail_upload_job(service, job_id, str(e))
+        return jsonify({"job_id": job_id, "error": str(e)}), 500
 
-    try:
-        jobs_result = service.load_jobs()
-    except Exception as e:
-        jobs_result = {"error": str(e)}
+    response = jsonify({"job_id": job_id, "status": "accepted"})
+    response.headers["Location"] = f"/upload-files/{job_id}"
+    return response, 202
 
-    try:
-        start = 0
-        limit = 1000
-        while True:
-            summary = service.load_employees(start=start, limit=limit, skip_existing=True)
-            employees_result.append(summary)
-            if summary["processed"] < limit:
-                break
-            start += limit
-    except Exception as e:
-        employees_result.append({"error": str(e)})
-
-    return jsonify({
-        "departments": departments_result,
-        "jobs": jobs_result,
-        "hired_employees": employees_result
-    })
+@router.route("/upload-files/<job_id>", methods=["GET"])
+def upload_files_status(job_id):
+    from core.upload_job import get_upload_job
+    progress = get_upload_job(get_service(), job_id)
+    if progress is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(progress)
 
 @router.route("/upload-hired-employees", methods=["POST"])
 def upload_employees():
+    from core.tasks import load_employees_task
     start = int(request.args.get("start", 0))
     limit = int(request.args.get("limit", 1000))
     task = load_employees_task.delay(start=start, limit=limit)
     return jsonify({"task_id": task.id, "status": "accepted"}), 202
 
+@router.route("/upload-hired-employees/all", methods=["POST"])
+def upload_all_employees():
+    from core.tasks import ingest_employees_task
+    window_size = int(request.args.get("window_size", 1000))
+    task = ingest_employees_task.delay(window_size=window_size)
+    return jsonify({"task_id": task.id, "status": "accepted"}), 202
+
 @router.route("/task-list")
 def task_list():
-    redis_url = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
-    r = redis.from_url(redis_url, decode_responses=True)
-
-    task_keys = sorted(r.keys("celery-task-meta-*"), reverse=True)[:20]
-    tasks = []
-    for key in task_keys:
-        task_id = key.replace("celery-task-meta-", "")
-        result = AsyncResult(task_id, app=celery_app)
-        if result.status in ("SUCCESS", "FAILURE"):
-            tasks.append({
-                "id": task_id,
-                "status": result.status,
-                "result": result.result if result.ready() else None
-            })
-    return jsonify(tasks)
+    status = request.args.get("status", "done")
+    limit = min(int(request.args.get("limit", 20)), 200)
+    try:
+        cursor = parse_cursor(request.args.get("cursor"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    tasks, next_cursor = get_task_registry().list(status=None if status == "all" else status, cursor=cursor, limit=limit)
+    response = jsonify(tasks)
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = format_cursor(next_cursor)
+    return response
 
 @router.route("/departments", methods=["POST"])
 def insert_departments():
     try:
-        summary = service.load_departments()
+        summary = get_service().load_departments()
         return jsonify(summary), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -103,74 +169,206 @@ def insert_departments():
 @router.route("/jobs", methods=["POST"])
 def insert_jobs():
     try:
-        summary = service.load_jobs()
+        summary = get_service().load_jobs()
         return jsonify(summary), 200
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
-@router.route("/report/hired-by-quarter", methods=["GET"])
-def hired_by_quarter():
+@router.route("/ingest/<table>", methods=["POST"])
+def ingest_batch(table):
+    from core.services import CSV_COLUMNS
+    # Para productores que ya tienen las filas: sin pasar por el blob ni por Celery
+    if f"{table}.csv" not in CSV_COLUMNS:
+        return jsonify({"error": f"Unknown table: {table}"}), 404
+    if request.mimetype not in INPUT_FORMATS:
+        return jsonify({"error": f"Unsupported content type, expected one of {', '.join(INPUT_FORMATS)}"}), 415
+
+    try:
+        skip_existing = request.args.get("skip_existing", "true").lower() == "true"
+        batch = read_rows(request.stream, request.mimetype, CSV_COLUMNS[f"{table}.csv"], INGEST_BATCH_MAX_ROWS)
+        return jsonify(get_service().load_batch(table, batch, skip_existing)), 200
+    except BatchTooLarge as e:
+        return jsonify({"error": str(e)}), 413
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+def parse_arg(name: str, cast, default=None):
+    value = request.args.get(name)
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError:
+        raise ValueError(f"Invalid value for '{name}': {value}")
+
+def parse_report_filters() -> ReportFilters:
+    limit = parse_arg("limit", int)
+    if limit is not None and limit <= 0:
+        raise ValueError("'limit' must be positive")
+    return ReportFilters(
+        year=parse_arg("year", int, 2021),
+        start_date=parse_arg("start_date", date.fromisoformat),
+        end_date=parse_arg("end_date", date.fromisoformat),
+        department_id=parse_arg("department_id", int),
+        job_id=parse_arg("job_id", int),
+        limit=limit,
+    )
+
+def run_report(statement):
+    # Cursor del lado del servidor: las filas se leen de a REPORT_YIELD_PER mientras se envían
     session = SessionLocal()
+    try:
+        result = session.execute(statement.execution_options(stream_results=True, yield_per=REPORT_YIELD_PER))
+    except Exception:
+        session.close()
+        raise
+
+    def rows():
+        try:
+            for row in result:
+                yield dict(row._mapping)
+        finally:
+            session.close()
+    return rows()
+
+def cache_while_streaming(rows, name: str, params: dict, version: int):
+    buffered = []
+    for row in rows:
+        if buffered is not None:
+            buffered.append(row)
+            if len(buffered) > REPORT_CACHE_MAX_ROWS:
+                buffered = None
+        yield row
+    if buffered is not None:
+        report_cache.set(name, params, version, buffered)
+
+def parse_report_engine() -> str:
+    engine = request.args.get("engine") or REPORT_ENGINE
+    if engine not in REPORT_ENGINES:
+        raise ValueError(f"Invalid value for 'engine': {engine} (expected one of {', '.join(REPORT_ENGINES)})")
+    return engine
+
+def cached_report(name: str, params: dict, fetch_rows, name_rows):
+    # La versión de datos cambia solo cuando una carga confirma filas: mientras no
+    # cambie, el dashboard recibe 304 o el resultado cacheado sin volver a ejecutar SQL
+    mimetype = negotiate_format(request)
+    version, updated_at = report_cache.version()
+    etag = report_cache.etag(name, {**params, "format": mimetype}, version)
+    last_modified = datetime.fromtimestamp(updated_at, tz=timezone.utc) if updated_at else None
+
+    if request.if_none_match.contains(etag):
+        response = make_response("", 304)
+    else:
+        rows = report_cache.get(name, params, version)
+        if rows is None:
+            # Los nombres salen del cache de dimensiones en lugar de unir departments y jobs
+            rows = cache_while_streaming(name_rows(fetch_rows(), dimension_cache.get()), name, params, version)
+        response = Response(stream_with_context(serialize_rows(rows, mimetype)), mimetype=mimetype)
+
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = "no-cache"
+    return response.make_conditional(request)
 
+@router.route("/report/hired-by-quarter", methods=["GET"])
+def hired_by_quarter():
     try:
-        result = session.execute(text("""
-            SELECT 
-                d.department,
-                j.job,
-                SUM(CASE WHEN MONTH(h.datetime) BETWEEN 1 AND 3 THEN 1 ELSE 0 END) AS Q1,
-                SUM(CASE WHEN MONTH(h.datetime) BETWEEN 4 AND 6 THEN 1 ELSE 0 END) AS Q2,
-                SUM(CASE WHEN MONTH(h.datetime) BETWEEN 7 AND 9 THEN 1 ELSE 0 END) AS Q3,
-                SUM(CASE WHEN MONTH(h.datetime) BETWEEN 10 AND 12 THEN 1 ELSE 0 END) AS Q4
-            FROM hired_employees h
-            JOIN departments d ON h.department_id = d.id
-            JOIN jobs j ON h.job_id = j.id
-            WHERE YEAR(h.datetime) = 2021
-            GROUP BY d.department, j.job
-            ORDER BY d.department ASC, j.job ASC;
-        """))
-
-        data = [dict(row._mapping) for row in result]
-        return jsonify(data)
+        filters = parse_report_filters()
+        after_department = request.args.get("after_department")
+        after_job = request.args.get("after_job")
+        # El cursor es el par (department, job) de la última fila: sin el job se repetiría ese departamento
+        if (after_department is None) != (after_job is None):
+            raise ValueError("'after_department' and 'after_job' must be given together")
+        engine = parse_report_engine()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
+        params = {**filters.as_params(), "after_department": after_department, "after_job": after_job, "engine": engine}
+        if engine == "memory":
+            return cached_report("hired-by-quarter", params, partial(report_engine.hired_by_quarter, filters),
+                                 lambda rows, dimensions: name_hired_by_quarter(
+                                     rows, dimensions, filters, after_department, after_job))
+        # El orden por nombre se traduce a posiciones con el cache de dimensiones al ejecutar la consulta
+        fetch_rows = lambda: run_report(hired_by_quarter_statement(
+            filters, dimension_cache.get(), after_department, after_job))
+        return cached_report("hired-by-quarter", params, fetch_rows, name_quarter_rows)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
-        session.close()
 
 @router.route("/report/hiring-above-average", methods=["GET"])
 def hiring_above_average():
-    session = SessionLocal()
-
     try:
-        result = session.execute(text("""
-            SELECT 
-                d.id,
-                d.department,
-                COUNT(h.id) AS hired
-            FROM 
-                hired_employees h
-            JOIN 
-                departments d ON h.department_id = d.id
-            WHERE 
-                YEAR(h.datetime) = 2021
-            GROUP BY 
-                d.id, d.department
-            HAVING 
-                COUNT(h.id) > (
-                    SELECT AVG(hired_count)
-                    FROM (
-                        SELECT COUNT(h.id) AS hired_count
-                        FROM hired_employees h
-                        WHERE YEAR(h.datetime) = 2021
-                        GROUP BY h.department_id
-                    ) AS dept_avg
-                )
-            ORDER BY hired DESC;
-        """))
-        data = [dict(row._mapping) for row in result]
-        return jsonify(data)
+        filters = parse_report_filters()
+        after_hired = parse_arg("after_hired", int)
+        after_id = parse_arg("after_id", int)
+        engine = parse_report_engine()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
 
+    try:
+        params = {**filters.as_params(), "after_hired": after_hired, "after_id": after_id, "engine": engine}
+        if engine == "memory":
+            fetch_rows = partial(report_engine.hiring_above_average, filters, after_hired, after_id)
+        else:
+            fetch_rows = partial(run_report, hiring_above_average_statement(filters, after_hired, after_id))
+        return cached_report("hiring-above-average", params, fetch_rows, name_departments)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
-    finally:
+
+def parse_export_request():
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Invalid value for 'format': {fmt} (expected one of {', '.join(EXPORT_FORMATS)})")
+    return fmt, ExportFilters(
+        start_date=parse_arg("start_date", date.fromisoformat),
+        end_date=parse_arg("end_date", date.fromisoformat),
+        department_id=parse_arg("department_id", int),
+        job_id=parse_arg("job_id", int),
+        names=request.args.get("names", "false").lower() == "true",
+    )
+
+@router.route("/export/hired-employees", methods=["GET"])
+def export_hired_employees():
+    try:
+        fmt, filters = parse_export_request()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    session = SessionLocal()
+    try:
+        dimensions = dimension_cache.get() if filters.names else None
+        body = gzip_chunks(export_chunks(session, filters, fmt, EXPORT_CHUNK_ROWS, dimensions))
+        # El primer chunk se arma antes de responder: un error de la base todavía puede ser un 500
+        first = next(body)
+    except Exception as e:
         session.close()
+        return jsonify({"error": str(e)}), 500
+
+    def stream():
+        try:
+            yield first
+            yield from body
+        finally:
+            session.close()
+
+    response = Response(stream_with_context(stream()), mimetype="application/gzip")
+    response.headers["Content-Disposition"] = f"attachment; filename=hired_employees.{fmt}.gz"
+    return response
+
+@router.route("/export/hired-employees", methods=["POST"])
+def export_hired_employees_to_blob():
+    from core.tasks import export_hired_employees_task
+    try:
+        fmt, filters = parse_export_request()
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    task = export_hired_employees_task.delay(
+        fmt=fmt, start_date=filters.start_date and filters.start_date.isoformat(),
+        end_date=filters.end_date and filters.end_date.isoformat(), department_id=filters.department_id,
+        job_id=filters.job_id, names=filters.names)
+    return jsonify({"task_id": task.id, "status": "accepted", "blob": f"exports/{task.id}/hired_employees.{fmt}.gz"}), 202
@@ -0,0 +1,85 @@
+import csv
+import io
+import json
+
+JSON = "application/json"
+NDJSON = "application/x-ndjson"
+CSV = "text/csv"
+# Formatos aceptados en el cuerpo de una ingesta
+INPUT_FORMATS = {CSV: CSV, NDJSON: NDJSON, "application/ndjson": NDJSON, "application/jsonl": NDJSON}
+
+
+class BatchTooLarge(ValueError):
+    pass
+
+
+def negotiate_format(request) -> str:
+    if not request.accept_mimetypes:
+        return JSON
+    return request.accept_mimetypes.best_match([JSON, NDJSON, CSV], default=JSON)
+
+
+def serialize_rows(rows, mimetype: str):
+    """Serializa un iterador de dicts fila a fila, sin armar la respuesta completa en memoria."""
+    if mimetype == NDJSON:
+        for row in rows:
+            yield json.dumps(row, default=str) + "\n"
+    elif mimetype == CSV:
+        buffer = io.StringIO()
+        writer = None
+        for row in rows:
+            if writer is None:
+                writer = csv.DictWriter(buffer, fieldnames=list(row.keys()))
+                writer.writeheader()
+            writer.writerow(row)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    else:
+        yield "["
+        first = True
+        for row in rows:
+            yield ("" if first else ",") + json.dumps(row, default=str)
+            first = False
+        yield "]\n"
+
+
+def read_rows(stream, mimetype: str, columns: list, max_rows: int):
+    """Parsea un cuerpo CSV (sin header, como los archivos del blob) o NDJSON a medida que llega.
+
+    Se leen a lo sumo ``max_rows + 1`` filas: un lote demasiado grande se
+    rechaza sin leer (ni guardar en memoria) el resto del cuerpo.
+    """
+    import pandas as pd  # Solo la ingesta lo necesita: los reportes no cargan pandas
+
+    if INPUT_FORMATS.get(mimetype) == CSV:
+        try:
+            # index_col=False: una fila con columnas de más no corre las demás al índice
+            df = pd.read_csv(stream, header=None, names=columns, index_col=False, nrows=max_rows + 1)
+        except pd.errors.EmptyDataError:
+            df = pd.DataFrame(columns=columns)
+        except pd.errors.ParserError as e:
+            raise ValueError(f"Invalid CSV body: {e}")
+    elif INPUT_FORMATS.get(mimetype) == NDJSON:
+        records = []
+        for number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                raise ValueError(f"Invalid JSON on line {number}")
+            if not isinstance(record, dict):
+                raise ValueError(f"Line {number} is not a JSON object")
+            records.append(record)
+            if len(records) > max_rows:
+                break
+        df = pd.DataFrame.from_records(records, columns=columns)
+    else:
+        raise ValueError(f"Unsupported content type: {mimetype or 'none'}")
+
+    if len(df) > max_rows:
+        raise BatchTooLarge(f"A batch can have at most {max_rows} rows")
+    if df.empty:
+        raise ValueError("The batch has no rows")
+    return df
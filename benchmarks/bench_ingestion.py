@@ -0,0 +1,190 @@
+"""Benchmark de punta a punta sobre datos sintéticos: carga de dimensiones, de
+empleados por ventanas y los dos endpoints de reportes, contra SQLite en archivo.
+
+Uso: python -m benchmarks.bench_ingestion --employees 1000000 --missing-ratio 0.01 \
+         --invalid-fk-ratio 0.01 --duplicate-ratio 0.005 --output bench.json
+     python -m benchmarks.bench_ingestion --employees 1000000 --baseline bench.json
+
+Cada etapa reporta segundos, filas/seg y el pico de RSS del proceso hasta ese
+momento; load_employees además se desglosa con los histogramas de infra.metrics.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import date
+
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import api.routes as routes
+import infra.db.connection as connection
+from benchmarks.synthetic import InMemoryBlobClient, SyntheticSpec, generate_files
+from core.analytics import report_engine
+from core.report_cache import report_cache
+from core.reports import ReportFilters
+from core.services import DataIngestionService
+from infra.db.bulk_loader import get_bulk_loader
+from infra.db.models import Base
+from infra.storage.row_index import RowIndexStore
+from main import create_app
+
+EMPLOYEE_STAGES = {
+    "download": ("ingestion_blob_download_seconds_sum", {"blob": "hired_employees.csv"}),
+    "parse": ("ingestion_csv_parse_seconds_sum", {"blob": "hired_employees.csv"}),
+    "validation": ("ingestion_validation_seconds_sum", {"table": "hired_employees"}),
+    "db_insert": ("ingestion_db_insert_seconds_sum", {"table": "hired_employees"}),
+}
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def stage_seconds() -> dict:
+    return {stage: REGISTRY.get_sample_value(name, labels) or 0.0 for stage, (name, labels) in EMPLOYEE_STAGES.items()}
+
+
+def measure(name: str, rows, action):
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    rows = result if rows is None else rows  # los reportes devuelven cuántas filas enviaron
+    rate = rows / elapsed if elapsed else 0
+    print(f"{name:<36} {elapsed:9.3f}s {rate:>12,.0f} rows/sec  peak RSS {peak_rss_mb():,.0f} MB")
+    return {"seconds": round(elapsed, 4), "rows": rows, "rows_per_sec": round(rate, 1),
+            "peak_rss_mb": round(peak_rss_mb(), 1)}, result
+
+
+def load_employees_in_windows(service: DataIngestionService, total_rows: int, window: int) -> dict:
+    summary = {"processed": 0, "inserted": 0, "already_exists": 0, "errors": 0}
+    for start in range(0, total_rows, window):
+        result = service.load_employees(start=start, limit=window, skip_existing=True)
+        for key in summary:
+            summary[key] += result[key]
+    return summary
+
+
+def fetch_report(client, path: str) -> int:
+    report_cache.clear_local()
+    response = client.get(path, headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return response.get_data().count(b"\n")
+
+
+def engine_latency_ms(repeat: int = 200) -> dict:
+    # Solo el cálculo del motor en memoria, sin HTTP ni serialización
+    latencies = {}
+    for name, compute in (("hired-by-quarter", lambda: report_engine.hired_by_quarter(ReportFilters(year=2021))),
+                          ("hiring-above-average", lambda: report_engine.hiring_above_average(ReportFilters(year=2021))),
+                          ("hired-by-quarter range", lambda: report_engine.hired_by_quarter(
+                              ReportFilters(start_date=date(2021, 3, 1), end_date=date(2021, 9, 1))))):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            compute()
+        latencies[name] = round((time.perf_counter() - started) / repeat * 1000, 3)
+        print(f"engine {name:<29} {latencies[name]:9.3f} ms per call")
+    return latencies
+
+
+def run(spec: SyntheticSpec, window: int, workdir: str) -> dict:
+    print(f"Generating {spec.employees:,} employees...")
+    files = generate_files(spec)
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'bench.db')}")
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(bind=engine)
+    # get_engine() y LazySessionMaker leen _engine: connection.engine solo lo taparía
+    connection._engine, connection._engine_pid = engine, os.getpid()
+    connection.SessionLocal = session_factory
+
+    service = DataIngestionService(blob_client=InMemoryBlobClient(files), loader=get_bulk_loader(session_factory))
+    service.row_index = RowIndexStore(os.path.join(workdir, "row-index"))
+
+    results = {}
+    results["load_departments"], _ = measure("load_departments", spec.departments, service.load_departments)
+    results["load_jobs"], _ = measure("load_jobs", spec.jobs, service.load_jobs)
+
+    before = stage_seconds()
+    results["load_employees"], summary = measure(
+        "load_employees", spec.employees, lambda: load_employees_in_windows(service, spec.employees, window))
+    after = stage_seconds()
+    results["load_employees"]["stages"] = {stage: round(after[stage] - before[stage], 4) for stage in before}
+    results["load_employees"]["summary"] = summary
+
+    routes.SessionLocal = session_factory
+    client = create_app().test_client()
+    for name in ("hired-by-quarter", "hiring-above-average"):
+        path = f"/report/{name}?year=2021&engine=sql"
+        results[f"report_{name}"], _ = measure(f"report {name}", None, lambda: fetch_report(client, path))
+
+    results["report_snapshot"], _ = measure("report snapshot", spec.employees, lambda: report_engine.snapshot().rows)
+    for name in ("hired-by-quarter", "hiring-above-average"):
+        path = f"/report/{name}?year=2021&engine=memory"
+        results[f"report_{name}_memory"], _ = measure(f"report {name} (memory)", None, lambda: fetch_report(client, path))
+    results["engine_latency_ms"] = engine_latency_ms()
+
+    engine.dispose()
+    return results
+
+
+def git_commit() -> str:
+    try:
+        repo = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=repo,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: dict, baseline_path: str):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nvs {baseline_path} ({baseline.get('commit')}):")
+    for stage, current in results.items():
+        previous = baseline["results"].get(stage)
+        if previous and "seconds" in current and previous.get("seconds"):
+            print(f"{stage:<36} {current['seconds'] / previous['seconds']:6.2f}x time")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--employees", type=int, default=100_000)
+    parser.add_argument("--departments", type=int, default=12)
+    parser.add_argument("--jobs", type=int, default=183)
+    parser.add_argument("--missing-ratio", type=float, default=0.0)
+    parser.add_argument("--invalid-fk-ratio", type=float, default=0.0)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--window", type=int, default=50_000)
+    parser.add_argument("--output", help="Guarda los resultados en JSON")
+    parser.add_argument("--baseline", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+
+    spec = SyntheticSpec(args.employees, args.departments, args.jobs, args.missing_ratio,
+                         args.invalid_fk_ratio, args.duplicate_ratio, args.seed)
+    with tempfile.TemporaryDirectory() as workdir:
+        results = run(spec, args.window, workdir)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "spec": asdict(spec),
+        "window": args.window,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
+    if args.baseline:
+        compare(results, args.baseline)
@@ -0,0 +1,49 @@
+"""Compara filas/seg de load_employees por fila (ORM) vs bulk sobre SQLite.
+
+Uso: python -m benchmarks.bench_load_employees --rows 5000
+"""
+import argparse
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks.synthetic import InMemoryBlobClient, SyntheticSpec, generate_employees
+from core.services import DataIngestionService
+from infra.db.bulk_loader import get_bulk_loader
+from infra.db.models import Base, Department, Job
+
+
+def build_employees_csv(rows: int) -> bytes:
+    return generate_employees(SyntheticSpec(employees=rows)).to_csv(index=False, header=False).encode()
+
+
+def run(rows: int, bulk: bool) -> float:
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    loader = get_bulk_loader(sessionmaker(bind=engine))
+
+    with loader.session() as session:
+        session.add_all([Department(id=i, department=f"Dept {i}") for i in range(1, 13)])
+        session.add_all([Job(id=i, job=f"Job {i}") for i in range(1, 184)])
+        session.commit()
+
+    blob_client = InMemoryBlobClient({"hired_employees.csv": build_employees_csv(rows)})
+    service = DataIngestionService(blob_client=blob_client, loader=loader)
+
+    started = time.perf_counter()
+    summary = service.load_employees(start=0, limit=rows, skip_existing=True, bulk=bulk)
+    elapsed = time.perf_counter() - started
+    assert summary["inserted"] == rows, summary
+    return rows / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    args = parser.parse_args()
+
+    row_rate = run(args.rows, bulk=False)
+    bulk_rate = run(args.rows, bulk=True)
+    print(f"row-by-row: {row_rate:,.0f} rows/sec")
+    print(f"bulk:       {bulk_rate:,.0f} rows/sec ({bulk_rate / row_rate:.1f}x)")
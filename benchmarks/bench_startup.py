@@ -0,0 +1,108 @@
+"""Benchmark de arranque: tiempo de import de la API y del worker de Celery, y
+latencia de los primeros requests de un proceso recién iniciado.
+
+Uso: python -m benchmarks.bench_startup --repeat 5 --output startup.json
+
+Cada medición corre en un proceso nuevo, como un worker de gunicorn o un hijo
+del pool de Celery al arrancar, y se informa la mediana de ``--repeat`` corridas.
+Los requests van contra SQLite en archivo, sin credenciales de Azure.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Dependencias pesadas que un proceso no debería cargar si no las usa
+HEAVY_MODULES = ("pandas", "numpy", "azure.storage.blob", "pyodbc")
+ENTRYPOINTS = {"api": "main", "celery": "celery_worker"}
+
+
+def child_import(module: str) -> dict:
+    started = time.perf_counter()
+    __import__(module)
+    seconds = time.perf_counter() - started
+    return {"seconds": seconds, "loaded": [name for name in HEAVY_MODULES if name in sys.modules]}
+
+
+def child_requests(workdir: str) -> dict:
+    started = time.perf_counter()
+    import main
+    results = {"import": time.perf_counter() - started}
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    import api.routes as routes
+    import infra.db.connection as connection
+    from infra.db.models import Base
+
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'startup.db')}")
+    Base.metadata.create_all(engine)
+    connection._engine, connection._engine_pid = engine, os.getpid()
+    connection.SessionLocal = routes.SessionLocal = sessionmaker(bind=engine)
+
+    client = main.app.test_client()
+    requests = [
+        ("first_report", lambda: client.get("/report/hiring-above-average?engine=sql")),
+        ("second_report", lambda: client.get("/report/hiring-above-average?engine=sql&year=2022")),
+        ("first_ingest", lambda: client.post("/ingest/departments", data="1,HR\n", content_type="text/csv")),
+        ("second_ingest", lambda: client.post("/ingest/jobs", data="1,Manager\n", content_type="text/csv")),
+    ]
+    for name, send in requests:
+        started = time.perf_counter()
+        response = send()
+        response.get_data()
+        results[name] = time.perf_counter() - started
+        if response.status_code != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status_code} {response.get_data(as_text=True)}")
+    engine.dispose()
+    return results
+
+
+def run_child(*args) -> dict:
+    output = subprocess.run([sys.executable, "-m", "benchmarks.bench_startup", "--child", *args],
+                            capture_output=True, text=True, check=True).stdout
+    # Los módulos imprimen logs al cargar: el resultado es la última línea
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(repeat: int) -> dict:
+    results = {}
+    for name, module in ENTRYPOINTS.items():
+        runs = [run_child("import", module) for _ in range(repeat)]
+        results[f"import_{name}"] = {"ms": round(1000 * statistics.median(r["seconds"] for r in runs), 1),
+                                     "loaded": runs[0]["loaded"]}
+        print(f"import {module:<18} {results[f'import_{name}']['ms']:9.1f} ms  loads: {', '.join(runs[0]['loaded']) or '-'}")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        runs = [run_child("requests", workdir) for _ in range(repeat)]
+    for stage in runs[0]:
+        results[stage] = {"ms": round(1000 * statistics.median(r[stage] for r in runs), 1)}
+        print(f"{stage:<25} {results[stage]['ms']:9.1f} ms")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Guarda los resultados en JSON")
+    parser.add_argument("--child", nargs=2, metavar=("MODE", "ARG"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, arg = args.child
+        print(json.dumps(child_import(arg) if mode == "import" else child_requests(arg)))
+        sys.exit(0)
+
+    # Se importa recién acá: bench_ingestion carga la aplicación y falsearía las mediciones de los hijos
+    from benchmarks.bench_ingestion import git_commit
+    report = {"commit": git_commit(), "python": platform.python_version(), "repeat": args.repeat,
+              "results": run(args.repeat)}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results saved to {args.output}")
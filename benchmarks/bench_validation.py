@@ -0,0 +1,56 @@
+"""Compara la validación fila a fila (_build_employee) con validate_employees.
+
+Uso: python -m benchmarks.bench_validation --rows 1000000 --sample 50000
+La ruta fila a fila se mide sobre --sample filas y se extrapola.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from core.services import DataIngestionService
+from core.validation import validate_employees
+
+
+def build_frame(rows: int, dirty_ratio: float = 0.02, seed: int = 42) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "id": np.arange(1, rows + 1),
+        "name": np.char.add("Employee ", np.arange(rows).astype(str)).astype(object),
+        "datetime": pd.Series(pd.date_range("2021-01-01", periods=rows, freq="s").strftime("%Y-%m-%dT%H:%M:%SZ")),
+        "department_id": rng.integers(1, 14, rows).astype(float),
+        "job_id": rng.integers(1, 184, rows).astype(float),
+    })
+    dirty = rng.random(rows) < dirty_ratio
+    df.loc[dirty, "job_id"] = np.nan
+    return df
+
+
+def time_row_path(df, dept_ids, job_ids) -> float:
+    started = time.perf_counter()
+    for _, row in df.iterrows():
+        DataIngestionService._build_employee(row, dept_ids, job_ids, False, None)
+    return time.perf_counter() - started
+
+
+def time_vectorized(df, dept_ids, job_ids) -> float:
+    started = time.perf_counter()
+    validate_employees(df, dept_ids, job_ids, skip_existing=False)
+    return time.perf_counter() - started
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--sample", type=int, default=50_000)
+    args = parser.parse_args()
+
+    dept_ids, job_ids = set(range(1, 13)), set(range(1, 184))
+    df = build_frame(args.rows)
+
+    sample = min(args.sample, args.rows)
+    row_seconds = time_row_path(df.head(sample), dept_ids, job_ids) * args.rows / sample
+    vector_seconds = time_vectorized(df, dept_ids, job_ids)
+    print(f"row-by-row (extrapolated): {row_seconds:.2f}s")
+    print(f"vectorized:                {vector_seconds:.2f}s ({row_seconds / vector_seconds:.0f}x)")
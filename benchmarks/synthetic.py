@@ -0,0 +1,89 @@
+"""Datos sintéticos deterministas para los benchmarks.
+
+La misma semilla y los mismos parámetros producen siempre los mismos bytes, así
+los resultados de dos commits se comparan sobre el mismo archivo.
+"""
+import hashlib
+import io
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from tests.mocks.blob_client import MockAzureBlobClient
+
+
+@dataclass
+class SyntheticSpec:
+    employees: int = 100_000
+    departments: int = 12
+    jobs: int = 183
+    missing_ratio: float = 0.0
+    invalid_fk_ratio: float = 0.0
+    duplicate_ratio: float = 0.0
+    seed: int = 42
+
+
+def generate_dimension(rows: int, label: str) -> pd.DataFrame:
+    return pd.DataFrame({"id": np.arange(1, rows + 1), label.lower(): [f"{label} {i}" for i in range(1, rows + 1)]})
+
+
+def generate_employees(spec: SyntheticSpec) -> pd.DataFrame:
+    rng = np.random.default_rng(spec.seed)
+    n = spec.employees
+    ids = np.arange(1, n + 1)
+
+    seconds = rng.integers(0, 365 * 24 * 3600, n).astype("timedelta64[s]")
+    df = pd.DataFrame({
+        "id": ids,
+        "name": np.char.add("Employee ", ids.astype(str)).astype(object),
+        "datetime": np.char.add(np.datetime_as_string(np.datetime64("2021-01-01T00:00:00") + seconds, unit="s"), "Z").astype(object),
+        "department_id": pd.array(rng.integers(1, spec.departments + 1, n), dtype="Int64"),
+        "job_id": pd.array(rng.integers(1, spec.jobs + 1, n), dtype="Int64"),
+    })
+
+    # Cada tipo de fila sucia usa su propio sorteo: las proporciones son independientes
+    invalid = rng.random(n) < spec.invalid_fk_ratio
+    df.loc[invalid, "department_id"] = spec.departments + 1 + rng.integers(0, 100, int(invalid.sum()))
+
+    missing = np.flatnonzero(rng.random(n) < spec.missing_ratio)
+    columns = rng.integers(0, 4, len(missing))
+    for position, column in enumerate(["name", "datetime", "department_id", "job_id"]):
+        df.loc[missing[columns == position], column] = None
+
+    duplicated = np.flatnonzero((rng.random(n) < spec.duplicate_ratio) & (ids > 1))
+    df.loc[duplicated, "id"] = (rng.random(len(duplicated)) * duplicated).astype(int) + 1
+    return df
+
+
+def generate_files(spec: SyntheticSpec) -> dict:
+    return {
+        "departments.csv": generate_dimension(spec.departments, "Department").to_csv(index=False, header=False).encode(),
+        "jobs.csv": generate_dimension(spec.jobs, "Job").to_csv(index=False, header=False).encode(),
+        "hired_employees.csv": generate_employees(spec).to_csv(index=False, header=False).encode(),
+    }
+
+
+class InMemoryBlobClient(MockAzureBlobClient):
+    """El cliente de tests/mocks, pero sirviendo blobs desde memoria en lugar de disco."""
+
+    def __init__(self, files: dict):
+        super().__init__(base_dir=None)
+        self.files = files
+        self.etags = {name: f'"{hashlib.sha1(content).hexdigest()[:16]}"' for name, content in files.items()}
+
+    def upload_blob(self, blob_name: str, data):
+        self.files[blob_name] = data if isinstance(data, bytes) else data.read()
+
+    def download_file(self, blob_name: str) -> bytes:
+        return self.files[blob_name]
+
+    def download_stream(self, blob_name: str, chunk_size: int = 4 * 1024 * 1024):
+        return io.BytesIO(self.files[blob_name])
+
+    def download_range(self, blob_name: str, offset: int, length: int = None) -> bytes:
+        content = self.files[blob_name]
+        return content[offset:] if length is None else content[offset:offset + length]
+
+    def get_etag(self, blob_name: str) -> str:
+        return self.etags[blob_name]
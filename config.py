@@ -6,5 +6,55 @@ load_dotenv()
 AZURE_STORAGE_CONNECTION_STRING = os.getenv("AZURE_STORAGE_CONNECTION_STRING")
 AZURE_STORAGE_CONTAINER = os.getenv("AZURE_STORAGE_CONTAINER")
 AZURE_SQL_CONNECTION_STRING = os.getenv("AZURE_SQL_CONNECTION_STRING")
+# URL sqlalchemy completa (p. ej. postgresql+psycopg2://...); sin ella se usa SQL Server vía ODBC
+DATABASE_URL = os.getenv("DATABASE_URL")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 5))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
-CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
\ No newline at end of file
+CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
+BLOB_CACHE_DIR = os.getenv("BLOB_CACHE_DIR")
+BLOB_CACHE_MAX_BYTES = int(os.getenv("BLOB_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+ROW_INDEX_DIR = os.getenv("ROW_INDEX_DIR")
+ROW_INDEX_STRIDE = int(os.getenv("ROW_INDEX_STRIDE", 256))
+REPORT_CACHE_URL = os.getenv("REPORT_CACHE_URL", CELERY_BROKER_URL)
+REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", 3600))
+REPORT_CACHE_MAX_ENTRIES = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", 128))
+REPORT_CACHE_LOCAL_TTL = int(os.getenv("REPORT_CACHE_LOCAL_TTL", 60))
+REPORT_CACHE_MAX_ROWS = int(os.getenv("REPORT_CACHE_MAX_ROWS", 10000))
+DIMENSION_CACHE_URL = os.getenv("DIMENSION_CACHE_URL", REPORT_CACHE_URL)
+DIMENSION_CACHE_TTL = int(os.getenv("DIMENSION_CACHE_TTL", 24 * 3600))
+DIMENSION_CACHE_LOCAL_TTL = int(os.getenv("DIMENSION_CACHE_LOCAL_TTL", 60))
+# sql: agregación en la base; memory: snapshot de hired_employees en memoria (core/analytics.py)
+REPORT_ENGINES = ("sql", "memory")
+REPORT_ENGINE = os.getenv("REPORT_ENGINE", "sql")
+REPORT_YIELD_PER = int(os.getenv("REPORT_YIELD_PER", 500))
+# Filas por tramo al llenar el snapshot de engine=memory. Cada proceso de la API guarda
+# su propio snapshot: ~12 bytes por fila de hired_employees, y hasta ~100 mientras se
+# recarga completo (columnas leídas + ordenamiento), más un tramo como tuplas de Python
+REPORT_ENGINE_FETCH_SIZE = int(os.getenv("REPORT_ENGINE_FETCH_SIZE", 50_000))
+TASK_REGISTRY_TTL = int(os.getenv("TASK_REGISTRY_TTL", 7 * 24 * 3600))
+# Los resultados de tareas expiran en Redis; los error_ids se guardan como rangos, con tope
+TASK_RESULT_TTL = int(os.getenv("TASK_RESULT_TTL", 24 * 3600))
+TASK_RESULT_MAX_ID_RANGES = int(os.getenv("TASK_RESULT_MAX_ID_RANGES", 100))
+CELERY_WORKER_PROFILE = os.getenv("CELERY_WORKER_PROFILE")
+# Tareas que pueden usar la base a la vez entre todos los workers
+DB_MAX_CONCURRENT_TASKS = int(os.getenv("DB_MAX_CONCURRENT_TASKS", 8))
+DB_SLOT_RETRY_SECONDS = int(os.getenv("DB_SLOT_RETRY_SECONDS", 15))
+CELERY_METRICS_PORT = int(os.getenv("CELERY_METRICS_PORT", 0))
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", 500))
+BULK_MIN_BATCH_SIZE = int(os.getenv("BULK_MIN_BATCH_SIZE", 50))
+BULK_MAX_BATCH_SIZE = int(os.getenv("BULK_MAX_BATCH_SIZE", 5000))
+# Reintentos de un lote abortado por deadlock o serialización, con espera creciente
+DB_DEADLOCK_RETRIES = int(os.getenv("DB_DEADLOCK_RETRIES", 3))
+DB_DEADLOCK_BACKOFF_SECONDS = float(os.getenv("DB_DEADLOCK_BACKOFF_SECONDS", 0.1))
+INGEST_MEMORY_BUDGET_MB = int(os.getenv("INGEST_MEMORY_BUDGET_MB", 64))
+# Perfilado: a pedido (header X-Profile, ?profile=1 o el header profile de una tarea)
+# solo si se habilita, y por muestreo de una fracción de requests y tareas
+PROFILE_ON_DEMAND = os.getenv("PROFILE_ON_DEMAND", "false").lower() == "true"
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", 0))
+PROFILE_DIR = os.getenv("PROFILE_DIR")
+# Filas por chunk del export: las que trae cada viaje del cursor y cada bloque comprimido
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", 5000))
+# Filas por request en POST /ingest/<tabla>
+INGEST_BATCH_MAX_ROWS = int(os.getenv("INGEST_BATCH_MAX_ROWS", 1000))
\ No newline at end of file
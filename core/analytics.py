@@ -0,0 +1,189 @@
+import threading
+from dataclasses import dataclass, field
+from datetime import date
+
+import numpy as np
+from sqlalchemy import func, select
+
+import infra.db.connection as connection
+from config import REPORT_ENGINE_FETCH_SIZE
+from core.report_cache import report_cache
+from core.reports import ReportFilters
+from infra.db.models import HiredEmployee
+
+
+@dataclass(frozen=True)
+class HiresSnapshot:
+    """Copia columnar e inmutable de hired_employees; un refresh arma una nueva y la reemplaza.
+
+    Las filas se guardan ordenadas por fecha, así un año o un rango de fechas es
+    un tramo contiguo que se ubica con searchsorted. Cada fila guarda además su
+    celda: el índice del par (department_id, job_id) en ``pairs`` por 4 más el
+    trimestre, y un bincount sobre el tramo da la tabla completa del período.
+    """
+
+    version: int
+    max_id: int
+    hired_at: np.ndarray
+    cell: np.ndarray
+    pairs: np.ndarray
+    # Tablas por año ya calculadas para esta versión: los dashboards piden siempre los mismos
+    _by_year: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @property
+    def rows(self) -> int:
+        return len(self.hired_at)
+
+    @property
+    def department_id(self) -> np.ndarray:
+        return self.pairs >> 32
+
+    @property
+    def job_id(self) -> np.ndarray:
+        return self.pairs & 0xFFFFFFFF
+
+    @classmethod
+    def build(cls, version: int, columns) -> "HiresSnapshot":
+        ids, hired_at, keys, quarter = cls._sorted(*columns)
+        pairs, pair = np.unique(keys, return_inverse=True)
+        cell = (pair.astype("int32") * 4 + quarter)
+        return cls(version, int(ids.max()) if len(ids) else 0, hired_at, cell, pairs)
+
+    def extend(self, version: int, columns) -> "HiresSnapshot":
+        ids, hired_at, keys, quarter = self._sorted(*columns)
+        if not len(ids):
+            return HiresSnapshot(version, self.max_id, self.hired_at, self.cell, self.pairs)
+
+        pairs = np.union1d(self.pairs, keys)
+        cell = self.cell
+        if len(pairs) != len(self.pairs):
+            # Aparecieron pares nuevos: se renumeran las celdas existentes
+            remap = np.searchsorted(pairs, self.pairs).astype("int32")
+            cell = remap[cell // 4] * 4 + cell % 4
+        new_cell = np.searchsorted(pairs, keys).astype("int32") * 4 + quarter
+        positions = np.searchsorted(self.hired_at, hired_at, side="right")
+        return HiresSnapshot(version, max(self.max_id, int(ids.max())), np.insert(self.hired_at, positions, hired_at),
+                             np.insert(cell, positions, new_cell), pairs)
+
+    @staticmethod
+    def _sorted(ids, hired_at, keys):
+        order = np.argsort(hired_at, kind="stable")
+        ids, hired_at, keys = ids[order], hired_at[order], keys[order]
+        months = hired_at.astype("datetime64[M]").astype("int64")
+        quarter = (months % 12 // 3).astype("int32")
+        return ids, hired_at, keys, quarter
+
+    def counts(self, start=None, end=None) -> np.ndarray:
+        """Contrataciones con start <= fecha < end, como matriz (len(pairs), 4)."""
+        low = np.searchsorted(self.hired_at, np.datetime64(start, "us")) if start else 0
+        high = np.searchsorted(self.hired_at, np.datetime64(end, "us")) if end else self.rows
+        return np.bincount(self.cell[low:high], minlength=len(self.pairs) * 4).reshape(-1, 4)
+
+    def counts_for_year(self, year: int) -> np.ndarray:
+        counts = self._by_year.get(year)
+        if counts is None:
+            counts = self._by_year[year] = self.counts(date(year, 1, 1), date(year + 1, 1, 1))
+        return counts
+
+
+class InMemoryReportEngine:
+    """Calcula los reportes con numpy sobre un snapshot de hired_employees en memoria.
+
+    El snapshot se refresca cuando cambia la versión de datos de report_cache (la
+    suben las cargas al confirmar filas). Como hired_employees solo recibe
+    INSERTs, alcanza con traer los ids mayores al último visto; si el conteo no
+    cierra (ids cargados fuera de orden) se recarga completo.
+    """
+
+    def __init__(self, fetch_size: int = REPORT_ENGINE_FETCH_SIZE):
+        self.fetch_size = fetch_size
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, session_factory=None) -> HiresSnapshot:
+        version, _ = report_cache.version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version:
+                return snapshot
+            factory = session_factory or connection.SessionLocal
+            with factory() as session:
+                if snapshot is not None:
+                    appended = self._fetch(session, snapshot.max_id)
+                    total = session.execute(select(func.count()).select_from(HiredEmployee)).scalar()
+                    if total == snapshot.rows + len(appended[0]):
+                        self._snapshot = snapshot.extend(version, appended)
+                        return self._snapshot
+                    print(f"Report engine: {total - snapshot.rows} rows changed, reloading snapshot")
+                self._snapshot = HiresSnapshot.build(version, self._fetch(session))
+            return self._snapshot
+
+    def _fetch(self, session, after_id: int = None) -> tuple:
+        """Devuelve las columnas (ids, hired_at, keys) como arreglos de numpy.
+
+        Cada tramo de fetch_size filas se pasa a arreglos apenas llega, así nunca hay
+        más de un tramo como tuplas de Python: 24 bytes por fila más el tramo en curso.
+        """
+        statement = select(HiredEmployee.id, HiredEmployee.datetime, HiredEmployee.department_id, HiredEmployee.job_id)
+        if after_id is not None:
+            statement = statement.where(HiredEmployee.id > after_id)
+        result = session.execute(statement.execution_options(yield_per=self.fetch_size))
+        chunks = []
+        for partition in result.partitions():
+            ids, hired_at, departments, jobs = zip(*partition)
+            keys = (np.array(departments, dtype="int64") << 32) | np.array(jobs, dtype="int64")
+            chunks.append((np.array(ids, dtype="int64"), np.array(hired_at, dtype="datetime64[us]"), keys))
+        if not chunks:
+            return np.empty(0, "int64"), np.empty(0, "datetime64[us]"), np.empty(0, "int64")
+        return tuple(np.concatenate(column) for column in zip(*chunks))
+
+    def clear(self):
+        with self._lock:
+            self._snapshot = None
+
+    def _period(self, filters: ReportFilters):
+        """(department_ids, job_ids, counts) de los pares con contrataciones en el período, con el filtro de trabajo."""
+        snapshot = self.snapshot()
+        if filters.uses_date_range:
+            counts = snapshot.counts(filters.start_date, filters.end_date)
+        else:
+            counts = snapshot.counts_for_year(filters.year)
+        departments, jobs = snapshot.department_id, snapshot.job_id
+        # Como en el GROUP BY, solo existen los pares con alguna contratación
+        present = counts.any(axis=1)
+        if filters.job_id is not None:
+            present &= jobs == filters.job_id
+        return departments[present], jobs[present], counts[present]
+
+    def hired_by_quarter(self, filters: ReportFilters) -> list:
+        """Mismas filas que hired_by_quarter_statement: por (department_id, job_id), sin nombres."""
+        departments, jobs, counts = self._period(filters)
+        if filters.department_id is not None:
+            selected = departments == filters.department_id
+            departments, jobs, counts = departments[selected], jobs[selected], counts[selected]
+        return [{"department_id": d, "job_id": j, "Q1": q[0], "Q2": q[1], "Q3": q[2], "Q4": q[3]}
+                for d, j, q in zip(departments.tolist(), jobs.tolist(), counts.tolist())]
+
+    def hiring_above_average(self, filters: ReportFilters, after_hired: int = None, after_id: int = None) -> list:
+        """Mismas filas que hiring_above_average_statement: ``id`` y ``hired`` por departamento."""
+        departments, _, counts = self._period(filters)
+        ids, per_pair = np.unique(departments, return_inverse=True)
+        totals = np.bincount(per_pair, weights=counts.sum(axis=1), minlength=len(ids)).astype("int64")
+        # El promedio es sobre todos los departamentos, antes de acotar la salida
+        above = totals > totals.mean() if len(totals) else np.zeros(0, dtype=bool)
+        if filters.department_id is not None:
+            above &= ids == filters.department_id
+        if after_hired is not None:
+            above &= (totals < after_hired) | ((totals == after_hired) & (ids > (after_id or 0)))
+
+        ordered = sorted(zip(ids[above].tolist(), totals[above].tolist()), key=lambda item: (-item[1], item[0]))
+        if filters.limit:
+            ordered = ordered[:filters.limit]
+        return [{"id": department_id, "hired": hired} for department_id, hired in ordered]
+
+
+report_engine = InMemoryReportEngine()
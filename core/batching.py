@@ -0,0 +1,19 @@
+class AdaptiveBatchSize:
+    """Tamaño de lote AIMD: crece ``step`` filas tras cada commit limpio y se
+    reduce a la mitad cuando un commit tuvo filas rechazadas.
+
+    Así los lotes grandes (baratos por fila) se mantienen mientras los datos
+    vienen limpios, y tras un fallo el costo de aislar filas malas baja rápido.
+    """
+
+    def __init__(self, initial: int = 500, minimum: int = 50, maximum: int = 5000, step: int = None):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.size = min(max(initial, self.minimum), self.maximum)
+        self.step = step or self.size
+
+    def success(self):
+        self.size = min(self.maximum, self.size + self.step)
+
+    def failure(self):
+        self.size = max(self.minimum, self.size // 2)
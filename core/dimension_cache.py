@@ -0,0 +1,142 @@
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+
+import redis
+from sqlalchemy import select
+
+import infra.db.connection as connection
+from config import DIMENSION_CACHE_URL, DIMENSION_CACHE_TTL, DIMENSION_CACHE_LOCAL_TTL
+from infra.db.models import Department, Job
+from infra.metrics import DIMENSION_CACHE_REQUESTS
+
+
+@dataclass(frozen=True)
+class Dimensions:
+    version: int
+    departments: dict = field(default_factory=dict)
+    jobs: dict = field(default_factory=dict)
+
+    @property
+    def department_ids(self):
+        return self.departments.keys()
+
+    @property
+    def job_ids(self):
+        return self.jobs.keys()
+
+    @property
+    def fingerprint(self) -> str:
+        """Hash de los ids cargados: cambia solo si cambia el resultado de validar claves foráneas."""
+        ids = f"{sorted(self.departments)}|{sorted(self.jobs)}"
+        return hashlib.sha1(ids.encode()).hexdigest()[:16]
+
+
+class DimensionCache:
+    """Mapas id → nombre de departments y jobs, compartidos entre procesos vía Redis.
+
+    Igual que ReportCache, las entradas se indexan por una versión que suben las
+    cargas de dimensiones al confirmar filas; cada proceso guarda la última copia
+    leída y solo vuelve a Redis (o a la base) cuando la versión cambió. Sin Redis
+    la copia local expira a los ``local_ttl`` segundos, para que otro proceso que
+    cargó dimensiones no deje filas válidas rechazadas como invalid_fk.
+    """
+
+    VERSION_KEY = "dimensions:version"
+
+    def __init__(self, redis_url: str = None, ttl: int = 86400, local_ttl: int = 60):
+        self.redis = redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1) if redis_url else None
+        self.ttl = ttl
+        self.local_ttl = local_ttl
+        self._lock = threading.Lock()
+        self._local = None
+        self._local_loaded_at = 0.0
+        self._local_version = 0
+
+    def version(self):
+        """Devuelve la versión compartida, o None si Redis no responde."""
+        if self.redis is None:
+            return None
+        try:
+            version = self.redis.get(self.VERSION_KEY)
+            return int(version) if version is not None else 0
+        except redis.RedisError as e:
+            print("Dimension cache: Redis unavailable, using local copy:", e)
+            return None
+
+    def bump_version(self):
+        with self._lock:
+            self._local_version += 1
+            self._local = None
+        if self.redis is not None:
+            try:
+                self.redis.incr(self.VERSION_KEY)
+            except redis.RedisError as e:
+                print("Dimension cache: could not bump version:", e)
+
+    def get(self, session_factory=None) -> Dimensions:
+        version = self.version()
+        with self._lock:
+            local = self._local
+            if local is not None:
+                fresh = (local.version == version if version is not None
+                         else time.monotonic() - self._local_loaded_at < self.local_ttl)
+                if fresh:
+                    DIMENSION_CACHE_REQUESTS.labels("local").inc()
+                    return local
+
+        if version is not None:
+            dimensions = self._get_shared(version)
+            if dimensions is not None:
+                DIMENSION_CACHE_REQUESTS.labels("redis").inc()
+                return self._store_local(dimensions)
+
+        # La versión se lee antes que la base: si una carga confirma en el medio, esta
+        # copia queda bajo la versión anterior, que nadie vuelve a pedir
+        DIMENSION_CACHE_REQUESTS.labels("database").inc()
+        dimensions = self._load(session_factory, version if version is not None else self._local_version)
+        if version is not None:
+            self._set_shared(dimensions)
+        return self._store_local(dimensions)
+
+    @staticmethod
+    def _load(session_factory, version: int) -> Dimensions:
+        factory = session_factory or connection.SessionLocal
+        with factory() as session:
+            departments = dict(session.execute(select(Department.id, Department.department)).all())
+            jobs = dict(session.execute(select(Job.id, Job.job)).all())
+        return Dimensions(version, departments, jobs)
+
+    def _get_shared(self, version: int):
+        try:
+            payload = self.redis.get(f"dimensions:{version}")
+        except redis.RedisError:
+            return None
+        if payload is None:
+            return None
+        data = json.loads(payload)
+        # JSON solo admite claves de texto
+        return Dimensions(version, {int(k): v for k, v in data["departments"].items()},
+                          {int(k): v for k, v in data["jobs"].items()})
+
+    def _set_shared(self, dimensions: Dimensions):
+        try:
+            payload = json.dumps({"departments": dimensions.departments, "jobs": dimensions.jobs})
+            self.redis.set(f"dimensions:{dimensions.version}", payload, ex=self.ttl)
+        except redis.RedisError as e:
+            print("Dimension cache: could not store dimensions:", e)
+
+    def _store_local(self, dimensions: Dimensions) -> Dimensions:
+        with self._lock:
+            self._local = dimensions
+            self._local_loaded_at = time.monotonic()
+        return dimensions
+
+    def clear_local(self):
+        with self._lock:
+            self._local = None
+
+
+dimension_cache = DimensionCache(DIMENSION_CACHE_URL, DIMENSION_CACHE_TTL, DIMENSION_CACHE_LOCAL_TTL)
@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import zlib
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select
+
+from infra.db.models import HiredEmployee
+
+EXPORT_FORMATS = ("csv", "ndjson")
+EXPORT_COLUMNS = ["id", "name", "datetime", "department_id", "job_id"]
+
+
+@dataclass
+class ExportFilters:
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    department_id: Optional[int] = None
+    job_id: Optional[int] = None
+    names: bool = False
+
+
+def export_statement(filters: ExportFilters):
+    h = HiredEmployee
+    statement = select(h.id, h.name, h.datetime, h.department_id, h.job_id)
+    if filters.start_date:
+        statement = statement.where(h.datetime >= filters.start_date)
+    if filters.end_date:
+        statement = statement.where(h.datetime < filters.end_date)
+    if filters.department_id is not None:
+        statement = statement.where(h.department_id == filters.department_id)
+    if filters.job_id is not None:
+        statement = statement.where(h.job_id == filters.job_id)
+    # Por clave primaria: el orden es estable y no obliga a ordenar en la base
+    return statement.order_by(h.id)
+
+
+def export_chunks(session, filters: ExportFilters, fmt: str, chunk_rows: int, dimensions=None, stats: dict = None):
+    """Serializa hired_employees de a ``chunk_rows`` filas leídas con un cursor del lado del servidor.
+
+    Con ``filters.names`` agrega department y job desde el cache de dimensiones
+    (``dimensions``) en lugar de unir las tablas, como los reportes. Si se pasa
+    ``stats`` se lleva ahí la cuenta de filas exportadas.
+    """
+    columns = EXPORT_COLUMNS + (["department", "job"] if filters.names else [])
+    result = session.execute(export_statement(filters).execution_options(stream_results=True, yield_per=chunk_rows))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(columns)
+
+    for partition in result.partitions():
+        for row in partition:
+            values = [row[0], row[1], row[2].isoformat(), row[3], row[4]]
+            if filters.names:
+                values += [dimensions.departments.get(row[3]), dimensions.jobs.get(row[4])]
+            if writer is not None:
+                writer.writerow(values)
+            else:
+                buffer.write(json.dumps(dict(zip(columns, values))) + "\n")
+        if stats is not None:
+            stats["rows"] = stats.get("rows", 0) + len(partition)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(chunks, level: int = 6):
+    """Comprime en gzip a medida que llegan los chunks: cada uno sale comprimido sin esperar al resto."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits=31: formato gzip
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        # Un flush por chunk: los primeros bytes salen enseguida a costa de algo de compresión
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
@@ -0,0 +1,88 @@
+import gzip
+import tempfile
+
+import numpy as np
+
+
+def id_ranges(ids) -> list:
+    """Comprime ids en rangos cerrados [inicio, fin] ordenados: [1, 2, 3, 7] → [[1, 3], [7, 7]]."""
+    values = np.unique(np.asarray(list(ids), dtype="int64"))
+    if not len(values):
+        return []
+    breaks = np.flatnonzero(np.diff(values) != 1)
+    starts = np.concatenate([values[:1], values[breaks + 1]])
+    ends = np.concatenate([values[breaks], values[-1:]])
+    return [[int(s), int(e)] for s, e in zip(starts, ends)]
+
+
+def merge_ranges(*range_lists) -> list:
+    # Funde rangos solapados o contiguos sin expandirlos a ids
+    merged = []
+    for start, end in sorted(tuple(r) for ranges in range_lists for r in ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def expand_ranges(ranges) -> list:
+    return [i for start, end in ranges for i in range(start, end + 1)]
+
+
+def compact_result(summary: dict, max_ranges: int, rejections: str = None) -> dict:
+    """Resumen para el backend de resultados: error_ids como rangos, con tope.
+
+    Pasado ``max_ranges`` la lista se corta y el detalle completo queda en el
+    archivo de rechazos, así el tamaño del resultado no depende de cuán sucio
+    venga el archivo.
+    """
+    result = {k: v for k, v in summary.items() if k != "error_ids"}
+    ranges = merge_ranges(id_ranges(summary.get("error_ids", [])), summary.get("error_id_ranges", []))
+    result["error_id_ranges"] = ranges[:max_ranges]
+    if len(ranges) > max_ranges or summary.get("error_id_ranges_truncated"):
+        result["error_id_ranges_truncated"] = True
+    if rejections:
+        result["rejections"] = rejections
+    return result
+
+
+class RejectionLog:
+    """Detalle (id, reason) de las filas rechazadas, escrito como CSV gzip a medida que llega.
+
+    Se escribe en un archivo temporal que queda en memoria hasta ``spool_bytes``,
+    así una carga muy sucia no acumula el detalle en listas de Python.
+    """
+
+    def __init__(self, spool_bytes: int = 4 * 1024 * 1024):
+        self.count = 0
+        self._file = tempfile.SpooledTemporaryFile(max_size=spool_bytes)
+        self._gzip = gzip.GzipFile(fileobj=self._file, mode="wb")
+        self._gzip.write(b"id,reason\n")
+
+    def add(self, ids, reasons):
+        lines = []
+        for row_id, reason in zip(ids, reasons):
+            # Las filas sin id (missing_fields) quedan con el id vacío
+            lines.append(f"{'' if row_id is None or row_id != row_id else int(row_id)},{reason}\n")
+        self._gzip.write("".join(lines).encode())
+        self.count += len(lines)
+
+    def publish(self, blob_client, blob_name: str):
+        """Sube el archivo si hubo rechazos y devuelve su nombre (o None).
+
+        Las filas ya están confirmadas: si la subida falla se informa y la carga
+        no se da por fallida.
+        """
+        self._gzip.close()
+        try:
+            if not self.count:
+                return None
+            self._file.seek(0)
+            blob_client.upload_blob(blob_name, self._file)
+            return blob_name
+        except Exception as e:
+            print(f"Could not upload rejection report {blob_name}:", e)
+            return None
+        finally:
+            self._file.close()
@@ -0,0 +1,106 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+from config import REPORT_CACHE_URL, REPORT_CACHE_TTL, REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_LOCAL_TTL
+
+
+class ReportCache:
+    """Cache de resultados de reportes: LRU en proceso delante de Redis.
+
+    Las entradas se indexan por reporte, parámetros y versión de datos. Las
+    cargas suben la versión cuando confirman filas, así que las entradas viejas
+    simplemente dejan de encontrarse y expiran por TTL en Redis. Sin Redis no
+    hay versión compartida (los workers que cargan no pueden avisar a la API):
+    la versión local cambia además cada ``local_ttl`` segundos, como la copia
+    local de DimensionCache, y con ella las entradas del LRU y los ETags.
+    """
+
+    VERSION_KEY = "reports:data-version"
+
+    def __init__(self, redis_url: str = None, ttl: int = 3600, max_entries: int = 128, local_ttl: int = 60):
+        self.redis = redis.from_url(redis_url, socket_connect_timeout=1, socket_timeout=1) if redis_url else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.local_ttl = local_ttl
+        self._local = OrderedDict()
+        self._lock = threading.Lock()
+        self._local_version = (0, time.time())
+
+    @staticmethod
+    def _params_key(params: dict) -> str:
+        return hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+    def version(self):
+        """Devuelve (versión, epoch de la última carga)."""
+        if self.redis is not None:
+            try:
+                version, updated_at = self.redis.hmget(self.VERSION_KEY, "version", "updated_at")
+                if version is not None:
+                    return int(version), float(updated_at)
+                return 0, 0.0
+            except redis.RedisError as e:
+                print("Report cache: Redis unavailable, using local version:", e)
+        bumps, updated_at = self._local_version
+        return f"local-{bumps}-{int(time.time() // self.local_ttl)}", updated_at
+
+    def bump_version(self):
+        now = time.time()
+        with self._lock:
+            self._local_version = (self._local_version[0] + 1, now)
+        if self.redis is not None:
+            try:
+                pipe = self.redis.pipeline()
+                pipe.hincrby(self.VERSION_KEY, "version", 1)
+                pipe.hset(self.VERSION_KEY, "updated_at", now)
+                pipe.execute()
+            except redis.RedisError as e:
+                print("Report cache: could not bump data version:", e)
+
+    def etag(self, name: str, params: dict, version: int) -> str:
+        return f"{name}-{version}-{self._params_key(params)}"
+
+    def get(self, name: str, params: dict, version: int):
+        key = f"reports:{version}:{name}:{self._params_key(params)}"
+        with self._lock:
+            if key in self._local:
+                self._local.move_to_end(key)
+                return self._local[key]
+
+        if self.redis is not None:
+            try:
+                payload = self.redis.get(key)
+            except redis.RedisError:
+                payload = None
+            if payload is not None:
+                data = json.loads(payload)
+                self._store_local(key, data)
+                return data
+        return None
+
+    def set(self, name: str, params: dict, version: int, data):
+        key = f"reports:{version}:{name}:{self._params_key(params)}"
+        self._store_local(key, data)
+        if self.redis is not None:
+            try:
+                self.redis.set(key, json.dumps(data, default=str), ex=self.ttl)
+            except redis.RedisError as e:
+                print("Report cache: could not store result:", e)
+
+    def _store_local(self, key: str, data):
+        with self._lock:
+            self._local[key] = data
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+
+report_cache = ReportCache(REPORT_CACHE_URL, REPORT_CACHE_TTL, REPORT_CACHE_MAX_ENTRIES, REPORT_CACHE_LOCAL_TTL)
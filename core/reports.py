@@ -0,0 +1,180 @@
+from bisect import bisect_left
+from dataclasses import dataclass
+from datetime import date
+from typing import Optional
+
+from sqlalchemy import select, func, case, extract, and_, or_, literal, literal_column
+
+from infra.db.models import HiredEmployee, HiringStat
+
+
+@dataclass
+class ReportFilters:
+    year: int = 2021
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    department_id: Optional[int] = None
+    job_id: Optional[int] = None
+    limit: Optional[int] = None
+
+    @property
+    def uses_date_range(self) -> bool:
+        return self.start_date is not None or self.end_date is not None
+
+    def as_params(self) -> dict:
+        return {k: v for k, v in self.__dict__.items() if v is not None}
+
+
+def _source(filters: ReportFilters):
+    """Devuelve (tabla, department_id, job_id, quarter, hires, condiciones) según el origen.
+
+    Con año se lee hiring_stats; con rango de fechas se lee hired_employees con
+    un predicado de rango sobre datetime, que sí puede usar un índice.
+    """
+    if filters.uses_date_range:
+        h = HiredEmployee
+        month = extract("month", h.datetime)
+        quarter = case((month <= 3, 1), (month <= 6, 2), (month <= 9, 3), else_=4)
+        conditions = []
+        if filters.start_date:
+            conditions.append(h.datetime >= filters.start_date)
+        if filters.end_date:
+            conditions.append(h.datetime < filters.end_date)
+        return h, h.department_id, h.job_id, quarter, literal_column("1"), conditions
+
+    s = HiringStat
+    return s, s.department_id, s.job_id, s.quarter, s.hires, [s.year == filters.year]
+
+
+def _name_ranks(names: dict):
+    """Devuelve (nombres distintos ordenados, id → posición de su nombre).
+
+    Ordenar por la posición es ordenar por nombre; ids con el mismo nombre comparten
+    posición y los que no están en el cache quedan como "" al principio.
+    """
+    ordered = sorted(set(names.values()) | {""})
+    position = {name: i for i, name in enumerate(ordered)}
+    return ordered, {id_: position[name] for id_, name in names.items()}
+
+
+def _rank(column, ranks: dict):
+    return case(ranks, value=column, else_=0) if ranks else literal(0)
+
+
+def _cursor_rank(ordered: list, name: str):
+    # Un nombre que ya no existe cae entre dos posiciones: no empata con ninguna
+    i = bisect_left(ordered, name)
+    return i if i < len(ordered) and ordered[i] == name else i - 0.5
+
+
+def hired_by_quarter_statement(filters: ReportFilters, dimensions, after_department: str = None,
+                               after_job: str = None):
+    """Contrataciones por (department, job) y trimestre, en orden de nombre, sin unir las dimensiones.
+
+    La posición de cada id en el orden por nombre sale del cache de dimensiones como
+    un CASE, así el ORDER BY, el cursor y el LIMIT quedan en SQL y la página se lee
+    con el cursor del servidor. Cada fila trae un id de cada grupo para nombrarla.
+    """
+    source, department_id, job_id, quarter, hires, conditions = _source(filters)
+    if filters.job_id is not None:
+        conditions.append(job_id == filters.job_id)
+    if filters.department_id is not None:
+        conditions.append(department_id == filters.department_id)
+
+    departments, department_ranks = _name_ranks(dimensions.departments)
+    jobs, job_ranks = _name_ranks(dimensions.jobs)
+    # El subquery evita agrupar por expresiones con parámetros (SQL Server no las empareja)
+    ranked = (
+        select(_rank(department_id, department_ranks).label("department_rank"),
+               _rank(job_id, job_ranks).label("job_rank"),
+               department_id.label("department_id"), job_id.label("job_id"),
+               *[case((quarter == n, hires), else_=0).label(f"Q{n}") for n in range(1, 5)])
+        .select_from(source)
+        .where(*conditions)
+        .subquery("ranked")
+    )
+
+    # Se agrupa por nombre como hacía el GROUP BY original, por si dos ids comparten nombre
+    keys = (ranked.c.department_rank, ranked.c.job_rank)
+    statement = (
+        select(func.min(ranked.c.department_id).label("department_id"), func.min(ranked.c.job_id).label("job_id"),
+               *[func.sum(ranked.c[f"Q{n}"]).label(f"Q{n}") for n in range(1, 5)])
+        .group_by(*keys)
+        .order_by(*keys)
+    )
+    if after_department is not None:
+        department, job = _cursor_rank(departments, after_department), _cursor_rank(jobs, after_job)
+        statement = statement.where(or_(keys[0] > department, and_(keys[0] == department, keys[1] > job)))
+    return statement.limit(filters.limit) if filters.limit else statement
+
+
+def name_quarter_rows(rows, dimensions):
+    for row in rows:
+        yield {"department": dimensions.departments.get(row["department_id"], ""),
+               "job": dimensions.jobs.get(row["job_id"], ""),
+               **{f"Q{n}": row[f"Q{n}"] for n in range(1, 5)}}
+
+
+def name_hired_by_quarter(rows, dimensions, filters: ReportFilters, after_department: str = None,
+                          after_job: str = None):
+    """Nombra, ordena y pagina en Python las filas por id del motor en memoria.
+
+    A diferencia de hired_by_quarter_statement, junta todos los grupos (a lo sumo
+    departamentos × trabajos) antes de devolver la página pedida.
+    """
+    # Se agrupa por nombre como hacía el GROUP BY original, por si dos ids comparten nombre
+    totals = {}
+    for row in rows:
+        key = (dimensions.departments.get(row["department_id"], ""), dimensions.jobs.get(row["job_id"], ""))
+        current = totals.setdefault(key, [0, 0, 0, 0])
+        for n in range(4):
+            current[n] += row[f"Q{n + 1}"]
+
+    ordered = sorted(totals.items())
+    if after_department is not None:
+        # Paginación por llave (department, job), la misma que antes hacía el WHERE
+        ordered = [item for item in ordered if item[0] > (after_department, after_job)]
+    if filters.limit:
+        ordered = ordered[:filters.limit]
+    for (department, job), quarters in ordered:
+        yield {"department": department, "job": job, **{f"Q{n}": q for n, q in enumerate(quarters, 1)}}
+
+
+def hiring_above_average_statement(filters: ReportFilters, after_hired: int = None, after_id: int = None):
+    source, department_id, job_id, _, hires, conditions = _source(filters)
+    if filters.job_id is not None:
+        conditions.append(job_id == filters.job_id)
+
+    # El promedio se calcula sobre todos los departamentos; el filtro de departamento solo acota la salida
+    per_department = (
+        select(func.sum(hires).label("hired_count"))
+        .select_from(source)
+        .where(*conditions)
+        .group_by(department_id)
+        .subquery("dept_avg")
+    )
+    average = select(func.avg(per_department.c.hired_count)).scalar_subquery()
+
+    outer = list(conditions)
+    if filters.department_id is not None:
+        outer.append(department_id == filters.department_id)
+
+    total = func.sum(hires)
+    having = [total > average]
+    if after_hired is not None:
+        having.append(or_(total < after_hired, and_(total == after_hired, department_id > (after_id or 0))))
+
+    statement = (
+        select(department_id.label("id"), total.label("hired"))
+        .select_from(source)
+        .where(*outer)
+        .group_by(department_id)
+        .having(*having)
+        .order_by(total.label("hired").desc(), department_id.asc())
+    )
+    return statement.limit(filters.limit) if filters.limit else statement
+
+
+def name_departments(rows, dimensions):
+    for row in rows:
+        yield {"id": row["id"], "department": dimensions.departments.get(row["id"]), "hired": row["hired"]}
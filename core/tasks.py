@@ -1,7 +1,92 @@
+import io
+from datetime import date
+from celery import chord
+from config import EXPORT_CHUNK_ROWS, TASK_RESULT_MAX_ID_RANGES
 from infra.broker.celery_config import celery_app
-from core.services import DataIngestionService
+from infra.broker.db_slots import db_slot
+from core.dimension_cache import dimension_cache
+from core.export import ExportFilters, export_chunks, gzip_chunks
+from core.rejections import RejectionLog, compact_result
+from core.report_cache import report_cache
+from core.services import DataIngestionService, plan_windows, merge_employee_summaries
+from core.upload_job import run_upload_job
+from infra.db.hiring_stats import rebuild_hiring_stats
+from infra.storage.azure_blob import ChunkedStream
 
-@celery_app.task(name="load_employees_task", ignore_result=False)
-def load_employees_task(start=0, limit=1000, skip_existing=True):
+# Colas, acks_late y límites de tiempo de cada tarea: infra/broker/queues.py
+
+@celery_app.task(name="load_departments_task", bind=True, ignore_result=False)
+def load_departments_task(self):
+    with db_slot(self):
+        return DataIngestionService().load_departments()
+
+@celery_app.task(name="load_jobs_task", bind=True, ignore_result=False)
+def load_jobs_task(self):
+    with db_slot(self):
+        return DataIngestionService().load_jobs()
+
+def rejections_prefix(task) -> str:
+    # Todas las ventanas de un chord comparten prefijo: el de la tarea que lo lanzó
+    return f"rejections/{task.request.root_id or task.request.id}/"
+
+@celery_app.task(name="load_employees_task", bind=True, ignore_result=False)
+def load_employees_task(self, start=0, limit=1000, skip_existing=True):
+    # El chord reparte todas las ventanas a la vez; el turno de base acota cuántas escriben juntas
+    with db_slot(self):
+        service = DataIngestionService()
+        service.rejection_log = RejectionLog()
+        summary = service.load_employees(start=start, limit=limit, skip_existing=skip_existing)
+    # El detalle por fila va a un blob; el resultado en Redis solo lleva conteos y rangos de ids
+    published = service.rejection_log.publish(service.blob_client, f"{rejections_prefix(self)}{self.request.id}.csv.gz")
+    return compact_result(summary, TASK_RESULT_MAX_ID_RANGES, published)
+
+@celery_app.task(name="merge_employee_summaries_task", bind=True, ignore_result=False)
+def merge_employee_summaries_task(self, summaries):
+    with_rejections = any(summary.get("rejections") for summary in summaries)
+    return compact_result(merge_employee_summaries(summaries), TASK_RESULT_MAX_ID_RANGES,
+                          rejections_prefix(self) if with_rejections else None)
+
+@celery_app.task(name="ingest_employees_task", bind=True, ignore_result=False)
+def ingest_employees_task(self, window_size=1000, skip_existing=True):
+    # Dimensiona el archivo y reparte las ventanas entre los workers; el resultado
+    # final de esta tarea es el resumen agregado que produce el callback del chord
     service = DataIngestionService()
-    return service.load_employees(start=start, limit=limit, skip_existing=skip_existing)
+    total_rows = service.count_rows("hired_employees.csv")
+    windows = plan_windows(total_rows, window_size)
+    if not windows:
+        return merge_employee_summaries([])
+
+    header = [load_employees_task.s(start=start, limit=limit, skip_existing=skip_existing) for start, limit in windows]
+    raise self.replace(chord(header, merge_employee_summaries_task.s()))
+
+@celery_app.task(name="upload_files_task", bind=True, ignore_result=False, acks_late=True, reject_on_worker_lost=True)
+def upload_files_task(self, job_id, batch_size=None, delta=False):
+    # acks_late: si el worker muere a mitad de carga el mensaje vuelve a la cola y
+    # la nueva ejecución retoma desde los checkpoints en lugar de empezar de cero
+    with db_slot(self):
+        return run_upload_job(DataIngestionService(), job_id, batch_size=batch_size, delta=delta)
+
+@celery_app.task(name="rebuild_hiring_stats_task", bind=True, ignore_result=False)
+def rebuild_hiring_stats_task(self):
+    with db_slot(self):
+        service = DataIngestionService()
+        with service.loader.session() as session:
+            groups = rebuild_hiring_stats(session)
+        report_cache.bump_version()
+        return {"hiring_stats": groups}
+
+@celery_app.task(name="export_hired_employees_task", bind=True, ignore_result=False)
+def export_hired_employees_task(self, fmt="csv", start_date=None, end_date=None, department_id=None, job_id=None,
+                                names=False):
+    filters = ExportFilters(date.fromisoformat(start_date) if start_date else None,
+                            date.fromisoformat(end_date) if end_date else None, department_id, job_id, names)
+    blob_name = f"exports/{self.request.id}/hired_employees.{fmt}.gz"
+    stats = {"rows": 0}
+    with db_slot(self):
+        service = DataIngestionService()
+        dimensions = dimension_cache.get(service.loader.session) if names else None
+        with service.loader.session() as session:
+            # El blob se sube por bloques a medida que el cursor avanza: nunca está completo en memoria
+            chunks = gzip_chunks(export_chunks(session, filters, fmt, EXPORT_CHUNK_ROWS, dimensions, stats))
+            service.blob_client.upload_blob(blob_name, io.BufferedReader(ChunkedStream(chunks)))
+    return {"blob": blob_name, "format": fmt, "rows": stats["rows"]}
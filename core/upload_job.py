@@ -0,0 +1,178 @@
+import json
+import uuid
+
+from config import TASK_RESULT_MAX_ID_RANGES
+from core.rejections import RejectionLog, compact_result
+from core.services import DataIngestionService, merge_employee_summaries
+from infra.db.checkpoints import (clear_checkpoints, create_job, get_checkpoint, reset_sync_state, save_checkpoint,
+                                  update_job, utcnow)
+from infra.db.models import IngestionJob
+
+UPLOAD_FILES = ("departments.csv", "jobs.csv", "hired_employees.csv")
+DELTA_WINDOW_SIZE = 1000
+
+
+def create_upload_job(service: DataIngestionService, restart: bool = False) -> str:
+    job_id = str(uuid.uuid4())
+    with service.loader.session() as session:
+        if restart:
+            clear_checkpoints(session, UPLOAD_FILES)
+            reset_sync_state(session, "hired_employees.csv")
+        create_job(session, job_id)
+        session.commit()
+    return job_id
+
+
+def fail_upload_job(service: DataIngestionService, job_id: str, error: str):
+    with service.loader.session() as session:
+        update_job(session, job_id, status="FAILURE", error=error, finished_at=utcnow())
+        session.commit()
+
+
+def _load_dimension_once(service: DataIngestionService, job_id: str, blob_name: str, load):
+    etag = service.blob_client.get_etag(blob_name)
+    with service.loader.session() as session:
+        update_job(session, job_id, stage=blob_name)
+        checkpoint = get_checkpoint(session, blob_name, etag)
+        session.commit()
+        if checkpoint is not None and checkpoint.completed:
+            return {"processed": checkpoint.rows_done, "skipped": True}
+
+    result = load()
+    with service.loader.session() as session:
+        save_checkpoint(session, blob_name, etag, result["processed"], result["processed"], completed=True)
+        session.commit()
+    return result
+
+
+def _load_employees_resumable(service: DataIngestionService, job_id: str, batch_size: int = None):
+    blob_name = "hired_employees.csv"
+    etag = service.blob_client.get_etag(blob_name)
+    with service.loader.session() as session:
+        checkpoint = get_checkpoint(session, blob_name, etag)
+        done = checkpoint.rows_done if checkpoint else 0
+        total = checkpoint.total_rows if checkpoint and checkpoint.total_rows is not None else None
+        completed = bool(checkpoint and checkpoint.completed)
+
+    if total is None:
+        total = service.count_rows(blob_name)
+    with service.loader.session() as session:
+        update_job(session, job_id, stage=blob_name, total_rows=total, rows_done=done, resumed_rows=done)
+        save_checkpoint(session, blob_name, etag, done, total, completed)
+        session.commit()
+    if completed:
+        return {**merge_employee_summaries([]), "skipped": True}
+
+    summaries = []
+    for summary in service.stream_employees(batch_size=batch_size, skip_existing=True, start=done):
+        # El lote ya está confirmado: el checkpoint avanza después, así un corte
+        # entre ambos solo repite el lote (que se detecta como "exists")
+        done += summary["processed"]
+        summaries.append(summary)
+        with service.loader.session() as session:
+            save_checkpoint(session, blob_name, etag, done, total)
+            update_job(session, job_id, rows_done=done)
+            session.commit()
+
+    with service.loader.session() as session:
+        save_checkpoint(session, blob_name, etag, done, total, completed=True)
+        update_job(session, job_id, rows_done=done, total_rows=max(total, done))
+        session.commit()
+    return merge_employee_summaries(summaries)
+
+
+def _sync_employees_delta(service: DataIngestionService, job_id: str, window_size: int = None):
+    # Sin contar filas de antemano: eso obligaría a leer todo el archivo, justo lo que el delta evita
+    with service.loader.session() as session:
+        update_job(session, job_id, stage="hired_employees.csv", total_rows=None, rows_done=0, resumed_rows=0)
+        session.commit()
+
+    rows_done = 0
+    skipped = 0
+    summaries = []
+    # Las ventanas deben medir lo mismo en cada corrida para que sus hashes sean comparables
+    for summary in service.sync_employees(window_size=window_size or DELTA_WINDOW_SIZE):
+        rows_done += summary["rows"]
+        if summary["skipped"]:
+            skipped += 1
+            continue
+        summaries.append(summary)
+        with service.loader.session() as session:
+            update_job(session, job_id, rows_done=rows_done)
+            session.commit()
+
+    with service.loader.session() as session:
+        update_job(session, job_id, rows_done=rows_done, total_rows=rows_done)
+        session.commit()
+    return {**merge_employee_summaries(summaries), "windows_skipped": skipped}
+
+
+def run_upload_job(service: DataIngestionService, job_id: str, batch_size: int = None, delta: bool = False) -> dict:
+    """Carga departamentos, trabajos y empleados en ese orden, reanudando desde los checkpoints.
+
+    Si el proceso se corta, volver a ejecutar el mismo trabajo (o crear uno nuevo)
+    retoma cada archivo desde la última fila confirmada de esa versión del blob.
+    Con ``delta`` los empleados se cargan por ventanas y solo se procesan las
+    nuevas o modificadas desde la sincronización anterior.
+    """
+    started_at = utcnow()
+    with service.loader.session() as session:
+        update_job(session, job_id, status="RUNNING", started_at=started_at, error=None, finished_at=None)
+        session.commit()
+
+    service.rejection_log = RejectionLog()
+    try:
+        summary = {
+            "departments": _load_dimension_once(service, job_id, "departments.csv", service.load_departments),
+            "jobs": _load_dimension_once(service, job_id, "jobs.csv", service.load_jobs),
+            "hired_employees": (_sync_employees_delta(service, job_id, batch_size) if delta
+                                else _load_employees_resumable(service, job_id, batch_size)),
+        }
+    except Exception as e:
+        fail_upload_job(service, job_id, str(e))
+        raise
+    finally:
+        log, service.rejection_log = service.rejection_log, None
+
+    # Cada ejecución (también las reanudadas) deja su propio archivo con las filas rechazadas
+    blob_name = f"rejections/{job_id}/{started_at:%Y%m%dT%H%M%S}.csv.gz"
+    published = log.publish(service.blob_client, blob_name)
+    summary["hired_employees"] = compact_result(summary["hired_employees"], TASK_RESULT_MAX_ID_RANGES, published)
+
+    with service.loader.session() as session:
+        update_job(session, job_id, status="SUCCESS", stage=None, summary=json.dumps(summary, default=str), finished_at=utcnow())
+        session.commit()
+    return summary
+
+
+def job_progress(job: IngestionJob) -> dict:
+    rate = eta = None
+    if job.started_at is not None:
+        elapsed = ((job.finished_at or utcnow()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            # Las filas reanudadas no cuentan para la velocidad de esta ejecución
+            rate = (job.rows_done - job.resumed_rows) / elapsed
+    if job.status == "RUNNING" and job.total_rows and rate:
+        eta = round(max(job.total_rows - job.rows_done, 0) / rate, 1)
+
+    return {
+        "job_id": job.id,
+        "status": job.status,
+        "stage": job.stage,
+        "rows_done": job.rows_done,
+        "total_rows": job.total_rows,
+        "percent": round(100 * job.rows_done / job.total_rows, 1) if job.total_rows else None,
+        "rows_per_sec": round(rate, 1) if rate is not None else None,
+        "eta_seconds": eta,
+        "created_at": job.created_at.isoformat() + "Z",
+        "started_at": job.started_at.isoformat() + "Z" if job.started_at else None,
+        "finished_at": job.finished_at.isoformat() + "Z" if job.finished_at else None,
+        "error": job.error,
+        "result": json.loads(job.summary) if job.summary else None,
+    }
+
+
+def get_upload_job(service: DataIngestionService, job_id: str):
+    with service.loader.session() as session:
+        job = session.get(IngestionJob, job_id)
+        return job_progress(job) if job is not None else None
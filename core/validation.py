@@ -0,0 +1,76 @@
+import pandas as pd
+
+REQUIRED_EMPLOYEE_FIELDS = ["id", "name", "datetime", "department_id", "job_id"]
+INT32_MIN, INT32_MAX = -2**31, 2**31 - 1
+
+
+def to_int32(values: pd.Series) -> pd.Series:
+    """Convierte a número; lo que no es un entero que entre en INT queda nulo."""
+    numbers = pd.to_numeric(values, errors="coerce")
+    return numbers.where((numbers % 1 == 0) & numbers.between(INT32_MIN, INT32_MAX))
+
+
+def validate_employees(df: pd.DataFrame, dept_ids, job_ids, existing_ids=(), skip_existing: bool = True):
+    """Valida un lote completo de hired_employees con operaciones vectorizadas.
+
+    Devuelve (clean, rejected): ``clean`` con los tipos listos para insertar y
+    ``rejected`` con columnas ``id`` y ``reason`` (missing_fields, exists,
+    invalid_fk, duplicate), en el orden original de las filas. Las reglas se
+    aplican en el mismo orden que el procesamiento fila a fila.
+    """
+    ids = to_int32(df["id"])
+    dept = to_int32(df["department_id"])
+    job = to_int32(df["job_id"])
+    hired_at = pd.to_datetime(df["datetime"], utc=True, errors="coerce")
+    names = df["name"].where(df["name"].isna(), df["name"].astype(str).str.strip())
+
+    reason = pd.Series(None, index=df.index, dtype="object")
+
+    missing = ids.isna() | names.isna() | hired_at.isna() | dept.isna() | job.isna()
+    reason[missing] = "missing_fields"
+
+    exists = reason.isna() & ids.isin(list(existing_ids))
+    reason[exists] = "exists"
+
+    invalid_fk = reason.isna() & ~(dept.isin(list(dept_ids)) & job.isin(list(job_ids)))
+    reason[invalid_fk] = "invalid_fk"
+
+    # Un id repetido solo cuenta como duplicado si una aparición anterior era válida
+    duplicate = reason.isna() & ids.where(reason.isna()).duplicated(keep="first")
+    reason[duplicate] = "duplicate"
+
+    valid = reason.isna()
+    clean = pd.DataFrame({
+        "id": ids[valid].astype("int32"),
+        "name": names[valid],
+        "datetime": hired_at[valid],
+        "department_id": dept[valid].astype("int32"),
+        "job_id": job[valid].astype("int32"),
+    })
+    rejected = pd.DataFrame({"id": ids[~valid], "reason": reason[~valid]})
+    return clean, rejected
+
+
+def validate_dimension(df: pd.DataFrame, name_column: str) -> pd.DataFrame:
+    """Valida un lote de departments o jobs: todas las filas con id entero y nombre.
+
+    A diferencia de los empleados, un lote con filas inválidas se rechaza entero:
+    las dimensiones son chicas y una cargada a medias deja empleados sin referencia.
+    """
+    ids = pd.to_numeric(df["id"], errors="coerce")
+    names = df[name_column].where(df[name_column].isna(), df[name_column].astype(str).str.strip())
+    invalid = ids.isna() | (ids % 1 != 0) | names.isna() | (names == "")
+    if invalid.any():
+        rows = (invalid.to_numpy().nonzero()[0] + 1).tolist()
+        raise ValueError(f"Rows without a valid id or {name_column}: {rows[:20]}")
+    return pd.DataFrame({"id": ids.astype("int64"), name_column: names})
+
+
+def summarize_rejections(rejected: pd.DataFrame, skip_existing: bool = True):
+    """Convierte las rechazadas en (already_exists, errors, error_ids) del resumen estándar."""
+    if skip_existing:
+        existing_mask = rejected["reason"] == "exists"
+    else:
+        existing_mask = pd.Series(False, index=rejected.index)
+    error_ids = [int(i) for i in rejected.loc[~existing_mask, "id"].dropna()]
+    return int(existing_mask.sum()), int((~existing_mask).sum()), error_ids
@@ -0,0 +1,21 @@
+import os
+import shutil
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:80")
+workers = int(os.getenv("GUNICORN_WORKERS", 2))
+# Con preload la aplicación se importa una vez en el master y los workers la heredan
+# al hacer fork; el engine, el cliente de blob y el servicio se crean en cada worker
+preload_app = os.getenv("GUNICORN_PRELOAD", "false").lower() == "true"
+
+
+def on_starting(server):
+    # Métricas de una ejecución anterior falsearían los contadores
+    path = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    from infra.metrics import mark_process_dead
+    mark_process_dead(worker.pid)
@@ -1,5 +1,8 @@
 import os
 from celery import Celery
+from config import CELERY_WORKER_PROFILE, TASK_RESULT_TTL
+from infra.broker.queues import (DEFAULT_QUEUE, WORKER_PROFILES, task_annotations, task_routes, visibility_timeout,
+                                 worker_queues)
 
 broker_url = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
 backend_url = os.getenv("CELERY_RESULT_BACKEND", broker_url)
@@ -20,4 +23,26 @@ celery_app.conf.update(
     task_serializer="json",
     result_serializer="json",
     accept_content=["json"],
+    task_default_queue=DEFAULT_QUEUE,
+    task_routes=task_routes(),
+    task_annotations=task_annotations(),
+    # Si el proceso muere (límite duro, OOM) el mensaje vuelve a la cola en lugar de perderse
+    task_reject_on_worker_lost=True,
+    broker_transport_options={"visibility_timeout": visibility_timeout()},
+    result_expires=TASK_RESULT_TTL,
 )
+
+# Cada servicio de worker elige un perfil: qué colas consume, concurrencia y prefetch.
+# Los flags -Q, -c y --prefetch-multiplier de la línea de comandos tienen prioridad.
+if CELERY_WORKER_PROFILE:
+    profile = WORKER_PROFILES[CELERY_WORKER_PROFILE]
+    celery_app.conf.update(
+        task_queues=worker_queues(profile),
+        worker_concurrency=profile.concurrency,
+        worker_prefetch_multiplier=profile.prefetch_multiplier,
+    )
+
+# Conecta los signals que alimentan el índice de tareas de /task-list
+from infra.broker import task_registry  # noqa: E402,F401
+from infra.broker import task_metrics  # noqa: E402,F401
+from infra.broker import task_profiling  # noqa: E402,F401
@@ -0,0 +1,89 @@
+import random
+import time
+import uuid
+from contextlib import contextmanager
+
+import redis
+
+from config import CELERY_BROKER_URL, DB_MAX_CONCURRENT_TASKS, DB_SLOT_RETRY_SECONDS
+
+# Poda los turnos vencidos y toma uno si queda lugar, todo en un solo paso atómico
+ACQUIRE_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', ARGV[1])
+if redis.call('ZCARD', KEYS[1]) < tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[4])
+    return 1
+end
+return 0
+"""
+
+
+class DbSlots:
+    """Semáforo distribuido en Redis para las tareas que usan la base.
+
+    Cada worker tiene su propio pool de conexiones, así que la cantidad de
+    conexiones abiertas crece con los procesos de todas las máquinas; este
+    límite global acota cuántas tareas trabajan contra Azure SQL a la vez. Cada
+    turno vence a los ``lease`` segundos, por si el proceso que lo tenía murió.
+    """
+
+    KEY = "db-slots"
+
+    def __init__(self, client, limit: int):
+        self.redis = client
+        self.limit = limit
+        self._acquire = client.register_script(ACQUIRE_SCRIPT)
+
+    def acquire(self, token: str, lease: float) -> bool:
+        now = time.time()
+        return bool(self._acquire(keys=[self.KEY], args=[now, self.limit, now + lease, token]))
+
+    def release(self, token: str):
+        self.redis.zrem(self.KEY, token)
+
+    def in_use(self) -> int:
+        self.redis.zremrangebyscore(self.KEY, "-inf", time.time())
+        return self.redis.zcard(self.KEY)
+
+
+_slots = None
+
+
+def get_db_slots() -> DbSlots:
+    global _slots
+    if _slots is None:
+        url = CELERY_BROKER_URL or "redis://redis:6379/0"
+        kwargs = {"ssl_cert_reqs": "none"} if url.startswith("rediss://") else {}
+        client = redis.from_url(url, socket_connect_timeout=2, **kwargs)
+        _slots = DbSlots(client, DB_MAX_CONCURRENT_TASKS)
+    return _slots
+
+
+@contextmanager
+def db_slot(task, slots: DbSlots = None):
+    """Ejecuta el cuerpo de ``task`` con un turno de base tomado.
+
+    Sin lugar la tarea se reintenta más tarde en lugar de esperar: así no ocupa
+    un proceso del worker sin hacer nada. Si Redis no responde se ejecuta igual,
+    como el resto de los auxiliares que dependen de Redis.
+    """
+    slots = slots or get_db_slots()
+    token = task.request.id or str(uuid.uuid4())
+    lease = task.time_limit or 3600
+    try:
+        acquired = slots.acquire(token, lease)
+    except redis.RedisError as e:
+        print("DB slots unavailable, running without the concurrency limit:", e)
+        acquired = None
+
+    if acquired is False:
+        # Con jitter, para que las tareas en espera no reintenten todas juntas
+        raise task.retry(countdown=DB_SLOT_RETRY_SECONDS * random.uniform(0.5, 1.5), max_retries=None)
+    try:
+        yield
+    finally:
+        if acquired:
+            try:
+                slots.release(token)
+            except redis.RedisError as e:
+                print("Could not release DB slot (it expires with its lease):", e)
@@ -0,0 +1,88 @@
+from dataclasses import dataclass
+
+from kombu import Queue
+
+DEFAULT_QUEUE = "default"
+
+# Cada tarea va a la cola de su tipo de trabajo: una carga larga de empleados no
+# debe quedar delante de las tareas cortas que coordinan o cargan dimensiones
+TASK_QUEUES = {
+    "load_departments_task": "dimensions",
+    "load_jobs_task": "dimensions",
+    "load_employees_task": "facts",
+    "upload_files_task": "facts",
+    "export_hired_employees_task": "facts",
+    "rebuild_hiring_stats_task": "reports",
+    "ingest_employees_task": DEFAULT_QUEUE,
+    "merge_employee_summaries_task": DEFAULT_QUEUE,
+}
+
+
+@dataclass(frozen=True)
+class QueuePolicy:
+    acks_late: bool
+    soft_time_limit: int
+    time_limit: int
+
+
+QUEUE_POLICIES = {
+    DEFAULT_QUEUE: QueuePolicy(acks_late=False, soft_time_limit=300, time_limit=360),
+    "dimensions": QueuePolicy(acks_late=True, soft_time_limit=300, time_limit=360),
+    "facts": QueuePolicy(acks_late=True, soft_time_limit=1800, time_limit=1900),
+    "reports": QueuePolicy(acks_late=True, soft_time_limit=900, time_limit=1000),
+}
+
+# upload_files_task reanuda desde checkpoints: sin límite blando (que la marcaría
+# como fallida) y con un límite duro que mata el proceso, así el mensaje vuelve a
+# la cola por reject_on_worker_lost y la siguiente ejecución sigue donde quedó
+TASK_OVERRIDES = {
+    "upload_files_task": {"soft_time_limit": None, "time_limit": 6 * 3600},
+    # Un export completo recorre toda la tabla: más margen que una ventana de carga
+    "export_hired_employees_task": {"soft_time_limit": 3 * 3600, "time_limit": 3 * 3600 + 300},
+}
+
+
+@dataclass(frozen=True)
+class WorkerProfile:
+    queues: tuple
+    concurrency: int
+    prefetch_multiplier: int
+
+
+WORKER_PROFILES = {
+    # Cargas largas: una tarea por proceso a la vez, el resto queda en la cola para otros workers
+    "facts": WorkerProfile(queues=("facts",), concurrency=4, prefetch_multiplier=1),
+    # Tareas cortas: algo de prefetch ahorra viajes al broker
+    "light": WorkerProfile(queues=(DEFAULT_QUEUE, "dimensions"), concurrency=4, prefetch_multiplier=4),
+    "reports": WorkerProfile(queues=("reports",), concurrency=1, prefetch_multiplier=1),
+    # Un solo worker para desarrollo local
+    "all": WorkerProfile(queues=(DEFAULT_QUEUE, "dimensions", "facts", "reports"), concurrency=4, prefetch_multiplier=1),
+}
+
+
+def task_routes() -> dict:
+    return {name: {"queue": queue} for name, queue in TASK_QUEUES.items()}
+
+
+def task_annotations() -> dict:
+    annotations = {}
+    for name, queue in TASK_QUEUES.items():
+        policy = QUEUE_POLICIES[queue]
+        annotations[name] = {
+            "acks_late": policy.acks_late,
+            "soft_time_limit": policy.soft_time_limit,
+            "time_limit": policy.time_limit,
+            **TASK_OVERRIDES.get(name, {}),
+        }
+    return annotations
+
+
+def visibility_timeout() -> int:
+    # Con Redis, un mensaje sin ack vuelve a entregarse pasado este tiempo: debe
+    # superar la tarea más larga o una carga en curso se ejecutaría dos veces
+    longest = max(a["time_limit"] for a in task_annotations().values())
+    return longest + 600
+
+
+def worker_queues(profile: WorkerProfile) -> list:
+    return [Queue(name, routing_key=name) for name in profile.queues]
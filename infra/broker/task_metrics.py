@@ -0,0 +1,45 @@
+import os
+import time
+
+from celery import signals
+from prometheus_client import start_http_server
+
+from config import CELERY_METRICS_PORT
+from infra.metrics import TASK_QUEUE_WAIT_SECONDS, TASK_RUNTIME_SECONDS, mark_process_dead, metrics_registry
+
+_started = {}
+
+
+@signals.before_task_publish.connect
+def _stamp_enqueued_at(headers=None, **kwargs):
+    # Los headers extra llegan al worker como atributos de task.request
+    if headers is not None:
+        headers.setdefault("enqueued_at", time.time())
+
+
+@signals.task_prerun.connect
+def _on_prerun(task_id=None, task=None, **kwargs):
+    _started[task_id] = time.perf_counter()
+    enqueued_at = getattr(task.request, "enqueued_at", None) if task else None
+    if enqueued_at:
+        TASK_QUEUE_WAIT_SECONDS.labels(task.name).observe(max(time.time() - float(enqueued_at), 0))
+
+
+@signals.task_postrun.connect
+def _on_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _started.pop(task_id, None)
+    if started is not None and task is not None:
+        TASK_RUNTIME_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - started)
+
+
+@signals.worker_init.connect
+def _start_exporter(**kwargs):
+    # El proceso principal del worker expone /metrics; los hijos del pool escriben
+    # en PROMETHEUS_MULTIPROC_DIR y el colector los agrega en cada scrape
+    if CELERY_METRICS_PORT:
+        start_http_server(CELERY_METRICS_PORT, registry=metrics_registry())
+
+
+@signals.worker_process_shutdown.connect
+def _on_process_shutdown(pid=None, **kwargs):
+    mark_process_dead(pid or os.getpid())
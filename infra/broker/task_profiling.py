@@ -0,0 +1,25 @@
+from celery import signals
+
+from infra.profiling import should_profile, start_profile, stop_profile
+
+_runs = {}
+
+
+def profile_requested(task) -> bool:
+    # apply_async(headers={"profile": True}): en el worker llega como atributo de task.request,
+    # en una ejecución local (apply) queda dentro de request.headers
+    return bool(getattr(task.request, "profile", None) or (task.request.headers or {}).get("profile"))
+
+
+@signals.task_prerun.connect
+def _start_profile(task_id=None, task=None, **kwargs):
+    if task is not None and should_profile(profile_requested(task)):
+        _runs[task_id] = start_profile(task.name)
+
+
+@signals.task_postrun.connect
+def _stop_profile(task_id=None, task=None, **kwargs):
+    run = _runs.pop(task_id, None)
+    if run is not None:
+        stop_profile(run)
+        print(f"Profile {run.name}[{task_id}]: {run.header()}")
@@ -0,0 +1,192 @@
+import json
+import time
+
+import redis
+from celery import signals
+
+from config import CELERY_BROKER_URL, CELERY_RESULT_BACKEND, TASK_REGISTRY_TTL
+
+SUMMARY_FIELDS = ("windows", "processed", "inserted", "already_exists", "errors", "rejections", "blob", "rows")
+STATUSES = ("PENDING", "STARTED", "RETRY", "SUCCESS", "FAILURE")
+FINISHED = ("SUCCESS", "FAILURE")
+
+# Lee una página del índice y el hash de cada tarea en un solo viaje a Redis. El cursor
+# es (puntaje, id): con el mismo puntaje Redis ordena por id descendente, así que de
+# las tareas empatadas con el cursor se saltean las que ya salieron (id >= el del cursor)
+LIST_SCRIPT = """
+local limit = tonumber(ARGV[3])
+local max_score = tonumber(ARGV[1])
+local out = {}
+local count = 0
+local offset = 0
+while count < limit do
+    local page = redis.call('ZREVRANGEBYSCORE', KEYS[1], ARGV[1], '-inf', 'WITHSCORES', 'LIMIT', offset, limit)
+    if #page == 0 then
+        break
+    end
+    offset = offset + #page / 2
+    for i = 1, #page, 2 do
+        local seen = tonumber(page[i + 1]) == max_score and page[i] >= ARGV[2]
+        if count < limit and not seen then
+            table.insert(out, page[i])
+            table.insert(out, page[i + 1])
+            table.insert(out, redis.call('HGETALL', ARGV[4] .. page[i]))
+            count = count + 1
+        end
+    end
+end
+return out
+"""
+
+
+def format_cursor(cursor) -> str:
+    score, task_id = cursor
+    return f"{score!r}:{task_id}"
+
+
+def parse_cursor(value: str):
+    """Convierte ``puntaje:id`` en (puntaje, id); un puntaje solo (cursor anterior) saltea todos sus empates."""
+    if not value:
+        return None
+    score, _, task_id = value.partition(":")
+    try:
+        return float(score), task_id
+    except ValueError:
+        raise ValueError(f"Invalid value for 'cursor': {value}")
+
+
+def compact_summary(result):
+    """Resumen chico para el registro: conteos sin listas de ids."""
+    if isinstance(result, dict):
+        return {k: result[k] for k in SUMMARY_FIELDS if k in result}
+    return result
+
+
+class TaskRegistry:
+    """Índice de tareas en Redis: un sorted set por hora de encolado y uno por estado.
+
+    Reemplaza el ``KEYS celery-task-meta-*`` de /task-list: la lectura es una
+    página del sorted set, ordenada por tiempo, sin recorrer todo el keyspace.
+    """
+
+    PREFIX = "task-registry"
+
+    def __init__(self, client, ttl: int = 7 * 24 * 3600):
+        self.redis = client
+        self.ttl = ttl
+        self._list_script = client.register_script(LIST_SCRIPT)
+
+    def _index_key(self, status: str = None) -> str:
+        if status is None:
+            return f"{self.PREFIX}:index"
+        return f"{self.PREFIX}:status:{status}"
+
+    def _task_key(self, task_id: str) -> str:
+        return f"{self.PREFIX}:task:{task_id}"
+
+    def record_enqueued(self, task_id: str, name: str, enqueued_at: float = None):
+        enqueued_at = enqueued_at or time.time()
+        pipe = self.redis.pipeline()
+        pipe.hset(self._task_key(task_id), mapping={"name": name, "status": "PENDING", "enqueued_at": enqueued_at})
+        pipe.expire(self._task_key(task_id), self.ttl)
+        pipe.zadd(self._index_key(), {task_id: enqueued_at})
+        pipe.zadd(self._index_key("PENDING"), {task_id: enqueued_at})
+        # Poda lo que ya expiró para que el índice no crezca sin límite
+        for key in [self._index_key(), self._index_key("done")] + [self._index_key(s) for s in STATUSES]:
+            pipe.zremrangebyscore(key, "-inf", enqueued_at - self.ttl)
+        pipe.execute()
+
+    def record_status(self, task_id: str, status: str, summary=None, name: str = None):
+        score = self.redis.zscore(self._index_key(), task_id)
+        now = time.time()
+        if score is None:
+            # Tarea publicada por un proceso sin el registro conectado
+            score = now
+            self.redis.zadd(self._index_key(), {task_id: score})
+
+        fields = {"status": status, "updated_at": now}
+        if name:
+            fields["name"] = name
+        if summary is not None:
+            fields["summary"] = json.dumps(summary, default=str)
+
+        pipe = self.redis.pipeline()
+        pipe.hset(self._task_key(task_id), mapping=fields)
+        pipe.expire(self._task_key(task_id), self.ttl)
+        for other in STATUSES:
+            pipe.zrem(self._index_key(other), task_id)
+        pipe.zadd(self._index_key(status), {task_id: score})
+        if status in FINISHED:
+            pipe.zadd(self._index_key("done"), {task_id: score})
+        pipe.execute()
+
+    def list(self, status: str = None, cursor: tuple = None, limit: int = 20):
+        """Devuelve (tareas, next_cursor) del más reciente al más viejo; el cursor es (puntaje, id)."""
+        max_score, after_id = (repr(cursor[0]), cursor[1]) if cursor is not None else ("+inf", "")
+        raw = self._list_script(keys=[self._index_key(status)], args=[max_score, after_id, limit, self._task_key("")])
+
+        tasks = []
+        last = None
+        for i in range(0, len(raw), 3):
+            task_id, score, fields = raw[i], float(raw[i + 1]), raw[i + 2]
+            last = (score, task_id)
+            if not fields:
+                continue  # el hash expiró antes que su entrada en el índice
+            data = dict(zip(fields[0::2], fields[1::2]))
+            tasks.append({
+                "id": task_id,
+                "name": data.get("name"),
+                "status": data.get("status"),
+                "enqueued_at": score,
+                "result": json.loads(data["summary"]) if "summary" in data else None,
+            })
+        next_cursor = last if len(raw) // 3 == limit else None
+        return tasks, next_cursor
+
+
+_registry = None
+
+
+def get_task_registry() -> TaskRegistry:
+    global _registry
+    if _registry is None:
+        url = CELERY_RESULT_BACKEND or CELERY_BROKER_URL or "redis://redis:6379/0"
+        kwargs = {"ssl_cert_reqs": "none"} if url.startswith("rediss://") else {}
+        client = redis.from_url(url, decode_responses=True, socket_connect_timeout=2, **kwargs)
+        _registry = TaskRegistry(client, TASK_REGISTRY_TTL)
+    return _registry
+
+
+def _safely(action, *args, **kwargs):
+    # El registro es auxiliar: si Redis falla no debe romper la publicación ni la tarea
+    try:
+        action(*args, **kwargs)
+    except redis.RedisError as e:
+        print("Task registry unavailable:", e)
+
+
+@signals.before_task_publish.connect
+def _on_publish(sender=None, headers=None, **kwargs):
+    if headers and headers.get("id"):
+        _safely(get_task_registry().record_enqueued, headers["id"], sender)
+
+
+@signals.task_prerun.connect
+def _on_prerun(task_id=None, task=None, **kwargs):
+    _safely(get_task_registry().record_status, task_id, "STARTED", name=task.name if task else None)
+
+
+@signals.task_success.connect
+def _on_success(sender=None, result=None, **kwargs):
+    _safely(get_task_registry().record_status, sender.request.id, "SUCCESS", compact_summary(result))
+
+
+@signals.task_failure.connect
+def _on_failure(task_id=None, exception=None, **kwargs):
+    _safely(get_task_registry().record_status, task_id, "FAILURE", {"error": str(exception)})
+
+
+@signals.task_retry.connect
+def _on_retry(request=None, **kwargs):
+    if request is not None:
+        _safely(get_task_registry().record_status, request.id, "RETRY")
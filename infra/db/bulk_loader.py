@@ -0,0 +1,111 @@
+import csv
+import io
+from abc import ABC, abstractmethod
+
+from sqlalchemy import insert
+
+import infra.db.connection as connection
+
+
+class BulkLoader(ABC):
+    """Puerto de carga masiva: sesiones y el INSERT más rápido disponible en cada motor.
+
+    ``insert_rows`` se ejecuta dentro de la transacción de la sesión recibida, así
+    el llamador decide cuándo confirmar (por ejemplo junto con hiring_stats).
+    """
+
+    dialect = None
+
+    def __init__(self, session_factory=None):
+        self._session_factory = session_factory
+
+    def session(self):
+        # Sin factory explícita se resuelve en cada llamada, para respetar reconfiguraciones (tests)
+        factory = self._session_factory or connection.SessionLocal
+        return factory()
+
+    @abstractmethod
+    def insert_rows(self, session, table, rows: list):
+        ...
+
+    @staticmethod
+    def is_row_error(error: Exception) -> bool:
+        """True si el fallo lo causa el contenido de alguna fila (PK duplicada, dato
+        inválido) y partir el lote puede aislarla; False para fallos de conexión o motor.
+
+        Se mira el nombre en la jerarquía porque COPY (psycopg) lanza la excepción
+        DBAPI sin el envoltorio de SQLAlchemy.
+        """
+        return any(cls.__name__ in ("IntegrityError", "DataError") for cls in type(error).__mro__)
+
+    @staticmethod
+    def is_transient_error(error: Exception) -> bool:
+        """True si el motor abortó la transacción por otra concurrente (deadlock o fallo
+        de serialización): el mismo lote puede confirmarse si se reintenta.
+
+        SQLSTATE 40001 (SQL Server 1205, serialización en PostgreSQL) o 40P01
+        (deadlock en PostgreSQL); pyodbc lo trae como primer argumento.
+        """
+        original = getattr(error, "orig", None) or error
+        state = getattr(original, "sqlstate", None) or getattr(original, "pgcode", None)
+        if state is None and original.args and isinstance(original.args[0], str):
+            state = original.args[0]
+        return state in ("40001", "40P01") or "deadlock" in str(original).lower()
+
+
+class SqliteBulkLoader(BulkLoader):
+    """executemany dentro de la transacción de la sesión (lo usan los tests)."""
+
+    dialect = "sqlite"
+
+    def insert_rows(self, session, table, rows: list):
+        if rows:
+            session.execute(insert(table), rows)
+
+
+class SqlServerBulkLoader(SqliteBulkLoader):
+    """Mismo executemany de Core; el engine se crea con fast_executemany=True, así
+    pyodbc envía todo el lote como un arreglo de parámetros en un solo viaje."""
+
+    dialect = "mssql"
+
+
+class PostgresBulkLoader(BulkLoader):
+    """COPY ... FROM STDIN con la conexión DBAPI de la sesión (psycopg2 o psycopg 3)."""
+
+    dialect = "postgresql"
+
+    def insert_rows(self, session, table, rows: list):
+        if not rows:
+            return
+        table = getattr(table, "__table__", table)
+        columns = list(rows[0].keys())
+        statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([row[c] for c in columns])
+        buffer.seek(0)
+
+        cursor = session.connection().connection.dbapi_connection.cursor()
+        try:
+            if hasattr(cursor, "copy_expert"):
+                cursor.copy_expert(statement, buffer)
+            else:
+                with cursor.copy(statement) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+
+ADAPTERS = {adapter.dialect: adapter for adapter in (SqliteBulkLoader, SqlServerBulkLoader, PostgresBulkLoader)}
+
+
+def get_bulk_loader(session_factory=None) -> BulkLoader:
+    factory = session_factory or connection.SessionLocal
+    # El sessionmaker de connection no tiene bind hasta la primera sesión
+    dialect = (factory.kw.get("bind") or connection.get_engine()).dialect.name
+    if dialect not in ADAPTERS:
+        raise ValueError(f"No bulk loader for dialect '{dialect}'")
+    return ADAPTERS[dialect](session_factory)
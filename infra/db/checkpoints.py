@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+from sqlalchemy import delete, select
+
+from infra.db.models import BlobSyncState, BlobSyncWindow, IngestionCheckpoint, IngestionJob
+
+
+def utcnow() -> datetime:
+    # Las columnas DateTime no guardan zona: se almacena UTC sin tzinfo
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def get_checkpoint(session, blob_name: str, etag: str):
+    return session.get(IngestionCheckpoint, (blob_name, etag))
+
+
+def save_checkpoint(session, blob_name: str, etag: str, rows_done: int, total_rows: int = None, completed: bool = False):
+    """Registra el avance confirmado de un blob dentro de la transacción de la sesión."""
+    checkpoint = get_checkpoint(session, blob_name, etag)
+    if checkpoint is None:
+        checkpoint = IngestionCheckpoint(blob_name=blob_name, etag=etag)
+        session.add(checkpoint)
+    checkpoint.rows_done = rows_done
+    if total_rows is not None:
+        checkpoint.total_rows = total_rows
+    checkpoint.completed = completed
+    checkpoint.updated_at = utcnow()
+    return checkpoint
+
+
+def clear_checkpoints(session, blob_names):
+    session.execute(delete(IngestionCheckpoint).where(IngestionCheckpoint.blob_name.in_(list(blob_names))))
+
+
+def create_job(session, job_id: str) -> IngestionJob:
+    now = utcnow()
+    job = IngestionJob(id=job_id, status="PENDING", rows_done=0, resumed_rows=0, created_at=now, updated_at=now)
+    session.add(job)
+    return job
+
+
+def update_job(session, job_id: str, **fields) -> IngestionJob:
+    job = session.get(IngestionJob, job_id)
+    if job is None:
+        raise ValueError(f"Ingestion job {job_id} not found")
+    for name, value in fields.items():
+        setattr(job, name, value)
+    job.updated_at = utcnow()
+    return job
+
+
+def get_sync_state(session, blob_name: str):
+    return session.get(BlobSyncState, blob_name)
+
+
+def get_sync_windows(session, blob_name: str) -> dict:
+    windows = session.execute(select(BlobSyncWindow).where(BlobSyncWindow.blob_name == blob_name)).scalars()
+    return {w.window_number: w for w in windows}
+
+
+def save_sync_window(session, blob_name: str, window_number: int, byte_offset: int, byte_length: int,
+                     row_count: int, content_hash: str, has_errors: bool, dimensions_fingerprint: str = None):
+    session.merge(BlobSyncWindow(blob_name=blob_name, window_number=window_number, byte_offset=byte_offset,
+                                 byte_length=byte_length, row_count=row_count, content_hash=content_hash,
+                                 has_errors=has_errors, dimensions_fingerprint=dimensions_fingerprint))
+
+
+def save_sync_state(session, blob_name: str, etag: str, byte_length: int, window_size: int, window_count: int):
+    session.merge(BlobSyncState(blob_name=blob_name, etag=etag, byte_length=byte_length, window_size=window_size,
+                                updated_at=utcnow()))
+    # Si el archivo se achicó, las ventanas que ya no existen no deben compararse en la próxima corrida
+    session.execute(delete(BlobSyncWindow).where(BlobSyncWindow.blob_name == blob_name,
+                                                 BlobSyncWindow.window_number >= window_count))
+
+
+def reset_sync_state(session, blob_name: str):
+    session.execute(delete(BlobSyncWindow).where(BlobSyncWindow.blob_name == blob_name))
+    session.execute(delete(BlobSyncState).where(BlobSyncState.blob_name == blob_name))
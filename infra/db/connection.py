@@ -1,8 +1,64 @@
+import os
+import threading
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
-from config import AZURE_SQL_CONNECTION_STRING
+from config import AZURE_SQL_CONNECTION_STRING, DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE
+
+_engine = None
+_engine_pid = None
+_lock = threading.Lock()
+
+
+def database_url() -> str:
+    # Formato sqlalchemy de conexión ODBC con SQL Server, salvo que DATABASE_URL indique otra base
+    return DATABASE_URL or f"mssql+pyodbc:///?odbc_connect={AZURE_SQL_CONNECTION_STRING}"
+
+
+def engine_options(url: str) -> dict:
+    options = {"pool_size": DB_POOL_SIZE, "max_overflow": DB_MAX_OVERFLOW,
+               "pool_pre_ping": True, "pool_recycle": DB_POOL_RECYCLE}
+    if make_url(url).drivername == "mssql+pyodbc":
+        # fast_executemany: pyodbc envía cada executemany como un arreglo de parámetros (ver infra/db/bulk_loader.py)
+        options["fast_executemany"] = True
+    return options
+
+
+def get_engine():
+    """Engine del proceso, creado en el primer uso y no al importar.
+
+    Con gunicorn --preload o el pool prefork de Celery los procesos hijos heredan
+    el engine del padre: las conexiones del pool no se comparten entre procesos,
+    así que en el primer uso de cada hijo se descartan sin cerrarlas.
+    """
+    global _engine, _engine_pid
+    pid = os.getpid()
+    if _engine is not None and _engine_pid == pid:
+        return _engine
+    with _lock:
+        if _engine is None:
+            url = database_url()
+            _engine = create_engine(url, **engine_options(url))
+        elif _engine_pid != pid:
+            _engine.dispose(close=False)
+        _engine_pid = pid
+    return _engine
+
+
+class LazySessionMaker(sessionmaker):
+    """sessionmaker que toma el engine recién al abrir una sesión."""
+
+    def __call__(self, **local_kw):
+        self.configure(bind=get_engine())
+        return super().__call__(**local_kw)
+
+
+SessionLocal = LazySessionMaker(autocommit=False, autoflush=False)
 
-# Formato sqlalchemy de conexión ODBC con SQL Server
-engine = create_engine(f"mssql+pyodbc:///?odbc_connect={AZURE_SQL_CONNECTION_STRING}")
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def __getattr__(name):
+    # connection.engine sigue disponible, pero se resuelve en el primer acceso
+    if name == "engine":
+        return get_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,97 @@
+from collections import Counter
+
+from sqlalchemy import select, insert, update, delete, func, extract, case, bindparam
+from sqlalchemy.exc import IntegrityError
+
+from infra.db.models import HiredEmployee, HiringStat
+
+
+def quarter_of(month: int) -> int:
+    return (month - 1) // 3 + 1
+
+
+def _group_hires(rows) -> Counter:
+    groups = Counter()
+    for row in rows:
+        hired_at = row["datetime"]
+        groups[(row["department_id"], row["job_id"], hired_at.year, quarter_of(hired_at.month))] += 1
+    return groups
+
+
+def increment_hiring_stats(session, rows):
+    """Suma las contrataciones de ``rows`` a hiring_stats dentro de la transacción de la sesión.
+
+    Una consulta trae las claves existentes del lote, un executemany las
+    incrementa y otro inserta las nuevas. Si otro worker insertó la misma clave
+    en paralelo, esas claves se reintentan una por una como UPDATE. Las claves se
+    escriben siempre ordenadas: ventanas concurrentes bloquean las mismas filas en
+    el mismo orden y se esperan en lugar de trabarse (deadlock).
+    """
+    groups = _group_hires(rows)
+    if not groups:
+        return
+
+    years = {key[2] for key in groups}
+    departments = {key[0] for key in groups}
+    existing = {
+        tuple(r) for r in session.execute(
+            select(HiringStat.department_id, HiringStat.job_id, HiringStat.year, HiringStat.quarter)
+            .where(HiringStat.year.in_(years), HiringStat.department_id.in_(departments))
+        )
+    }
+
+    ordered = sorted(groups.items())
+    updates = [_params(key, hires) for key, hires in ordered if key in existing]
+    inserts = [_params(key, hires) for key, hires in ordered if key not in existing]
+
+    if updates:
+        session.connection().execute(_increment_statement(), updates)
+    if inserts:
+        try:
+            with session.begin_nested():
+                session.execute(insert(HiringStat), [
+                    {"department_id": p["d"], "job_id": p["j"], "year": p["y"], "quarter": p["q"], "hires": p["n"]}
+                    for p in inserts
+                ])
+        except IntegrityError:
+            for p in inserts:
+                if session.connection().execute(_increment_statement(), p).rowcount == 0:
+                    session.execute(insert(HiringStat).values(
+                        department_id=p["d"], job_id=p["j"], year=p["y"], quarter=p["q"], hires=p["n"]))
+
+
+def _params(key, hires) -> dict:
+    department_id, job_id, year, quarter = key
+    return {"d": department_id, "j": job_id, "y": year, "q": quarter, "n": hires}
+
+
+def _increment_statement():
+    return (
+        update(HiringStat)
+        .where(HiringStat.department_id == bindparam("d"), HiringStat.job_id == bindparam("j"),
+               HiringStat.year == bindparam("y"), HiringStat.quarter == bindparam("q"))
+        .values(hires=HiringStat.hires + bindparam("n"))
+    )
+
+
+
+def rebuild_hiring_stats(session) -> int:
+    """Recalcula hiring_stats completo desde hired_employees (backfill)."""
+    year = extract("year", HiredEmployee.datetime)
+    month = extract("month", HiredEmployee.datetime)
+    quarter = case((month <= 3, 1), (month <= 6, 2), (month <= 9, 3), else_=4)
+
+    # El subquery evita repetir expresiones con parámetros en el GROUP BY (SQL Server no las empareja)
+    hires = select(
+        HiredEmployee.department_id, HiredEmployee.job_id, year.label("year"), quarter.label("quarter")
+    ).subquery()
+    aggregate = (
+        select(hires.c.department_id, hires.c.job_id, hires.c.year, hires.c.quarter, func.count())
+        .group_by(hires.c.department_id, hires.c.job_id, hires.c.year, hires.c.quarter)
+    )
+
+    session.execute(delete(HiringStat))
+    session.execute(insert(HiringStat).from_select(
+        ["department_id", "job_id", "year", "quarter", "hires"], aggregate))
+    session.commit()
+    return session.query(HiringStat).count()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, ForeignKey, Boolean, Text
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
@@ -33,3 +33,68 @@ class HiredEmployee(Base):
 
     department = relationship("Department", back_populates="employees")
     job = relationship("Job", back_populates="employees")
+
+
+class HiringStat(Base):
+    __tablename__ = 'hiring_stats'
+
+    # El año va primero en la PK porque los reportes siempre filtran por año
+    year = Column(Integer, primary_key=True, autoincrement=False)
+    department_id = Column(Integer, ForeignKey('departments.id'), primary_key=True, autoincrement=False)
+    job_id = Column(Integer, ForeignKey('jobs.id'), primary_key=True, autoincrement=False)
+    quarter = Column(Integer, primary_key=True, autoincrement=False)
+    hires = Column(Integer, nullable=False, default=0)
+
+
+class IngestionCheckpoint(Base):
+    __tablename__ = 'ingestion_checkpoints'
+
+    # La versión del blob es parte de la llave: si el archivo cambia, el avance anterior no aplica
+    blob_name = Column(String(255), primary_key=True)
+    etag = Column(String(100), primary_key=True)
+    rows_done = Column(Integer, nullable=False, default=0)
+    total_rows = Column(Integer)
+    completed = Column(Boolean, nullable=False, default=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class IngestionJob(Base):
+    __tablename__ = 'ingestion_jobs'
+
+    id = Column(String(36), primary_key=True)
+    status = Column(String(20), nullable=False)
+    stage = Column(String(50))
+    total_rows = Column(Integer)
+    rows_done = Column(Integer, nullable=False, default=0)
+    resumed_rows = Column(Integer, nullable=False, default=0)
+    summary = Column(Text)
+    error = Column(Text)
+    created_at = Column(DateTime, nullable=False)
+    started_at = Column(DateTime)
+    updated_at = Column(DateTime, nullable=False)
+    finished_at = Column(DateTime)
+
+
+class BlobSyncState(Base):
+    __tablename__ = 'blob_sync_state'
+
+    blob_name = Column(String(255), primary_key=True)
+    etag = Column(String(100), nullable=False)
+    byte_length = Column(BigInteger, nullable=False)
+    window_size = Column(Integer, nullable=False)
+    updated_at = Column(DateTime, nullable=False)
+
+
+class BlobSyncWindow(Base):
+    __tablename__ = 'blob_sync_windows'
+
+    blob_name = Column(String(255), primary_key=True)
+    window_number = Column(Integer, primary_key=True, autoincrement=False)
+    byte_offset = Column(BigInteger, nullable=False)
+    byte_length = Column(Integer, nullable=False)
+    row_count = Column(Integer, nullable=False)
+    content_hash = Column(String(40), nullable=False)
+    # Una ventana con inserciones fallidas se vuelve a procesar aunque su hash no cambie
+    has_errors = Column(Boolean, nullable=False, default=False)
+    # Con filas invalid_fk: la huella de las dimensiones al validarlas. Se reprocesa solo si cambió
+    dimensions_fingerprint = Column(String(16), nullable=True)
@@ -0,0 +1,67 @@
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+
+# Con PROMETHEUS_MULTIPROC_DIR definido, cada proceso (workers de gunicorn o del pool
+# de Celery) escribe sus valores en ese directorio y /metrics los agrega al leer.
+MULTIPROCESS = bool(os.getenv("PROMETHEUS_MULTIPROC_DIR"))
+
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 1e6, 1e7, 1e8, 1e9)
+
+BLOB_DOWNLOAD_SECONDS = Histogram(
+    "ingestion_blob_download_seconds", "Time spent downloading a blob or a byte range", ["blob"])
+BLOB_DOWNLOAD_BYTES = Histogram(
+    "ingestion_blob_download_bytes", "Bytes per blob download", ["blob"], buckets=SIZE_BUCKETS)
+BLOB_CACHE_REQUESTS = Counter(
+    "ingestion_blob_cache_requests_total", "Blob cache lookups", ["result"])
+BLOB_CACHE_BYTES_SAVED = Counter(
+    "ingestion_blob_cache_bytes_saved_total", "Bytes served from the local blob cache")
+DIMENSION_CACHE_REQUESTS = Counter(
+    "ingestion_dimension_cache_requests_total", "Dimension cache lookups by where they were served from", ["source"])
+CSV_PARSE_SECONDS = Histogram(
+    "ingestion_csv_parse_seconds", "Time spent parsing CSV into DataFrames", ["blob"])
+VALIDATION_SECONDS = Histogram(
+    "ingestion_validation_seconds", "Time spent validating a batch", ["table"])
+DB_INSERT_SECONDS = Histogram(
+    "ingestion_db_insert_seconds", "Time spent inserting and committing a batch", ["table"])
+ROWS_INSERTED = Counter(
+    "ingestion_rows_inserted_total", "Rows inserted", ["table"])
+ROWS_REJECTED = Counter(
+    "ingestion_rows_rejected_total", "Rows rejected", ["table", "reason"])
+BATCH_COMMIT_FAILURES = Counter(
+    "ingestion_batch_commit_failures_total", "Batches whose commit failed", ["table"])
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Flask request latency until the response is returned",
+    ["endpoint", "method", "status"])
+
+TASK_RUNTIME_SECONDS = Histogram(
+    "celery_task_runtime_seconds", "Celery task runtime", ["task", "state"],
+    buckets=(0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800))
+TASK_QUEUE_WAIT_SECONDS = Histogram(
+    "celery_task_queue_wait_seconds", "Time between publishing a task and a worker starting it", ["task"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300, 900))
+
+PROFILE_SQL_STATEMENTS = Histogram(
+    "profile_sql_statements", "SQL statements executed by a profiled request or task", ["target"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 1000, 5000))
+PROFILE_SQL_SECONDS = Histogram(
+    "profile_sql_seconds", "Time spent in SQL statements by a profiled request or task", ["target"])
+
+
+def metrics_registry():
+    if not MULTIPROCESS:
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+
+def render_metrics():
+    return generate_latest(metrics_registry()), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead(pid: int):
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
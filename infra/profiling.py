@@ -0,0 +1,113 @@
+import cProfile
+import contextvars
+import os
+import pstats
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from config import PROFILE_DIR, PROFILE_ON_DEMAND, PROFILE_SAMPLE_RATE
+from infra.metrics import PROFILE_SQL_SECONDS, PROFILE_SQL_STATEMENTS
+
+_current = contextvars.ContextVar("profile_run", default=None)
+
+
+@dataclass
+class ProfileRun:
+    """Perfil de un request o una tarea: CPU con cProfile y las sentencias SQL que ejecutó."""
+
+    name: str
+    started: float = field(default_factory=time.perf_counter)
+    profiler: cProfile.Profile = None
+    wall_seconds: float = None
+    statements: int = 0
+    sql_seconds: float = 0.0
+    # Sentencias por texto: la misma consulta repetida cientos de veces es un N+1
+    by_statement: Counter = field(default_factory=Counter)
+    path: str = None
+
+    def hot_function(self) -> str:
+        if self.profiler is None:
+            return None
+        stats = pstats.Stats(self.profiler)
+        if not stats.stats:
+            return None
+        (filename, line, function), _ = max(stats.stats.items(), key=lambda item: item[1][2])
+        return f"{os.path.basename(filename)}:{line}({function})"
+
+    def summary(self) -> dict:
+        repeated, times = self.by_statement.most_common(1)[0] if self.by_statement else (None, 0)
+        return {
+            "wall_ms": round(1000 * self.wall_seconds, 1) if self.wall_seconds is not None else None,
+            "sql_statements": self.statements,
+            "sql_ms": round(1000 * self.sql_seconds, 1),
+            "most_repeated_sql": repeated,
+            "most_repeated_sql_count": times,
+            "hot_function": self.hot_function(),
+            "file": self.path,
+        }
+
+    def header(self) -> str:
+        summary = self.summary()
+        summary["most_repeated_sql"] = None  # El texto del SQL no va en un header
+        return "; ".join(f"{key}={value}" for key, value in summary.items() if value is not None)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    # Sin perfil activo el costo es leer una ContextVar
+    if _current.get() is not None:
+        conn.info["profile_started"] = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    run = _current.get()
+    started = conn.info.pop("profile_started", None)
+    if run is None:
+        return
+    run.statements += 1
+    if started is not None:
+        run.sql_seconds += time.perf_counter() - started
+    run.by_statement[" ".join(statement.split())[:200]] += 1
+
+
+def should_profile(requested: bool) -> bool:
+    # Los pedidos explícitos solo valen con PROFILE_ON_DEMAND: en producción queda el muestreo
+    if requested and PROFILE_ON_DEMAND:
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def start_profile(name: str) -> ProfileRun:
+    run = ProfileRun(name)
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        run.profiler = profiler
+    except ValueError:
+        # Ya hay otro profiler activo en el proceso: quedan el tiempo y las sentencias SQL
+        pass
+    _current.set(run)
+    return run
+
+
+def stop_profile(run: ProfileRun) -> ProfileRun:
+    if run.profiler is not None:
+        run.profiler.disable()
+    _current.set(None)
+    run.wall_seconds = time.perf_counter() - run.started
+    PROFILE_SQL_STATEMENTS.labels(run.name).observe(run.statements)
+    PROFILE_SQL_SECONDS.labels(run.name).observe(run.sql_seconds)
+
+    if PROFILE_DIR and run.profiler is not None:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        safe_name = re.sub(r"[^\w.-]", "_", run.name)
+        run.path = os.path.join(PROFILE_DIR, f"{safe_name}-{os.getpid()}-{time.time_ns()}.prof")
+        run.profiler.dump_stats(run.path)
+    return run
@@ -1,20 +1,65 @@
-from azure.storage.blob import BlobServiceClient
+import io
 from config import AZURE_STORAGE_CONNECTION_STRING, AZURE_STORAGE_CONTAINER
 
 
+class ChunkedStream(io.RawIOBase):
+    """Adapta un iterador de chunks de bytes a un archivo de solo lectura."""
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._buffer = b""
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer:
+            try:
+                self._buffer = next(self._chunks)
+            except StopIteration:
+                return 0
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        return n
+
+
 class AzureBlobClient:
     def __init__(self):
+        # El SDK de Azure tarda en importarse: solo lo cargan los procesos que usan el blob
+        from azure.storage.blob import BlobServiceClient
+        if not AZURE_STORAGE_CONNECTION_STRING:
+            raise RuntimeError("AZURE_STORAGE_CONNECTION_STRING is not set")
         self.service_client = BlobServiceClient.from_connection_string(AZURE_STORAGE_CONNECTION_STRING)
         self.container_client = self.service_client.get_container_client(AZURE_STORAGE_CONTAINER)
+        self.container_name = AZURE_STORAGE_CONTAINER
 
     def upload_file(self, file_path: str, blob_name: str):
         with open(file_path, "rb") as data:
             self.container_client.upload_blob(name=blob_name, data=data, overwrite=True)
 
+    def upload_blob(self, blob_name: str, data):
+        self.container_client.upload_blob(name=blob_name, data=data, overwrite=True)
+
     def download_file(self, blob_name: str) -> bytes:
         blob_client = self.container_client.get_blob_client(blob_name)
         stream = blob_client.download_blob()
         return stream.readall()
 
+    def download_stream(self, blob_name: str, chunk_size: int = 4 * 1024 * 1024):
+        # Descarga una sola vez, por chunks, para parsear a medida que llegan los bytes
+        blob_client = self.container_client.get_blob_client(blob_name)
+        downloader = blob_client.download_blob(max_concurrency=1)
+        stream = io.BufferedReader(ChunkedStream(downloader.chunks()), buffer_size=chunk_size)
+        stream.etag = downloader.properties.etag  # La versión que se está descargando
+        return stream
+
+    def download_range(self, blob_name: str, offset: int, length: int = None) -> bytes:
+        blob_client = self.container_client.get_blob_client(blob_name)
+        return blob_client.download_blob(offset=offset, length=length).readall()
+
+    def get_etag(self, blob_name: str) -> str:
+        return self.container_client.get_blob_client(blob_name).get_blob_properties().etag
+
     def list_blobs(self):
         return [b.name for b in self.container_client.list_blobs()]
@@ -0,0 +1,181 @@
+import hashlib
+import io
+import mmap
+import os
+import tempfile
+
+from infra.metrics import BLOB_CACHE_BYTES_SAVED, BLOB_CACHE_REQUESTS
+
+
+class CachingStream(io.RawIOBase):
+    """Lee un stream del origen copiando cada chunk a un archivo temporal del cache.
+
+    Al llegar al final el archivo pasa a ser la entrada del cache con el ETag de
+    esa descarga; si se cierra antes (el parseo falló o se cortó) se descarta.
+    """
+
+    def __init__(self, stream, data_path: str, etag_path: str, etag: str, on_complete=None):
+        self._stream = stream
+        self._data_path = data_path
+        self._etag_path = etag_path
+        self._etag = etag
+        self._on_complete = on_complete
+        fd, self._tmp_path = tempfile.mkstemp(dir=os.path.dirname(data_path), suffix=".part")
+        self._out = os.fdopen(fd, "wb")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        chunk = self._stream.read(len(b))
+        if not chunk:
+            self._complete()
+            return 0
+        self._out.write(chunk)
+        b[:len(chunk)] = chunk
+        return len(chunk)
+
+    def _complete(self):
+        if self._out.closed:
+            return
+        self._out.close()
+        # Sin ETag mientras se reemplaza: nadie sirve el contenido nuevo con el ETag anterior
+        if os.path.exists(self._etag_path):
+            os.unlink(self._etag_path)
+        os.replace(self._tmp_path, self._data_path)
+        with open(self._etag_path, "w") as f:
+            f.write(self._etag)
+        if self._on_complete is not None:
+            self._on_complete()
+
+    def close(self):
+        if not self.closed:
+            try:
+                if not self._out.closed:
+                    self._out.close()
+                    os.unlink(self._tmp_path)
+            finally:
+                self._stream.close()
+        super().close()
+
+
+class CachedBlobClient:
+    """Cache en disco local delante de un cliente de blobs.
+
+    Cada blob se guarda por contenedor/nombre junto con el ETag de la descarga
+    que lo trajo; antes de servir un hit se revalida el ETag contra el origen.
+    Los hits se sirven como mmap de solo lectura, así pandas parsea directo desde
+    el page cache sin copiar el contenido a un ``bytes``; en un miss el contenido
+    se guarda a medida que se lee. Se desaloja por tamaño total, el menos usado primero.
+    """
+
+    def __init__(self, inner, cache_dir: str, max_bytes: int = 512 * 1024 * 1024):
+        self.inner = inner
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def __getattr__(self, name):
+        # upload_file, list_blobs, etc. van directo al cliente real
+        return getattr(self.inner, name)
+
+    def _paths(self, blob_name: str):
+        container = getattr(self.inner, "container_name", "") or ""
+        key = hashlib.sha1(f"{container}/{blob_name}".encode()).hexdigest()
+        base = os.path.join(self.cache_dir, key)
+        return base + ".blob", base + ".etag"
+
+    @staticmethod
+    def _read_etag(path: str):
+        try:
+            with open(path) as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _evict(self, keep: str):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".blob"):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            os.unlink(path)
+            etag_path = path[:-len(".blob")] + ".etag"
+            if os.path.exists(etag_path):
+                os.unlink(etag_path)
+            total -= size
+
+    def _lookup(self, blob_name: str):
+        """Ruta del blob en cache si su ETag sigue vigente en el origen, o None (miss)."""
+        data_path, etag_path = self._paths(blob_name)
+        if os.path.exists(data_path) and self._read_etag(etag_path) == self.inner.get_etag(blob_name):
+            size = os.path.getsize(data_path)
+            self.hits += 1
+            self.bytes_saved += size
+            BLOB_CACHE_REQUESTS.labels("hit").inc()
+            BLOB_CACHE_BYTES_SAVED.inc(size)
+            os.utime(data_path)  # marca de uso para el LRU
+            return data_path
+        self.misses += 1
+        BLOB_CACHE_REQUESTS.labels("miss").inc()
+        return None
+
+    @staticmethod
+    def _map(data_path: str):
+        with open(data_path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return io.BytesIO(b"")
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _download(self, blob_name: str, chunk_size: int):
+        stream = self.inner.download_stream(blob_name, chunk_size)
+        # El ETag es el de esta misma descarga: uno pedido antes podría ser de otra versión
+        etag = getattr(stream, "etag", None)
+        if etag is None:
+            return stream
+        data_path, etag_path = self._paths(blob_name)
+        caching = CachingStream(stream, data_path, etag_path, etag, lambda: self._evict(keep=data_path))
+        return io.BufferedReader(caching, buffer_size=chunk_size)
+
+    def download_range(self, blob_name: str, offset: int, length: int = None) -> bytes:
+        # Un rango no justifica bajar el blob completo: solo se sirve del cache si ya está vigente
+        data_path, etag_path = self._paths(blob_name)
+        if os.path.exists(data_path) and self._read_etag(etag_path) == self.inner.get_etag(blob_name):
+            with open(data_path, "rb") as f:
+                f.seek(offset)
+                content = f.read(-1 if length is None else length)
+            self.hits += 1
+            self.bytes_saved += len(content)
+            BLOB_CACHE_REQUESTS.labels("hit").inc()
+            BLOB_CACHE_BYTES_SAVED.inc(len(content))
+            return content
+        return self.inner.download_range(blob_name, offset, length)
+
+    def download_file(self, blob_name: str):
+        # El mmap se comporta como bytes (len, slicing) y como archivo (read/seek); quien lo usa lo cierra
+        data_path = self._lookup(blob_name)
+        if data_path is not None:
+            return self._map(data_path)
+        with self._download(blob_name, 1024 * 1024) as stream:
+            return stream.read()
+
+    def download_stream(self, blob_name: str, chunk_size: int = 4 * 1024 * 1024):
+        data_path = self._lookup(blob_name)
+        if data_path is not None:
+            return self._map(data_path)
+        # En un miss se parsea a medida que llegan los bytes y a la vez se guardan en el cache
+        return self._download(blob_name, chunk_size)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "bytes_saved": self.bytes_saved}
@@ -0,0 +1,139 @@
+import hashlib
+import os
+import tempfile
+
+import numpy as np
+
+
+class RowOffsetIndex:
+    """Offsets en bytes de una fila cada ``stride`` filas de un CSV sin header.
+
+    Con el índice, una ventana [start, start + limit) se resuelve en un rango de
+    bytes que cubre a lo sumo ``limit + 2 * stride`` filas, sin importar en qué
+    parte del archivo esté la ventana.
+    """
+
+    def __init__(self, etag: str, stride: int, offsets, total_rows: int, size: int):
+        self.etag = etag
+        self.stride = stride
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.total_rows = total_rows
+        self.size = size
+
+    @classmethod
+    def build(cls, stream, etag: str, stride: int = 256, chunk_size: int = 4 * 1024 * 1024):
+        offsets = [0]
+        position = 0
+        rows = 0
+        last = b"\n"
+        while chunk := stream.read(chunk_size):
+            newlines = np.flatnonzero(np.frombuffer(chunk, dtype=np.uint8) == ord("\n"))
+            # La fila N empieza justo después del salto de línea N - 1
+            row_numbers = rows + np.arange(1, len(newlines) + 1)
+            starts = position + newlines[row_numbers % stride == 0] + 1
+            offsets.extend(starts.tolist())
+            rows += len(newlines)
+            position += len(chunk)
+            last = chunk[-1:]
+
+        total_rows = rows if last == b"\n" else rows + 1
+        # Un salto de línea final no abre una fila nueva
+        offsets = [o for o in offsets if o < position]
+        return cls(etag, stride, offsets, total_rows, position)
+
+    def byte_range(self, start: int, limit: int):
+        """Devuelve (offset, length, skip): length None significa hasta el final del blob."""
+        first_block = start // self.stride
+        offset = int(self.offsets[first_block]) if first_block < len(self.offsets) else self.size
+        skip = start - first_block * self.stride
+
+        end_block = -(-(start + limit) // self.stride)
+        if end_block >= len(self.offsets):
+            return offset, None, skip
+        return offset, int(self.offsets[end_block]) - offset, skip
+
+    def save(self, path: str):
+        # Un temporal propio por proceso: varias tareas pueden construir el mismo índice a la vez
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, offsets=self.offsets, etag=np.array(self.etag),
+                         meta=np.array([self.stride, self.total_rows, self.size], dtype=np.int64))
+            os.replace(tmp_path, path)
+        except OSError:
+            os.unlink(tmp_path)
+            # Otro proceso guardó el mismo índice primero: el contenido es idéntico
+            if not os.path.exists(path):
+                raise
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            stride, total_rows, size = (int(v) for v in data["meta"])
+            return cls(str(data["etag"]), stride, data["offsets"], total_rows, size)
+
+
+def iter_row_windows(stream, window_size: int, first_number: int = 0, base_offset: int = 0,
+                     chunk_size: int = 4 * 1024 * 1024):
+    """Corta un CSV sin header en ventanas de ``window_size`` filas.
+
+    Devuelve (número de ventana, offset en bytes, bytes de la ventana) sin parsear
+    el CSV: solo se buscan los saltos de línea.
+    """
+    number = first_number
+    offset = base_offset
+    pending = b""
+    while chunk := stream.read(chunk_size):
+        data = pending + chunk
+        newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+        start = 0
+        for end in (newlines[window_size - 1::window_size] + 1).tolist():
+            yield number, offset + start, data[start:end]
+            number += 1
+            start = end
+        offset += start
+        pending = data[start:]
+    if pending:
+        yield number, offset, pending
+
+
+class RowIndexStore:
+    """Persiste los índices en disco, uno por blob y ETag."""
+
+    def __init__(self, index_dir: str, stride: int = 256):
+        self.index_dir = index_dir
+        self.stride = stride
+        os.makedirs(index_dir, exist_ok=True)
+
+    @staticmethod
+    def _prefix(blob_name: str) -> str:
+        return hashlib.sha1(blob_name.encode()).hexdigest()
+
+    def _path(self, blob_name: str, etag: str) -> str:
+        etag_key = hashlib.sha1(etag.encode()).hexdigest()[:16]
+        return os.path.join(self.index_dir, f"{self._prefix(blob_name)}.{etag_key}.rowidx.npz")
+
+    def get(self, blob_client, blob_name: str) -> RowOffsetIndex:
+        etag = blob_client.get_etag(blob_name)
+        path = self._path(blob_name, etag)
+        try:
+            return RowOffsetIndex.load(path)
+        except FileNotFoundError:
+            pass
+
+        print(f"Building row offset index for {blob_name}...")
+        stream = blob_client.download_stream(blob_name)
+        try:
+            index = RowOffsetIndex.build(stream, etag, self.stride)
+        finally:
+            stream.close()
+        # Los índices de otras versiones del blob ya no sirven; los temporales son de otros procesos
+        for name in os.listdir(self.index_dir):
+            other = os.path.join(self.index_dir, name)
+            if name.startswith(self._prefix(blob_name) + ".") and name.endswith(".rowidx.npz") and other != path:
+                try:
+                    os.unlink(other)
+                except FileNotFoundError:
+                    pass  # ya lo borró otro proceso
+        index.save(path)
+        return index
@@ -1,11 +1,13 @@
 from flask import Flask
 from flask_cors import CORS
 from api.routes import router
+from api.cli import rebuild_hiring_stats_command
 
 def create_app():
     app = Flask(__name__)
     CORS(app)
     app.register_blueprint(router)
+    app.cli.add_command(rebuild_hiring_stats_command)
 
     return app
 app = create_app()
@@ -1,3 +1,4 @@
+import os
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -12,18 +13,32 @@ def reset_database():
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
 
+@pytest.fixture(autouse=True)
+def clear_report_cache():
+    from core.analytics import report_engine
+    from core.report_cache import report_cache
+    report_cache.clear_local()
+    report_engine.clear()
+
+@pytest.fixture(autouse=True)
+def clear_dimension_cache():
+    from core.dimension_cache import dimension_cache
+    dimension_cache.clear_local()
+
 
 engine = create_engine("sqlite:///:memory:")
 SessionLocal = sessionmaker(bind=engine)
 
-db_conn.engine = engine
+# get_engine() lee _engine: asignar db_conn.engine solo taparía el __getattr__ del módulo
+db_conn._engine, db_conn._engine_pid = engine, os.getpid()
 db_conn.SessionLocal = SessionLocal
 
 Base.metadata.create_all(engine)
 
 @pytest.fixture
 def client(monkeypatch):
-    monkeypatch.setattr("infra.db.connection.engine", engine)
+    monkeypatch.setattr("infra.db.connection._engine", engine)
+    monkeypatch.setattr("infra.db.connection._engine_pid", os.getpid())
     monkeypatch.setattr("infra.db.connection.SessionLocal", SessionLocal)
     app = create_app()
     app.config["TESTING"] = True
@@ -1,5 +1,35 @@
+import os
+
+
 class MockAzureBlobClient:
+    def __init__(self, base_dir: str = "tests/mocks"):
+        self.base_dir = base_dir
+
+    def upload_blob(self, blob_name: str, data):
+        path = os.path.join(self.base_dir, blob_name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(data if isinstance(data, bytes) else data.read())
+
     def download_file(self, blob_name: str) -> bytes:
-        path = f"tests/mocks/{blob_name}"
+        path = os.path.join(self.base_dir, blob_name)
         with open(path, "rb") as f:
             return f.read()
+
+    def download_stream(self, blob_name: str, chunk_size: int = 4 * 1024 * 1024):
+        stream = open(os.path.join(self.base_dir, blob_name), "rb")
+        stream.etag = self._etag(stream.name)
+        return stream
+
+    def download_range(self, blob_name: str, offset: int, length: int = None) -> bytes:
+        with open(os.path.join(self.base_dir, blob_name), "rb") as f:
+            f.seek(offset)
+            return f.read(-1 if length is None else length)
+
+    def get_etag(self, blob_name: str) -> str:
+        return self._etag(os.path.join(self.base_dir, blob_name))
+
+    @staticmethod
+    def _etag(path: str) -> str:
+        stat = os.stat(path)
+        return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
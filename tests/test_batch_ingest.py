@@ -0,0 +1,91 @@
+import io
+import json
+import pytest
+from api.streaming import BatchTooLarge, CSV, NDJSON, read_rows
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job, HiredEmployee
+
+@pytest.fixture
+def dimensions(client):
+    client.post("/ingest/departments", data="1,HR\n2,IT\n", content_type=CSV)
+    client.post("/ingest/jobs", data='{"id": 1, "job": "Manager"}\n', content_type=NDJSON)
+
+def ndjson(rows):
+    return "".join(json.dumps(row) + "\n" for row in rows)
+
+def test_ingest_dimensions_from_csv_and_ndjson(client):
+    response = client.post("/ingest/departments", data="1,HR\n2, IT \n", content_type=CSV)
+    assert response.status_code == 200
+    assert response.get_json() == {"processed": 2, "inserted": 2, "already_exists": 0}
+
+    response = client.post("/ingest/jobs", data=ndjson([{"id": 1, "job": "Manager"}, {"id": 2, "job": "Engineer"}]),
+                           content_type="application/x-ndjson; charset=utf-8")
+    assert response.get_json()["inserted"] == 2
+
+    # Repetir el lote no duplica filas
+    assert client.post("/ingest/departments", data="1,HR\n", content_type=CSV).get_json()["already_exists"] == 1
+
+    session = SessionLocal()
+    assert [d.department for d in session.query(Department).order_by(Department.id)] == ["HR", "IT"]
+    assert session.query(Job).count() == 2
+    session.close()
+
+def test_ingest_employees_reports_rejected_rows(client, dimensions):
+    rows = [
+        {"id": 1, "name": "Ana", "datetime": "2021-01-10T10:00:00Z", "department_id": 1, "job_id": 1},
+        {"id": 2, "name": "Bob", "datetime": "2021-04-10T10:00:00Z", "department_id": 9, "job_id": 1},
+        {"id": 3, "name": "Eve", "datetime": "2021-07-10T10:00:00Z", "department_id": 2},
+    ]
+
+    response = client.post("/ingest/hired_employees", data=ndjson(rows), content_type=NDJSON)
+
+    assert response.status_code == 200
+    assert response.get_json() == {"processed": 3, "inserted": 1, "already_exists": 0, "errors": 2, "error_ids": [2, 3]}
+
+    body = "1,Ana,2021-01-10T10:00:00Z,1,1\n4,Dan,2021-02-10T10:00:00Z,2,1\n"
+    summary = client.post("/ingest/hired_employees", data=body, content_type=CSV).get_json()
+    assert (summary["inserted"], summary["already_exists"]) == (1, 1)
+
+    session = SessionLocal()
+    assert sorted(e.id for e in session.query(HiredEmployee.id)) == [1, 4]
+    session.close()
+
+def test_ingest_rejects_invalid_batches(client):
+    assert client.post("/ingest/departments", data="", content_type=CSV).status_code == 400
+    assert client.post("/ingest/departments", data="1,HR\nx,\n", content_type=CSV).status_code == 400
+    assert client.post("/ingest/jobs", data="[1, 2]\n", content_type=NDJSON).status_code == 400
+    assert client.post("/ingest/jobs", data="1,Manager\n", content_type="application/json").status_code == 415
+    assert client.post("/ingest/salaries", data="1,2\n", content_type=CSV).status_code == 404
+
+    too_many = "".join(f"{i},Dept {i}\n" for i in range(1, 1002))
+    response = client.post("/ingest/departments", data=too_many, content_type=CSV)
+    assert response.status_code == 413
+
+    session = SessionLocal()
+    assert session.query(Department).count() == 0
+    session.close()
+
+class CountingStream(io.BytesIO):
+    def __init__(self, content):
+        super().__init__(content)
+        self.bytes_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.bytes_read += len(chunk)
+        return chunk
+
+    def readline(self, size=-1):
+        line = super().readline(size)
+        self.bytes_read += len(line)
+        return line
+
+@pytest.mark.parametrize("mimetype", [CSV, NDJSON])
+def test_oversized_body_is_not_read_to_the_end(mimetype):
+    rows = [{"id": i, "department": f"Department {i}"} for i in range(1, 200_001)]
+    content = ndjson(rows) if mimetype == NDJSON else "".join(f"{r['id']},{r['department']}\n" for r in rows)
+    stream = CountingStream(content.encode())
+
+    with pytest.raises(BatchTooLarge):
+        read_rows(stream, mimetype, ["id", "department"], max_rows=1000)
+    assert stream.bytes_read < len(content) / 4
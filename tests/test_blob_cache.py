@@ -0,0 +1,75 @@
+import os
+import shutil
+import pytest
+import pandas as pd
+from infra.storage.blob_cache import CachedBlobClient
+from tests.mocks.blob_client import MockAzureBlobClient
+
+FIXTURES = "Documentation/data_challenge_files"
+
+def _client(tmp_path, max_bytes=10 * 1024 * 1024):
+    source = tmp_path / "blobs"
+    shutil.copytree(FIXTURES, source)
+    return CachedBlobClient(MockAzureBlobClient(str(source)), str(tmp_path / "cache"), max_bytes), source
+
+def test_second_read_is_served_from_cache(tmp_path):
+    cache, _ = _client(tmp_path)
+
+    first = cache.download_file("departments.csv")
+    second = cache.download_file("departments.csv")
+
+    assert first[:] == second[:]
+    assert cache.stats() == {"hits": 1, "misses": 1, "bytes_saved": len(second)}
+    df = pd.read_csv(second, header=None, names=["id", "department"])
+    assert len(df) == 12
+
+def test_changed_etag_refetches(tmp_path):
+    cache, source = _client(tmp_path)
+    cache.download_file("jobs.csv")
+
+    with open(source / "jobs.csv", "ab") as f:
+        f.write(b"184,New Job\n")
+    os.utime(source / "jobs.csv", ns=(1, 1))
+
+    content = cache.download_file("jobs.csv")
+    assert content[:].endswith(b"184,New Job\n")
+    assert cache.stats()["misses"] == 2
+
+def test_evicts_least_recently_used(tmp_path):
+    cache, _ = _client(tmp_path, max_bytes=90_000)
+    cache.download_file("departments.csv")
+    cache.download_file("hired_employees.csv")
+
+    cached = [name for name in os.listdir(tmp_path / "cache") if name.endswith(".blob")]
+    assert len(cached) == 1
+    cache.download_file("hired_employees.csv")
+    assert cache.stats()["hits"] == 1
+
+def test_stream_miss_is_cached_while_it_is_read(tmp_path, monkeypatch):
+    cache, source = _client(tmp_path)
+    # Sin copia en cache no hace falta pedir el ETag aparte: sale de la descarga
+    monkeypatch.setattr(cache.inner, "get_etag", lambda name: pytest.fail("should use the download's ETag"))
+
+    with cache.download_stream("jobs.csv") as stream:
+        first = stream.read(100)
+        assert not [name for name in os.listdir(tmp_path / "cache") if name.endswith(".blob")]
+        first += stream.read()
+    assert first == (source / "jobs.csv").read_bytes()
+
+    monkeypatch.undo()
+    monkeypatch.setattr(cache.inner, "download_stream", lambda *a, **k: pytest.fail("should be a hit"))
+    second = cache.download_stream("jobs.csv")
+    assert second[:] == first
+    second.close()
+    assert cache.stats()["hits"] == 1
+
+def test_partially_read_stream_is_not_cached(tmp_path):
+    cache, _ = _client(tmp_path)
+
+    stream = cache.download_stream("hired_employees.csv")
+    stream.read(1024)
+    stream.close()
+
+    assert os.listdir(tmp_path / "cache") == []
+    cache.download_stream("hired_employees.csv").close()
+    assert cache.stats() == {"hits": 0, "misses": 2, "bytes_saved": 0}
@@ -0,0 +1,56 @@
+import tracemalloc
+import pytest
+from benchmarks.synthetic import SyntheticSpec, generate_employees
+from core.services import DataIngestionService, chunk_rows_for_budget
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job, HiredEmployee, HiringStat
+from tests.mocks.blob_client import MockAzureBlobClient
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+@pytest.fixture(autouse=True)
+def dimensions():
+    session = SessionLocal()
+    session.add_all([Department(id=i, department=f"Department {i}") for i in range(1, 5)])
+    session.add_all([Job(id=i, job=f"Job {i}") for i in range(1, 11)])
+    session.commit()
+    session.close()
+
+def peak_streaming_memory(tmp_path, rows: int, batch_size: int) -> int:
+    tmp_path.mkdir()
+    session = SessionLocal()
+    session.query(HiredEmployee).delete()
+    session.query(HiringStat).delete()
+    session.commit()
+    session.close()
+    # Pocas dimensiones: las claves de hiring_stats (que sí crecen con ellas) se completan enseguida
+    spec = SyntheticSpec(employees=rows, departments=4, jobs=10, missing_ratio=0.01, invalid_fk_ratio=0.01, seed=rows)
+    generate_employees(spec).to_csv(tmp_path / "hired_employees.csv", index=False, header=False)
+    service = DataIngestionService(blob_client=MockAzureBlobClient(str(tmp_path)))
+
+    tracemalloc.start()
+    try:
+        for _ in service.stream_employees(batch_size=batch_size):
+            pass
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def test_chunk_rows_follow_the_memory_budget():
+    assert chunk_rows_for_budget(64 * 1024 * 1024) == 65536
+    assert chunk_rows_for_budget(1024) == 1000
+
+def test_streaming_peak_memory_does_not_grow_with_the_file(tmp_path):
+    # Ambas corridas superan los primeros lotes, donde se llenan los caches (acotados) de SQLAlchemy
+    small = peak_streaming_memory(tmp_path / "small", 4000, 500)
+    large = peak_streaming_memory(tmp_path / "large", 12000, 500)
+
+    session = SessionLocal()
+    assert session.query(HiredEmployee).count() > 11000
+    session.close()
+    # Tres veces más filas, el mismo lote: el pico lo marca el lote, no el archivo
+    assert large < small * 1.5
+    assert large < 4 * 1024 * 1024
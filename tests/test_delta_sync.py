@@ -0,0 +1,114 @@
+import pytest
+from core.dimension_cache import dimension_cache
+from core.services import DataIngestionService
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job, HiredEmployee
+from tests.mocks.blob_client import MockAzureBlobClient
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+def employees_csv(ids, department_id=1):
+    return "".join(f"{i},Employee {i},2021-05-01T10:00:00Z,{department_id},1\n" for i in ids)
+
+@pytest.fixture
+def blob_file(tmp_path):
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Job(id=1, job="Engineer")])
+    session.commit()
+    session.close()
+
+    path = tmp_path / "hired_employees.csv"
+    path.write_text(employees_csv(range(1, 11)))
+    return path
+
+@pytest.fixture
+def service(blob_file):
+    return DataIngestionService(blob_client=MockAzureBlobClient(str(blob_file.parent)))
+
+def sync(service, window_size=4, **kwargs):
+    return list(service.sync_employees(window_size=window_size, **kwargs))
+
+def employee_count():
+    session = SessionLocal()
+    count = session.query(HiredEmployee).count()
+    session.close()
+    return count
+
+def test_unchanged_blob_skips_every_window_without_downloading(service, monkeypatch):
+    first = sync(service)
+    assert [w["skipped"] for w in first] == [False, False, False]
+    assert sum(w["inserted"] for w in first) == 10
+
+    monkeypatch.setattr(service.blob_client, "download_stream", lambda *a, **k: pytest.fail("should not download"))
+    monkeypatch.setattr(service.blob_client, "download_range", lambda *a, **k: pytest.fail("should not download"))
+    second = sync(service)
+    assert [w["skipped"] for w in second] == [True, True, True]
+    assert sum(w["rows"] for w in second) == 10
+
+def test_appended_rows_only_download_the_tail(service, blob_file, monkeypatch):
+    sync(service)
+    with open(blob_file, "a") as f:
+        f.write(employees_csv(range(11, 16)))
+    monkeypatch.setattr(service.blob_client, "download_stream", lambda *a, **k: pytest.fail("should not rescan"))
+
+    windows = sync(service, assume_append=True)
+
+    # La ventana 2 (parcial) se completa con las filas nuevas y se procesa junto a la 3
+    assert [(w["window"], w["skipped"]) for w in windows] == [(0, True), (1, True), (2, False), (3, False)]
+    assert sum(w.get("inserted", 0) for w in windows) == 5
+    assert sum(w.get("already_exists", 0) for w in windows) == 2
+    assert employee_count() == 15
+
+def test_changed_window_is_the_only_one_reprocessed(service, blob_file):
+    sync(service)
+    content = blob_file.read_text().replace("Employee 6,", "Employee 6 Jr,")
+    blob_file.write_text(content)
+
+    windows = sync(service)
+
+    assert [(w["window"], w["skipped"]) for w in windows] == [(0, True), (1, False), (2, True)]
+
+def test_same_length_edit_in_an_earlier_window_is_reprocessed(service, blob_file):
+    sync(service)
+    # Mismo largo en bytes y con filas agregadas: solo el hash de la ventana 1 lo detecta
+    content = blob_file.read_text().replace("Employee 6,", "Employee X,")
+    blob_file.write_text(content + employees_csv(range(11, 13)))
+
+    windows = sync(service)
+
+    assert [(w["window"], w["skipped"]) for w in windows] == [(0, True), (1, False), (2, False)]
+    session = SessionLocal()
+    assert session.get(HiredEmployee, 6).name == "Employee 6"  # ya existía: se informa, no se pisa
+    session.close()
+    assert windows[1]["already_exists"] == 4
+    assert employee_count() == 12
+
+def test_unchanged_blob_with_invalid_rows_is_fully_skipped(service, blob_file, monkeypatch):
+    # Faltantes, fk inválida y duplicado: rechazos que se repetirían igual en otra corrida
+    blob_file.write_text(employees_csv(range(1, 4)) + "4,,2021-05-01T10:00:00Z,1,1\n"
+                         + employees_csv(range(5, 7), department_id=9) + employees_csv([7, 7]))
+    first = sync(service)
+    assert sum(w["errors"] for w in first) == 4
+
+    monkeypatch.setattr(service.blob_client, "download_stream", lambda *a, **k: pytest.fail("should not download"))
+    monkeypatch.setattr(service.blob_client, "download_range", lambda *a, **k: pytest.fail("should not download"))
+    assert [w["skipped"] for w in sync(service)] == [True, True]
+
+def test_window_with_rejected_rows_is_retried(service, blob_file):
+    blob_file.write_text(employees_csv(range(1, 5)) + employees_csv(range(5, 9), department_id=2))
+    first = sync(service)
+    assert first[1]["errors"] == 4
+
+    session = SessionLocal()
+    session.add(Department(id=2, department="IT"))
+    session.commit()
+    session.close()
+    dimension_cache.bump_version()  # lo que hace load_departments al confirmar
+
+    windows = sync(service)
+    assert [(w["window"], w["skipped"]) for w in windows] == [(0, True), (1, False)]
+    assert windows[1]["inserted"] == 4
+    assert employee_count() == 8
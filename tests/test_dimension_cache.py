@@ -0,0 +1,89 @@
+import pytest
+from core.dimension_cache import DimensionCache, Dimensions
+from core.reports import ReportFilters, hired_by_quarter_statement, hiring_above_average_statement
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+@pytest.fixture(autouse=True)
+def dimensions():
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Department(id=2, department="IT")])
+    session.add(Job(id=1, job="Manager"))
+    session.commit()
+    session.close()
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key, 0)) + 1
+        return self.data[key]
+
+class CountingSessions:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return SessionLocal()
+
+def test_dimensions_are_loaded_once_per_version():
+    cache = DimensionCache()
+    sessions = CountingSessions()
+
+    first = cache.get(sessions)
+    second = cache.get(sessions)
+
+    assert first is second
+    assert first.departments == {1: "HR", 2: "IT"}
+    assert 2 in first.department_ids and 3 not in first.department_ids
+    assert sessions.calls == 1
+
+def test_bump_version_reloads_new_rows():
+    cache = DimensionCache()
+    cache.get()
+
+    session = SessionLocal()
+    session.add(Department(id=3, department="Sales"))
+    session.commit()
+    session.close()
+    assert 3 not in cache.get().departments
+
+    cache.bump_version()
+    assert cache.get().departments[3] == "Sales"
+
+def test_processes_share_dimensions_through_redis():
+    shared = FakeRedis()
+    api, worker = DimensionCache(), DimensionCache()
+    api.redis = worker.redis = shared
+
+    api.get()
+    # El worker no toca la base: la copia de esta versión ya está en Redis
+    assert worker.get(lambda: pytest.fail("should be served from Redis")).jobs == {1: "Manager"}
+
+    session = SessionLocal()
+    session.add(Job(id=2, job="Engineer"))
+    session.commit()
+    session.close()
+    api.bump_version()
+
+    assert worker.get().jobs == {1: "Manager", 2: "Engineer"}
+
+def test_report_statements_skip_dimension_joins():
+    dimensions = Dimensions(version=1, departments={1: "HR"}, jobs={1: "Manager"})
+    for statement in (hired_by_quarter_statement(ReportFilters(), dimensions, "HR", "Manager"),
+                      hiring_above_average_statement(ReportFilters())):
+        sql = str(statement)
+        assert "departments" not in sql and "jobs" not in sql
@@ -0,0 +1,84 @@
+import csv
+import gzip
+import io
+import json
+import tracemalloc
+from contextlib import nullcontext
+from datetime import datetime, timedelta
+import pytest
+from core.export import ExportFilters, export_chunks, gzip_chunks
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job, HiredEmployee
+from tests.mocks.blob_client import MockAzureBlobClient
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+    monkeypatch.setattr("api.routes.SessionLocal", test_SessionLocal)
+
+def seed(rows: int):
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Department(id=2, department="IT"), Job(id=1, job="Manager")])
+    start = datetime(2021, 1, 1, 10)
+    session.bulk_insert_mappings(HiredEmployee, [
+        {"id": i, "name": f"Employee {i}", "datetime": start + timedelta(days=i % 730), "department_id": 1 + i % 2, "job_id": 1}
+        for i in range(1, rows + 1)])
+    session.commit()
+    session.close()
+
+def test_export_streams_gzip_csv_with_filters(client):
+    seed(100)
+
+    response = client.get("/export/hired-employees?department_id=2&start_date=2021-01-01&end_date=2021-02-01&names=true")
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/gzip"
+    assert "hired_employees.csv.gz" in response.headers["Content-Disposition"]
+    rows = list(csv.DictReader(io.StringIO(gzip.decompress(response.get_data()).decode())))
+    assert [int(r["id"]) for r in rows] == [i for i in range(1, 31) if i % 2]
+    assert rows[0] == {"id": "1", "name": "Employee 1", "datetime": "2021-01-02T10:00:00", "department_id": "2",
+                       "job_id": "1", "department": "IT", "job": "Manager"}
+
+def test_export_ndjson_and_invalid_params(client):
+    seed(10)
+
+    lines = gzip.decompress(client.get("/export/hired-employees?format=ndjson").get_data()).decode().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == list(range(1, 11))
+    assert "department" not in json.loads(lines[0])
+
+    assert client.get("/export/hired-employees?format=xml").status_code == 400
+    assert client.get("/export/hired-employees?start_date=yesterday").status_code == 400
+
+def test_export_memory_does_not_grow_with_the_table():
+    seed(20000)
+
+    def peak(filters):
+        session = SessionLocal()
+        tracemalloc.start()
+        try:
+            for _ in gzip_chunks(export_chunks(session, filters, "csv", 1000)):
+                pass
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+            session.close()
+
+    small = peak(ExportFilters(end_date=datetime(2021, 3, 1).date()))
+    large = peak(ExportFilters())
+    # Cerca de diez veces más filas, con el mismo chunk
+    assert large < small * 2
+
+def test_export_task_uploads_gzip_to_blob(tmp_path, monkeypatch):
+    from core.tasks import export_hired_employees_task
+    seed(25)
+    monkeypatch.setattr("core.services.AzureBlobClient", lambda: MockAzureBlobClient(str(tmp_path)))
+    monkeypatch.setattr("core.tasks.db_slot", lambda task: nullcontext())
+    monkeypatch.setattr("core.tasks.EXPORT_CHUNK_ROWS", 10)
+
+    result = export_hired_employees_task.apply(kwargs={"fmt": "csv", "department_id": 1}, task_id="export-1").get()
+
+    assert result == {"blob": "exports/export-1/hired_employees.csv.gz", "format": "csv", "rows": 12}
+    content = gzip.decompress((tmp_path / result["blob"]).read_bytes()).decode().splitlines()
+    assert content[0] == "id,name,datetime,department_id,job_id"
+    assert len(content) == 13
@@ -0,0 +1,131 @@
+import pytest
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.exc import OperationalError
+from core.batching import AdaptiveBatchSize
+from core.services import DataIngestionService
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job, HiredEmployee, HiringStat
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+@pytest.fixture
+def service():
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Job(id=1, job="Engineer")])
+    # Fila insertada por "otro worker" después de la validación del lote
+    session.add(HiredEmployee(id=37, name="Racer", datetime=pd.Timestamp("2021-01-01"), department_id=1, job_id=1))
+    session.commit()
+    session.close()
+
+    svc = DataIngestionService(blob_client=object())
+    svc.batch_sizer = AdaptiveBatchSize(initial=64, minimum=4, maximum=256)
+    return svc
+
+def employee_rows(ids):
+    return [{"id": i, "name": f"Employee {i}", "datetime": pd.Timestamp("2021-02-01").to_pydatetime(),
+             "department_id": 1, "job_id": 1} for i in ids]
+
+def test_adaptive_batch_size_grows_and_halves_within_bounds():
+    sizer = AdaptiveBatchSize(initial=100, minimum=30, maximum=250)
+
+    sizer.success()
+    sizer.success()
+    assert sizer.size == 250
+    sizer.failure()
+    assert sizer.size == 125
+    for _ in range(5):
+        sizer.failure()
+    assert sizer.size == 30
+
+def test_bulk_insert_isolates_the_conflicting_row(service):
+    inserted, existing, errors, error_ids = service._bulk_insert(employee_rows(range(1, 101)), 0, 0, 0, [])
+
+    # El conflicto de clave primaria con la fila del otro worker no es un error
+    assert (inserted, existing, errors, error_ids) == (99, 1, 0, [])
+    session = SessionLocal()
+    assert session.query(HiredEmployee).count() == 100
+    # Las estadísticas de los lotes partidos no se duplican ni se pierden
+    assert session.execute(select(func.sum(HiringStat.hires))).scalar() == 99
+    session.close()
+
+def test_batch_size_shrinks_after_a_failed_chunk(service):
+    service._bulk_insert(employee_rows(range(1, 65)), 0, 0, 0, [])
+    assert service.batch_sizer.size == 32
+
+    service._bulk_insert(employee_rows(range(101, 133)), 0, 0, 0, [])
+    assert service.batch_sizer.size == 96
+
+def test_connection_errors_are_not_bisected(service, monkeypatch):
+    calls = []
+
+    def broken_write(session, chunk):
+        calls.append(len(chunk))
+        raise OperationalError("INSERT", {}, Exception("connection reset"))
+
+    monkeypatch.setattr(service, "_write_bulk_chunk", broken_write)
+    inserted, existing, errors, error_ids = service._bulk_insert(employee_rows(range(1, 11)), 0, 0, 0, [])
+
+    assert calls == [10]
+    assert (inserted, existing, errors, error_ids) == (0, 0, 10, list(range(1, 11)))
+
+def test_orm_batch_isolates_the_conflicting_row(service):
+    batch = [HiredEmployee(**row) for row in employee_rows(range(30, 41))]
+
+    inserted, existing, errors, error_ids = service._commit_batch(batch, 0, 0, 0, [])
+
+    assert (inserted, existing, errors, error_ids) == (10, 1, 0, [])
+
+def test_isolated_row_that_does_not_exist_is_still_an_error(service):
+    rows = employee_rows(range(1, 11))
+    rows[4]["name"] = None  # NOT NULL: falla por la fila, pero no es un conflicto de clave
+
+    inserted, existing, errors, error_ids = service._bulk_insert(rows, 0, 0, 0, [])
+
+    assert (inserted, existing, errors, error_ids) == (9, 0, 1, [5])
+
+def test_orm_batch_without_skip_existing_keeps_existing_rows_as_errors(service):
+    # Sin skip_existing la fila previa no se consultó antes: no es una carrera, es un error como en el camino bulk
+    batch = [HiredEmployee(**row) for row in employee_rows(range(30, 41))]
+
+    inserted, existing, errors, error_ids = service._commit_batch(batch, 0, 0, 0, [], skip_existing=False)
+
+    assert (inserted, existing, errors, error_ids) == (10, 0, 1, [37])
+
+def deadlock():
+    return OperationalError("UPDATE hiring_stats", {}, Exception("40001", "Transaction was deadlocked"))
+
+def test_deadlocked_chunk_is_retried_instead_of_rejected(service, monkeypatch):
+    monkeypatch.setattr("core.services.DB_DEADLOCK_BACKOFF_SECONDS", 0)
+    write = service._write_bulk_chunk
+    calls = []
+
+    def write_once_deadlocked(session, chunk):
+        calls.append(len(chunk))
+        if len(calls) == 1:
+            raise deadlock()
+        write(session, chunk)
+
+    monkeypatch.setattr(service, "_write_bulk_chunk", write_once_deadlocked)
+    inserted, existing, errors, error_ids = service._bulk_insert(employee_rows(range(1, 11)), 0, 0, 0, [])
+
+    assert calls == [10, 10]
+    assert (inserted, existing, errors, error_ids) == (10, 0, 0, [])
+
+def test_persistent_deadlock_gives_up_after_the_retries(service, monkeypatch):
+    monkeypatch.setattr("core.services.DB_DEADLOCK_BACKOFF_SECONDS", 0)
+    monkeypatch.setattr("core.services.DB_DEADLOCK_RETRIES", 2)
+    calls = []
+
+    def always_deadlocked(session, chunk):
+        calls.append(len(chunk))
+        raise deadlock()
+
+    monkeypatch.setattr(service, "_write_bulk_chunk", always_deadlocked)
+    inserted, existing, errors, error_ids = service._bulk_insert(employee_rows(range(1, 11)), 0, 0, 0, [])
+
+    assert calls == [10, 10, 10]
+    assert (inserted, errors) == (0, 10)
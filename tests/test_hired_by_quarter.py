@@ -1,25 +1,35 @@
 import pytest
 from unittest.mock import MagicMock
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job
 
 @pytest.fixture
 def mock_session(monkeypatch):
+    # Los nombres se resuelven con el cache de dimensiones, que lee la base de tests
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="Sales"), Department(id=2, department="IT")])
+    session.add_all([Job(id=1, job="Manager"), Job(id=2, job="Engineer")])
+    session.commit()
+    session.close()
+
+    # La base devuelve las filas ya ordenadas por nombre de departamento y trabajo
     mock_result = [
         MagicMock(_mapping={
-            "department": "Sales",
-            "job": "Manager",
-            "Q1": 1,
-            "Q2": 2,
-            "Q3": 0,
-            "Q4": 0,
-        }),
-        MagicMock(_mapping={
-            "department": "IT",
-            "job": "Engineer",
+            "department_id": 2,
+            "job_id": 2,
             "Q1": 0,
             "Q2": 0,
             "Q3": 1,
             "Q4": 3,
         }),
+        MagicMock(_mapping={
+            "department_id": 1,
+            "job_id": 1,
+            "Q1": 1,
+            "Q2": 2,
+            "Q3": 0,
+            "Q4": 0,
+        }),
     ]
 
     mock_session = MagicMock()
@@ -38,6 +48,8 @@ def test_hired_by_quarter_mock(client, mock_session):
     data = response.get_json()
 
     assert isinstance(data, list)
-    assert data[0]["department"] == "Sales"
-    assert data[0]["Q1"] == 1
-    assert data[1]["Q4"] == 3
+    assert data[0]["department"] == "IT"
+    assert data[0]["job"] == "Engineer"
+    assert data[0]["Q4"] == 3
+    assert data[1]["department"] == "Sales"
+    assert data[1]["Q1"] == 1
@@ -1,17 +1,22 @@
 import pytest
 from unittest.mock import MagicMock
+from infra.db.connection import SessionLocal
+from infra.db.models import Department
 
 @pytest.fixture
 def mock_session(monkeypatch):
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="Sales"), Department(id=2, department="IT")])
+    session.commit()
+    session.close()
+
     mock_result = [
         MagicMock(_mapping={
             "id": 1,
-            "department": "Sales",
             "hired": 25,
         }),
         MagicMock(_mapping={
             "id": 2,
-            "department": "IT",
             "hired": 22,
         }),
     ]
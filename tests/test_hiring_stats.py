@@ -0,0 +1,88 @@
+import pytest
+from unittest.mock import MagicMock
+from core.services import DataIngestionService
+from infra.db.connection import SessionLocal
+from infra.db.hiring_stats import increment_hiring_stats, rebuild_hiring_stats
+from infra.db.models import Department, Job, HiringStat
+
+@pytest.fixture
+def service():
+    svc = DataIngestionService()
+    svc.blob_client = MagicMock()
+    return svc
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+    monkeypatch.setattr("api.routes.SessionLocal", test_SessionLocal)
+
+def _load_sample(service):
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Department(id=2, department="IT"),
+                     Job(id=1, job="Manager"), Job(id=2, job="Engineer")])
+    session.commit()
+    session.close()
+
+    service.blob_client.download_file.return_value = (
+        "1,A,2021-01-10T10:00:00Z,1,1\n"
+        "2,B,2021-02-10T10:00:00Z,1,1\n"
+        "3,C,2021-05-10T10:00:00Z,1,2\n"
+        "4,D,2021-11-10T10:00:00Z,2,2\n"
+        "5,E,2022-01-10T10:00:00Z,2,2\n"
+    ).encode()
+    service.load_employees(limit=2)
+    service.load_employees(start=2, limit=3)
+
+def _stats(session):
+    return sorted((s.year, s.department_id, s.job_id, s.quarter, s.hires) for s in session.query(HiringStat))
+
+def test_incremental_stats_match_rebuild(service):
+    _load_sample(service)
+    session = SessionLocal()
+    incremental = _stats(session)
+
+    rebuild_hiring_stats(session)
+
+    assert incremental == _stats(session)
+    assert (2021, 1, 1, 1, 2) in incremental
+    session.close()
+
+def test_reports_read_aggregate_for_requested_year(client, service):
+    _load_sample(service)
+
+    by_quarter = client.get("/report/hired-by-quarter?year=2021").get_json()
+    assert by_quarter[0] == {"department": "HR", "job": "Engineer", "Q1": 0, "Q2": 1, "Q3": 0, "Q4": 0}
+    assert by_quarter[1] == {"department": "HR", "job": "Manager", "Q1": 2, "Q2": 0, "Q3": 0, "Q4": 0}
+    assert len(by_quarter) == 3
+
+    above = client.get("/report/hiring-above-average?year=2021").get_json()
+    assert above == [{"id": 1, "department": "HR", "hired": 3}]
+
+    assert client.get("/report/hiring-above-average?year=2022").get_json() == []
+
+def test_stats_keys_are_written_in_sorted_order():
+    from datetime import datetime
+    from sqlalchemy import event
+    from tests.conftest import engine
+    session = SessionLocal()
+    session.add(HiringStat(department_id=2, job_id=1, year=2021, quarter=1, hires=1))
+    session.add(HiringStat(department_id=1, job_id=2, year=2021, quarter=1, hires=1))
+    session.commit()
+    written = []
+    listener = lambda conn, cursor, statement, params, context, many: written.append((statement.split()[0], params))
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        # Orden de llegada invertido: las claves se escriben igual ordenadas
+        rows = [{"department_id": d, "job_id": j, "datetime": datetime(2021, m, 1)}
+                for d, j, m in [(2, 2, 1), (2, 1, 1), (1, 2, 1), (1, 1, 4), (1, 1, 1)]]
+        increment_hiring_stats(session, rows)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    session.close()
+
+    # UPDATE: (n, department, job, año, trimestre); INSERT en el orden de la tabla: (año, department, job, trimestre, hires)
+    updates = [tuple(p[1:5]) for kind, params in written if kind == "UPDATE" for p in params]
+    inserts = [(p[1], p[2], p[0], p[3]) for kind, params in written if kind == "INSERT" for p in params]
+    assert updates == [(1, 2, 2021, 1), (2, 1, 2021, 1)]
+    assert inserts == [(1, 1, 2021, 1), (1, 1, 2021, 2), (2, 2, 2021, 1)]
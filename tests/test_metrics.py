@@ -0,0 +1,69 @@
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock
+from prometheus_client import REGISTRY
+from core.services import DataIngestionService
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job
+from main import app
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+    monkeypatch.setattr("api.routes.SessionLocal", test_SessionLocal)
+
+@pytest.fixture
+def service():
+    svc = DataIngestionService()
+    svc.blob_client = MagicMock()
+    return svc
+
+def test_load_employees_records_stage_metrics(service):
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Job(id=1, job="Engineer")])
+    session.commit()
+    session.close()
+
+    df = pd.DataFrame({
+        "id": [1, 2, 3, 4],
+        "name": ["Ana", "Luis", None, "Eva"],
+        "datetime": ["2021-01-01T00:00:00Z"] * 4,
+        "department_id": [1, 1, 1, 9],
+        "job_id": [1, 1, 1, 1],
+    })
+    csv_bytes = df.to_csv(index=False, header=False).encode()
+    service.blob_client.download_file.return_value = csv_bytes
+
+    before = {
+        "inserted": sample("ingestion_rows_inserted_total", table="hired_employees"),
+        "missing": sample("ingestion_rows_rejected_total", table="hired_employees", reason="missing_fields"),
+        "invalid_fk": sample("ingestion_rows_rejected_total", table="hired_employees", reason="invalid_fk"),
+        "bytes": sample("ingestion_blob_download_bytes_sum", blob="hired_employees.csv"),
+        "validations": sample("ingestion_validation_seconds_count", table="hired_employees"),
+        "inserts": sample("ingestion_db_insert_seconds_count", table="hired_employees"),
+    }
+
+    service.load_employees(start=0, limit=10)
+
+    assert sample("ingestion_rows_inserted_total", table="hired_employees") - before["inserted"] == 2
+    assert sample("ingestion_rows_rejected_total", table="hired_employees", reason="missing_fields") - before["missing"] == 1
+    assert sample("ingestion_rows_rejected_total", table="hired_employees", reason="invalid_fk") - before["invalid_fk"] == 1
+    assert sample("ingestion_blob_download_bytes_sum", blob="hired_employees.csv") - before["bytes"] == len(csv_bytes)
+    assert sample("ingestion_validation_seconds_count", table="hired_employees") - before["validations"] == 1
+    assert sample("ingestion_db_insert_seconds_count", table="hired_employees") - before["inserts"] == 1
+
+def test_metrics_endpoint_exposes_request_latency():
+    client = app.test_client()
+    client.get("/report/hiring-above-average")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    body = response.get_data(as_text=True)
+    assert 'http_request_duration_seconds_count{endpoint="/report/hiring-above-average",method="GET",status="200"}' in body
+    assert "ingestion_rows_inserted_total" in body
@@ -0,0 +1,84 @@
+import os
+from contextlib import nullcontext
+import pytest
+from prometheus_client import REGISTRY
+from unittest.mock import MagicMock
+from core.services import DataIngestionService
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job
+from infra.profiling import start_profile, stop_profile
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+    monkeypatch.setattr("api.routes.SessionLocal", test_SessionLocal)
+
+@pytest.fixture
+def on_demand(monkeypatch, tmp_path):
+    monkeypatch.setattr("infra.profiling.PROFILE_ON_DEMAND", True)
+    monkeypatch.setattr("infra.profiling.PROFILE_DIR", str(tmp_path))
+    return tmp_path
+
+def parse_header(value):
+    return dict(item.split("=", 1) for item in value.split("; "))
+
+def test_requested_profile_is_returned_in_a_header(client, on_demand):
+    response = client.get("/report/hiring-above-average?engine=sql", headers={"X-Profile": "1"})
+
+    profile = parse_header(response.headers["X-Profile"])
+    assert int(profile["sql_statements"]) >= 1
+    assert float(profile["wall_ms"]) > 0
+    assert os.path.dirname(profile["file"]) == str(on_demand)
+    assert os.path.exists(profile["file"])
+
+    assert "X-Profile" not in client.get("/report/hiring-above-average?engine=sql").headers
+
+def test_profile_flag_is_ignored_unless_enabled(client, monkeypatch):
+    monkeypatch.setattr("infra.profiling.PROFILE_ON_DEMAND", False)
+    assert "X-Profile" not in client.get("/report/hiring-above-average?profile=1").headers
+
+def test_sampled_requests_are_profiled_without_header(client, monkeypatch):
+    monkeypatch.setattr("infra.profiling.PROFILE_SAMPLE_RATE", 1.0)
+    before = sample("profile_sql_statements_count", target="routes.hired_by_quarter")
+
+    response = client.get("/report/hired-by-quarter?engine=sql")
+
+    assert "X-Profile" not in response.headers
+    assert sample("profile_sql_statements_count", target="routes.hired_by_quarter") == before + 1
+
+def test_repeated_statements_expose_per_row_queries():
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Job(id=1, job="Manager")])
+    session.commit()
+    session.close()
+    service = DataIngestionService()
+    service.blob_client = MagicMock()
+    service.blob_client.download_file.return_value = "".join(
+        f"{i},Employee {i},2021-01-01T10:00:00Z,1,1\n" for i in range(1, 41)).encode()
+
+    by_row = start_profile("by_row")
+    service.load_employees(limit=20, skip_existing=True, bulk=False)
+    by_row = stop_profile(by_row).summary()
+
+    bulk = start_profile("bulk")
+    service.load_employees(start=20, limit=20, skip_existing=True, bulk=True)
+    bulk = stop_profile(bulk).summary()
+
+    assert by_row["most_repeated_sql_count"] >= 20
+    assert bulk["most_repeated_sql_count"] < 5
+    assert bulk["sql_statements"] < by_row["sql_statements"]
+
+def test_task_profile_requested_through_headers(on_demand, monkeypatch, capsys):
+    from core.tasks import rebuild_hiring_stats_task
+    monkeypatch.setattr("core.tasks.db_slot", lambda task: nullcontext())
+
+    rebuild_hiring_stats_task.apply(headers={"profile": True}).get()
+    assert "Profile rebuild_hiring_stats_task[" in capsys.readouterr().out
+    assert any(name.startswith("rebuild_hiring_stats_task-") for name in os.listdir(on_demand))
+
+    rebuild_hiring_stats_task.apply().get()
+    assert "Profile rebuild_hiring_stats_task[" not in capsys.readouterr().out
@@ -0,0 +1,70 @@
+import gzip
+from contextlib import nullcontext
+import pytest
+from core.rejections import RejectionLog, compact_result, expand_ranges, id_ranges, merge_ranges
+from core.services import merge_employee_summaries
+from infra.db.models import Department, Job
+from tests.mocks.blob_client import MockAzureBlobClient
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+def test_id_ranges_round_trip():
+    ids = [7, 1, 2, 3, 10, 11, 2]
+    assert id_ranges(ids) == [[1, 3], [7, 7], [10, 11]]
+    assert expand_ranges(id_ranges(ids)) == [1, 2, 3, 7, 10, 11]
+    assert id_ranges([]) == []
+
+def test_merge_ranges_joins_adjacent_windows():
+    assert merge_ranges([[1, 3], [10, 12]], [[4, 5], [11, 20]]) == [[1, 5], [10, 20]]
+
+def test_compact_result_caps_ranges():
+    summary = {"processed": 100, "errors": 50, "error_ids": list(range(1, 100, 2))}
+
+    result = compact_result(summary, max_ranges=10, rejections="rejections/job/1.csv.gz")
+
+    assert "error_ids" not in result
+    assert result["error_id_ranges"] == [[i, i] for i in range(1, 20, 2)]
+    assert result["error_id_ranges_truncated"] is True
+    assert result["rejections"] == "rejections/job/1.csv.gz"
+    # Al fundir resultados ya truncados la marca se conserva
+    assert compact_result(merge_employee_summaries([result]), max_ranges=10)["error_id_ranges_truncated"] is True
+
+def test_rejection_log_publishes_gzip_csv(tmp_path):
+    log = RejectionLog(spool_bytes=64)
+    log.add([1, 2], ["invalid_fk", "invalid_datetime"])
+    log.add([None], ["missing_fields"])
+
+    name = log.publish(MockAzureBlobClient(str(tmp_path)), "rejections/job/run.csv.gz")
+
+    assert name == "rejections/job/run.csv.gz"
+    content = gzip.decompress((tmp_path / name).read_bytes()).decode()
+    assert content == "id,reason\n1,invalid_fk\n2,invalid_datetime\n,missing_fields\n"
+
+def test_rejection_log_without_rows_uploads_nothing(tmp_path):
+    assert RejectionLog().publish(MockAzureBlobClient(str(tmp_path)), "rejections/job/run.csv.gz") is None
+    assert not (tmp_path / "rejections").exists()
+
+def test_load_employees_task_returns_compact_result(tmp_path, monkeypatch):
+    from tests.conftest import SessionLocal
+    from core.tasks import load_employees_task
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Job(id=1, job="Manager")])
+    session.commit()
+    session.close()
+
+    rows = [f"{i},Employee {i},2021-01-01T10:00:00Z,{1 if i % 10 else 9},1\n" for i in range(1, 41)]
+    (tmp_path / "hired_employees.csv").write_text("".join(rows))
+    monkeypatch.setattr("core.services.AzureBlobClient", lambda: MockAzureBlobClient(str(tmp_path)))
+    monkeypatch.setattr("core.tasks.db_slot", lambda task: nullcontext())
+
+    result = load_employees_task.apply(kwargs={"start": 0, "limit": 40}, task_id="window-1").get()
+
+    assert result["inserted"] == 36 and result["errors"] == 4
+    assert result["error_id_ranges"] == [[10, 10], [20, 20], [30, 30], [40, 40]]
+    assert "error_ids" not in result
+    assert result["rejections"] == "rejections/window-1/window-1.csv.gz"
+    content = gzip.decompress((tmp_path / result["rejections"]).read_bytes()).decode()
+    assert content.splitlines()[1:] == [f"{i},invalid_fk" for i in (10, 20, 30, 40)]
@@ -0,0 +1,52 @@
+import time
+import pytest
+from unittest.mock import MagicMock
+from core.report_cache import report_cache
+
+@pytest.fixture
+def mock_session(monkeypatch):
+    mock_session = MagicMock()
+    mock_session.execute.return_value = [
+        MagicMock(_mapping={"id": 1, "department": "Sales", "hired": 25}),
+    ]
+    monkeypatch.setattr("api.routes.SessionLocal", MagicMock(return_value=mock_session))
+    return mock_session
+
+def test_repeated_report_is_served_from_cache(client, mock_session):
+    first = client.get("/report/hiring-above-average")
+    second = client.get("/report/hiring-above-average")
+
+    assert first.get_json() == second.get_json()
+    assert mock_session.execute.call_count == 1
+    assert first.headers["ETag"] == second.headers["ETag"]
+
+def test_matching_etag_returns_304(client, mock_session):
+    etag = client.get("/report/hiring-above-average").headers["ETag"]
+
+    response = client.get("/report/hiring-above-average", headers={"If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.data == b""
+
+def test_ingestion_bump_invalidates_cache(client, mock_session):
+    etag = client.get("/report/hiring-above-average").headers["ETag"]
+    report_cache.bump_version()
+
+    response = client.get("/report/hiring-above-average", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert mock_session.execute.call_count == 2
+
+def test_local_version_expires_without_redis(client, mock_session, monkeypatch):
+    # Sin Redis una carga hecha por un worker no sube esta versión: expira por tiempo
+    monkeypatch.setattr(report_cache, "redis", None)
+    etag = client.get("/report/hiring-above-average").headers["ETag"]
+    later = time.time() + report_cache.local_ttl
+    monkeypatch.setattr("core.report_cache.time.time", lambda: later)
+
+    response = client.get("/report/hiring-above-average", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert mock_session.execute.call_count == 2
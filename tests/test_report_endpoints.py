@@ -0,0 +1,77 @@
+import json
+import pytest
+from datetime import datetime
+from infra.db.connection import SessionLocal
+from infra.db.hiring_stats import rebuild_hiring_stats
+from infra.db.models import Department, Job, HiredEmployee
+
+@pytest.fixture(autouse=True)
+def seeded(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("api.routes.SessionLocal", test_SessionLocal)
+
+    session = SessionLocal()
+    session.add_all([Department(id=i, department=name) for i, name in [(1, "HR"), (2, "IT"), (3, "Sales")]])
+    session.add_all([Job(id=1, job="Manager"), Job(id=2, job="Engineer")])
+    hires = [(1, 1, 1, "2021-01-15"), (2, 1, 1, "2021-02-15"), (3, 1, 2, "2021-04-15"), (4, 2, 2, "2021-07-15"),
+             (5, 2, 2, "2021-10-15"), (6, 2, 1, "2021-12-15"), (7, 3, 1, "2021-03-15"), (8, 1, 1, "2022-01-15")]
+    session.add_all([HiredEmployee(id=i, name=f"E{i}", datetime=datetime.fromisoformat(d), department_id=dep, job_id=job)
+                     for i, dep, job, d in hires])
+    session.commit()
+    rebuild_hiring_stats(session)
+    session.close()
+
+def test_keyset_pagination_walks_all_rows(client):
+    first = client.get("/report/hired-by-quarter?limit=2").get_json()
+    last = first[-1]
+    second = client.get(f"/report/hired-by-quarter?limit=2&after_department={last['department']}&after_job={last['job']}").get_json()
+
+    everything = client.get("/report/hired-by-quarter").get_json()
+    assert first + second == everything[:4]
+    assert [(r["department"], r["job"]) for r in everything] == [
+        ("HR", "Engineer"), ("HR", "Manager"), ("IT", "Engineer"), ("IT", "Manager"), ("Sales", "Manager")]
+
+def test_keyset_cursor_needs_department_and_job(client):
+    response = client.get("/report/hired-by-quarter?after_department=HR")
+
+    assert response.status_code == 400
+    assert "after_job" in response.get_json()["error"]
+
+def test_filters_and_date_range_match_aggregate(client):
+    by_year = client.get("/report/hired-by-quarter?department_id=2").get_json()
+    by_range = client.get("/report/hired-by-quarter?department_id=2&start_date=2021-01-01&end_date=2022-01-01").get_json()
+
+    assert by_year == by_range
+    assert by_year == [{"department": "IT", "job": "Engineer", "Q1": 0, "Q2": 0, "Q3": 1, "Q4": 1},
+                       {"department": "IT", "job": "Manager", "Q1": 0, "Q2": 0, "Q3": 0, "Q4": 1}]
+
+def test_hiring_above_average_pagination(client):
+    everything = client.get("/report/hiring-above-average").get_json()
+    assert [r["department"] for r in everything] == ["HR", "IT"]
+
+    page = client.get(f"/report/hiring-above-average?after_hired={everything[0]['hired']}&after_id={everything[0]['id']}").get_json()
+    assert page == everything[1:]
+
+def test_ndjson_and_csv_formats(client):
+    ndjson = client.get("/report/hiring-above-average", headers={"Accept": "application/x-ndjson"})
+    assert ndjson.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["department"] for line in ndjson.data.decode().splitlines()] == ["HR", "IT"]
+
+    as_csv = client.get("/report/hiring-above-average", headers={"Accept": "text/csv"})
+    assert as_csv.data.decode().splitlines() == ["id,department,hired", "1,HR,3", "2,IT,3"]
+
+def test_invalid_parameter_returns_400(client):
+    response = client.get("/report/hired-by-quarter?start_date=yesterday")
+    assert response.status_code == 400
+
+def test_hired_by_quarter_pages_in_sql(client):
+    from core.dimension_cache import Dimensions
+    from core.reports import ReportFilters, hired_by_quarter_statement
+
+    dimensions = Dimensions(version=1, departments={1: "HR", 2: "IT"}, jobs={1: "Manager"})
+    sql = str(hired_by_quarter_statement(ReportFilters(limit=2), dimensions, "HR", "Manager"))
+    assert "ORDER BY" in sql and "LIMIT" in sql and "WHERE" in sql
+
+    # Un cursor con un nombre que ya no existe sigue desde el siguiente nombre
+    page = client.get("/report/hired-by-quarter?limit=2&after_department=Finance&after_job=Zzz").get_json()
+    assert [(r["department"], r["job"]) for r in page] == [("HR", "Engineer"), ("HR", "Manager")]
@@ -0,0 +1,87 @@
+import pytest
+from datetime import datetime
+from core.analytics import HiresSnapshot, InMemoryReportEngine, report_engine
+from core.report_cache import report_cache
+from core.reports import ReportFilters
+from infra.db.connection import SessionLocal
+from infra.db.hiring_stats import rebuild_hiring_stats
+from infra.db.models import Department, Job, HiredEmployee
+
+@pytest.fixture(autouse=True)
+def seeded(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("api.routes.SessionLocal", test_SessionLocal)
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+    session = SessionLocal()
+    session.add_all([Department(id=i, department=name) for i, name in [(1, "HR"), (2, "IT"), (3, "Sales")]])
+    session.add_all([Job(id=1, job="Manager"), Job(id=2, job="Engineer")])
+    hires = [(1, 1, 1, "2021-01-15"), (2, 1, 1, "2021-02-15"), (3, 1, 2, "2021-04-15"), (4, 2, 2, "2021-07-15"),
+             (5, 2, 2, "2021-10-15"), (6, 2, 1, "2021-12-15"), (7, 3, 1, "2021-03-15"), (8, 1, 1, "2022-01-15"),
+             (9, 3, 2, "2021-06-30T23:59:59")]
+    session.add_all([HiredEmployee(id=i, name=f"E{i}", datetime=datetime.fromisoformat(d), department_id=dep, job_id=job)
+                     for i, dep, job, d in hires])
+    session.commit()
+    rebuild_hiring_stats(session)
+    session.close()
+
+QUERIES = [
+    "/report/hired-by-quarter",
+    "/report/hired-by-quarter?year=2022",
+    "/report/hired-by-quarter?department_id=2&job_id=2",
+    "/report/hired-by-quarter?limit=2&after_department=HR&after_job=Manager",
+    "/report/hired-by-quarter?start_date=2021-03-01&end_date=2021-07-01",
+    "/report/hiring-above-average",
+    "/report/hiring-above-average?job_id=1",
+    "/report/hiring-above-average?department_id=2&year=2021",
+    "/report/hiring-above-average?after_hired=3&after_id=1",
+    "/report/hiring-above-average?start_date=2021-01-01&limit=1",
+]
+
+@pytest.mark.parametrize("path", QUERIES)
+def test_memory_engine_matches_sql(client, path):
+    separator = "&" if "?" in path else "?"
+    by_sql = client.get(f"{path}{separator}engine=sql")
+    by_memory = client.get(f"{path}{separator}engine=memory")
+
+    assert by_sql.status_code == by_memory.status_code == 200
+    assert by_memory.get_json() == by_sql.get_json()
+
+def test_snapshot_is_extended_with_new_rows(monkeypatch):
+    first = report_engine.snapshot()
+    assert first.rows == 9
+    monkeypatch.setattr(HiresSnapshot, "build", lambda *args: pytest.fail("should only fetch the new rows"))
+
+    session = SessionLocal()
+    session.add(HiredEmployee(id=20, name="E20", datetime=datetime(2021, 5, 1), department_id=3, job_id=1))
+    session.commit()
+    session.close()
+    report_cache.bump_version()
+
+    second = report_engine.snapshot()
+    assert second.rows == 10 and second.max_id == 20
+    assert (second.hired_at[:-1] <= second.hired_at[1:]).all()
+    assert {"department_id": 3, "job_id": 1, "Q1": 1, "Q2": 1, "Q3": 0, "Q4": 0} in \
+        report_engine.hired_by_quarter(ReportFilters(department_id=3))
+
+def test_out_of_order_ids_reload_the_snapshot():
+    report_engine.snapshot()
+
+    session = SessionLocal()
+    session.add(HiredEmployee(id=0, name="E0", datetime=datetime(2021, 8, 1), department_id=1, job_id=2))
+    session.commit()
+    session.close()
+    report_cache.bump_version()
+
+    assert report_engine.snapshot().rows == 10
+
+def test_snapshot_is_built_from_several_fetches():
+    # Tramos de 2 filas: las columnas se arman por tramo y se concatenan
+    snapshot = InMemoryReportEngine(fetch_size=2).snapshot()
+    expected = report_engine.snapshot()
+
+    assert snapshot.rows == 9 and snapshot.max_id == 9
+    assert (snapshot.hired_at == expected.hired_at).all() and (snapshot.cell == expected.cell).all()
+
+def test_unknown_engine_returns_400(client):
+    assert client.get("/report/hired-by-quarter?engine=spark").status_code == 400
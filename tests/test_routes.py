@@ -14,7 +14,7 @@ def service():
 @pytest.fixture(autouse=True)
 def force_sqlite_session(monkeypatch):
     from tests.conftest import SessionLocal as test_SessionLocal
-    monkeypatch.setattr("core.services.SessionLocal", test_SessionLocal)
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
     monkeypatch.setattr("api.routes.SessionLocal", test_SessionLocal)
 
 @pytest.fixture(autouse=True)
@@ -78,18 +78,24 @@ def test_load_employees_success(service):
     session.close()
 
 def test_upload_files_endpoint(client, monkeypatch):
-    # Mock service methods
-    monkeypatch.setattr("api.routes.service.load_departments", lambda: {"processed": 2, "inserted": 2, "already_exists": 0})
-    monkeypatch.setattr("api.routes.service.load_jobs", lambda: {"processed": 2, "inserted": 2, "already_exists": 0})
-    monkeypatch.setattr("api.routes.service.load_employees", lambda start=0, limit=1000, skip_existing=True: {"processed": 2, "inserted": 2, "already_exists": 0, "errors": 0, "error_ids": []})
+    calls = {}
 
-    response = client.post("/upload-files")
-    assert response.status_code == 200
+    def fake_apply_async(kwargs=None, task_id=None):
+        calls.update(kwargs=kwargs, task_id=task_id)
+
+    monkeypatch.setattr("core.tasks.upload_files_task.apply_async", fake_apply_async)
+
+    response = client.post("/upload-files?batch_size=500&mode=delta")
+    assert response.status_code == 202
     data = response.get_json()
 
-    assert data["departments"]["inserted"] == 2
-    assert data["jobs"]["inserted"] == 2
-    assert data["hired_employees"][0]["inserted"] == 2
+    assert data["status"] == "accepted"
+    assert calls == {"kwargs": {"job_id": data["job_id"], "batch_size": 500, "delta": True}, "task_id": data["job_id"]}
+    assert response.headers["Location"] == f"/upload-files/{data['job_id']}"
+
+    progress = client.get(f"/upload-files/{data['job_id']}").get_json()
+    assert progress["status"] == "PENDING"
+    assert progress["rows_done"] == 0
 
 def test_upload_hired_employees_endpoint(client, monkeypatch):
     from uuid import uuid4
@@ -110,14 +116,64 @@ def test_upload_hired_employees_endpoint(client, monkeypatch):
     assert data["status"] == "accepted"
 
 def test_upload_files_with_error(client, monkeypatch):
-    monkeypatch.setattr("api.routes.service.load_departments", lambda: (_ for _ in ()).throw(Exception("departments error")))
-    monkeypatch.setattr("api.routes.service.load_jobs", lambda: {"processed": 2, "inserted": 2, "already_exists": 0})
-    monkeypatch.setattr("api.routes.service.load_employees", lambda **kwargs: {"processed": 1, "inserted": 1, "already_exists": 0, "errors": 0, "error_ids": []})
+    def broker_down(**kwargs):
+        raise ConnectionError("broker unreachable")
+
+    monkeypatch.setattr("core.tasks.upload_files_task.apply_async", broker_down)
 
     response = client.post("/upload-files")
-    assert response.status_code == 200
+    assert response.status_code == 500
     data = response.get_json()
 
-    assert "error" in data["departments"]
-    assert "jobs" in data
-    assert isinstance(data["hired_employees"], list)
+    assert "broker unreachable" in data["error"]
+    progress = client.get(f"/upload-files/{data['job_id']}").get_json()
+    assert progress["status"] == "FAILURE"
+    assert client.get("/upload-files/unknown").status_code == 404
+
+def test_upload_all_hired_employees_endpoint(client, monkeypatch):
+    calls = {}
+
+    class FakeAsyncResult:
+        id = "coordinator-id"
+
+    def fake_delay(**kwargs):
+        calls.update(kwargs)
+        return FakeAsyncResult()
+
+    monkeypatch.setattr("core.tasks.ingest_employees_task.delay", fake_delay)
+
+    response = client.post("/upload-hired-employees/all?window_size=500")
+    assert response.status_code == 202
+    assert response.get_json()["task_id"] == "coordinator-id"
+    assert calls == {"window_size": 500}
+
+def test_task_list_reads_registry_page(client, monkeypatch):
+    calls = {}
+
+    class FakeRegistry:
+        def list(self, status=None, cursor=None, limit=20):
+            calls.update(status=status, cursor=cursor, limit=limit)
+            return [{"id": "t1", "name": "load_employees_task", "status": "SUCCESS",
+                     "enqueued_at": 1700000000.5, "result": {"inserted": 3}}], (1700000000.5, "t1")
+
+    monkeypatch.setattr("api.routes.get_task_registry", lambda: FakeRegistry())
+
+    response = client.get("/task-list?limit=1&cursor=1700000001.0:t9")
+    assert response.status_code == 200
+    assert response.get_json()[0]["result"] == {"inserted": 3}
+    assert response.headers["X-Next-Cursor"] == "1700000000.5:t1"
+    assert calls == {"status": "done", "cursor": (1700000001.0, "t9"), "limit": 1}
+
+    assert client.get("/task-list?cursor=yesterday").status_code == 400
+
+def test_task_cursor_keeps_the_id_for_tied_scores():
+    from infra.broker.task_registry import format_cursor, parse_cursor
+    assert parse_cursor(format_cursor((1700000000.1, "a:b"))) == (1700000000.1, "a:b")
+    # Un cursor con solo el puntaje saltea todas las tareas con ese puntaje, como antes
+    assert parse_cursor("1700000000.5") == (1700000000.5, "")
+    assert parse_cursor(None) is None
+
+def test_task_registry_keeps_only_counts():
+    from infra.broker.task_registry import compact_summary
+    summary = {"processed": 1000, "inserted": 967, "already_exists": 0, "errors": 33, "error_ids": list(range(33))}
+    assert compact_summary(summary) == {"processed": 1000, "inserted": 967, "already_exists": 0, "errors": 33}
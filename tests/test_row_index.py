@@ -0,0 +1,55 @@
+import io
+import pytest
+from core.services import DataIngestionService, CSV_COLUMNS
+from infra.storage.row_index import RowOffsetIndex, RowIndexStore
+from tests.mocks.blob_client import MockAzureBlobClient
+
+FIXTURES = "Documentation/data_challenge_files"
+
+def test_build_counts_rows_with_and_without_trailing_newline():
+    assert RowOffsetIndex.build(io.BytesIO(b"a\nb\nc\n"), "e", stride=2).total_rows == 3
+    index = RowOffsetIndex.build(io.BytesIO(b"a\nb\nc"), "e", stride=2)
+    assert index.total_rows == 3
+    assert index.offsets.tolist() == [0, 4]
+
+@pytest.mark.parametrize("start,limit", [(0, 10), (1, 1000), (999, 1), (1000, 1000), (1990, 50), (2500, 10)])
+def test_ranged_window_matches_full_read(tmp_path, start, limit):
+    service = DataIngestionService()
+    service.blob_client = MockAzureBlobClient(FIXTURES)
+    expected = service._read_csv_from_blob("hired_employees.csv", skiprows=start, nrows=limit)
+
+    service.row_index = RowIndexStore(str(tmp_path), stride=64)
+    window = service._read_window("hired_employees.csv", start, limit)
+
+    assert window["id"].astype(str).tolist() == expected["id"].astype(str).tolist()
+    assert list(window.columns) == CSV_COLUMNS["hired_employees.csv"]
+
+def test_index_is_reused_until_etag_changes(tmp_path):
+    client = MockAzureBlobClient(FIXTURES)
+    store = RowIndexStore(str(tmp_path / "idx"), stride=64)
+
+    first = store.get(client, "jobs.csv")
+    client.get_etag = lambda blob_name: '"changed"'
+    second = store.get(client, "jobs.csv")
+
+    assert first.etag != second.etag
+    assert len(list((tmp_path / "idx").iterdir())) == 1
+    offset, length, skip = second.byte_range(100, 10)
+    assert length < second.size and skip == 100 - 64
+
+def test_concurrent_builds_of_the_same_index_all_succeed(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+    client = MockAzureBlobClient(FIXTURES)
+    index_dir = tmp_path / "idx"
+    # Temporal a medio escribir de otro proceso: no es de otra versión, no se borra
+    RowIndexStore(str(index_dir))
+    in_flight = index_dir / f"{RowIndexStore._prefix('hired_employees.csv')}.in-flight.part"
+    in_flight.write_bytes(b"")
+
+    with ThreadPoolExecutor(8) as pool:
+        indexes = list(pool.map(lambda _: RowIndexStore(str(index_dir), stride=64).get(client, "hired_employees.csv"),
+                                range(32)))
+
+    assert {index.total_rows for index in indexes} == {2000}
+    assert in_flight.exists()
+    assert len([p for p in index_dir.iterdir() if p.name.endswith(".rowidx.npz")]) == 1
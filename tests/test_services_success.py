@@ -14,7 +14,7 @@ def service():
 @pytest.fixture(autouse=True)
 def force_sqlite_session(monkeypatch):
     from tests.conftest import SessionLocal as test_SessionLocal
-    monkeypatch.setattr("core.services.SessionLocal", test_SessionLocal)
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
 
 @pytest.fixture(autouse=True)
 def reset_database():
@@ -75,3 +75,52 @@ def test_load_employees_success(service):
     assert summary["errors"] == 0
     assert summary["already_exists"] == 0
     session.close()
+
+def test_load_employees_bulk_matches_row_path(service):
+    session = SessionLocal()
+    session.add_all([
+        Department(id=1, department="HR"),
+        Job(id=1, job="Manager"),
+        HiredEmployee(id=3, name="Carol", datetime=pd.Timestamp("2021-01-01"), department_id=1, job_id=1)
+    ])
+    session.commit()
+
+    csv_bytes = (
+        "1,Alice,2021-01-01T10:00:00Z,1,1\n"
+        "2,,2021-01-02T12:00:00Z,1,1\n"
+        "3,Carol,2021-01-03T12:00:00Z,1,1\n"
+        "4,Dave,2021-01-04T12:00:00Z,9,1\n"
+        "5,Eve,2021-01-05T12:00:00Z,1,1\n"
+    ).encode()
+    service.blob_client.download_file.return_value = csv_bytes
+
+    bulk_summary = service.load_employees(skip_existing=True, bulk=True)
+    session.query(HiredEmployee).filter(HiredEmployee.id != 3).delete()
+    session.commit()
+    row_summary = service.load_employees(skip_existing=True, bulk=False)
+
+    assert bulk_summary == row_summary
+    assert bulk_summary["inserted"] == 2
+    assert bulk_summary["already_exists"] == 1
+    assert bulk_summary["error_ids"] == [2, 4]
+    session.close()
+
+def test_stream_employees_downloads_once(service):
+    import io
+    session = SessionLocal()
+    session.add_all([
+        Department(id=1, department="HR"),
+        Job(id=1, job="Manager")
+    ])
+    session.commit()
+
+    csv_bytes = "".join(f"{i},Employee {i},2021-01-01T10:00:00Z,1,1\n" for i in range(1, 26)).encode()
+    service.blob_client.download_stream.return_value = io.BytesIO(csv_bytes)
+
+    summaries = list(service.stream_employees(batch_size=10))
+
+    assert [s["processed"] for s in summaries] == [10, 10, 5]
+    assert sum(s["inserted"] for s in summaries) == 25
+    assert service.blob_client.download_stream.call_count == 1
+    assert session.query(HiredEmployee).count() == 25
+    session.close()
@@ -0,0 +1,26 @@
+from benchmarks.synthetic import InMemoryBlobClient, SyntheticSpec, generate_employees, generate_files
+from core.validation import validate_employees
+
+def test_generator_is_deterministic():
+    spec = SyntheticSpec(employees=2000, missing_ratio=0.05, invalid_fk_ratio=0.05, duplicate_ratio=0.05, seed=7)
+
+    assert generate_files(spec) == generate_files(spec)
+    assert generate_files(spec) != generate_files(SyntheticSpec(employees=2000, seed=8))
+
+def test_generator_dirty_ratios():
+    spec = SyntheticSpec(employees=20000, missing_ratio=0.02, invalid_fk_ratio=0.03, duplicate_ratio=0.01)
+    df = generate_employees(spec)
+
+    _, rejected = validate_employees(df, set(range(1, 13)), set(range(1, 184)))
+    counts = rejected["reason"].value_counts()
+
+    assert abs(counts["missing_fields"] / len(df) - 0.02) < 0.005
+    assert abs(counts["invalid_fk"] / len(df) - 0.03 * 0.98) < 0.006
+    assert 0 < counts["duplicate"] / len(df) < 0.011
+
+def test_in_memory_blob_client_serves_ranges():
+    client = InMemoryBlobClient({"jobs.csv": b"1,Job 1\n2,Job 2\n"})
+
+    assert client.download_range("jobs.csv", 8) == b"2,Job 2\n"
+    assert client.download_stream("jobs.csv").read() == b"1,Job 1\n2,Job 2\n"
+    assert client.get_etag("jobs.csv") == InMemoryBlobClient({"jobs.csv": b"1,Job 1\n2,Job 2\n"}).get_etag("jobs.csv")
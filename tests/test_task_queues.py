@@ -0,0 +1,62 @@
+import pytest
+import redis
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+import core.tasks  # noqa: F401  registra las tareas
+from infra.broker.celery_config import celery_app
+from infra.broker.db_slots import db_slot
+from infra.broker.queues import TASK_QUEUES, WORKER_PROFILES, task_annotations, visibility_timeout
+
+class Retry(Exception):
+    pass
+
+def fake_task():
+    return SimpleNamespace(request=SimpleNamespace(id="task-1"), time_limit=120, retry=MagicMock(return_value=Retry()))
+
+def test_every_task_has_a_queue_served_by_a_profile():
+    names = {name for name in celery_app.tasks if not name.startswith("celery.")}
+    assert names == set(TASK_QUEUES)
+
+    served = {queue for profile in WORKER_PROFILES.values() for queue in profile.queues}
+    assert set(TASK_QUEUES.values()) <= served
+    assert celery_app.amqp.router.route({}, "load_employees_task")["queue"].name == "facts"
+
+def test_long_tasks_ack_late_and_outlive_the_visibility_timeout():
+    annotations = task_annotations()
+    assert annotations["load_employees_task"]["acks_late"] is True
+    assert annotations["upload_files_task"]["soft_time_limit"] is None
+    assert visibility_timeout() > max(a["time_limit"] for a in annotations.values())
+
+def test_db_slot_runs_and_releases():
+    slots = MagicMock()
+    slots.acquire.return_value = True
+    task = fake_task()
+
+    with db_slot(task, slots):
+        pass
+
+    slots.acquire.assert_called_once_with("task-1", 120)
+    slots.release.assert_called_once_with("task-1")
+
+def test_db_slot_retries_when_the_limit_is_reached():
+    slots = MagicMock()
+    slots.acquire.return_value = False
+    task = fake_task()
+
+    with pytest.raises(Retry):
+        with db_slot(task, slots):
+            pytest.fail("should not run without a slot")
+
+    assert task.retry.call_args.kwargs["max_retries"] is None
+    slots.release.assert_not_called()
+
+def test_db_slot_runs_without_redis():
+    slots = MagicMock()
+    slots.acquire.side_effect = redis.ConnectionError("down")
+    ran = []
+
+    with db_slot(fake_task(), slots):
+        ran.append(True)
+
+    assert ran == [True]
+    slots.release.assert_not_called()
@@ -0,0 +1,40 @@
+import io
+from unittest.mock import MagicMock
+from core.services import DataIngestionService, plan_windows, merge_employee_summaries
+
+def test_plan_windows_covers_every_row():
+    assert plan_windows(2500, 1000) == [(0, 1000), (1000, 1000), (2000, 500)]
+    assert plan_windows(0, 1000) == []
+
+def test_merge_employee_summaries():
+    merged = merge_employee_summaries([
+        {"processed": 1000, "inserted": 990, "already_exists": 0, "errors": 10, "error_ids": [2, 3]},
+        {"processed": 500, "inserted": 400, "already_exists": 95, "errors": 5, "error_ids": [1001]},
+    ])
+    assert merged == {"windows": 2, "processed": 1500, "inserted": 1390, "already_exists": 95,
+                      "errors": 15, "error_ids": [2, 3, 1001]}
+
+def test_count_rows_without_trailing_newline():
+    service = DataIngestionService()
+    service.blob_client = MagicMock()
+    service.blob_client.download_stream.return_value = io.BytesIO(b"1,a\n2,b\n3,c")
+    assert service.count_rows("hired_employees.csv") == 3
+
+def test_windows_do_not_overlap(monkeypatch):
+    from tests.conftest import SessionLocal
+    from infra.db.models import Department, Job, HiredEmployee
+    monkeypatch.setattr("infra.db.connection.SessionLocal", SessionLocal)
+    session = SessionLocal()
+    session.add_all([Department(id=1, department="HR"), Job(id=1, job="Manager")])
+    session.commit()
+
+    service = DataIngestionService()
+    service.blob_client = MagicMock()
+    service.blob_client.download_file.return_value = "".join(
+        f"{i},Employee {i},2021-01-01T10:00:00Z,1,1\n" for i in range(1, 26)).encode()
+
+    summaries = [service.load_employees(start=start, limit=limit) for start, limit in plan_windows(25, 10)]
+
+    assert merge_employee_summaries(summaries)["inserted"] == 25
+    assert sorted(e.id for e in session.query(HiredEmployee.id)) == list(range(1, 26))
+    session.close()
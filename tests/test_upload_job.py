@@ -0,0 +1,93 @@
+import pytest
+import pandas as pd
+from core.services import DataIngestionService
+from core.upload_job import create_upload_job, get_upload_job, run_upload_job
+from infra.db.connection import SessionLocal
+from infra.db.models import HiredEmployee, IngestionCheckpoint
+from tests.mocks.blob_client import MockAzureBlobClient
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+@pytest.fixture
+def blob_dir(tmp_path):
+    pd.DataFrame({"id": [1, 2], "department": ["HR", "IT"]}).to_csv(tmp_path / "departments.csv", index=False, header=False)
+    pd.DataFrame({"id": [1, 2], "job": ["Manager", "Engineer"]}).to_csv(tmp_path / "jobs.csv", index=False, header=False)
+    pd.DataFrame({
+        "id": range(1, 11),
+        "name": [f"Employee {i}" for i in range(1, 11)],
+        "datetime": ["2021-03-01T10:00:00Z"] * 10,
+        "department_id": [1, 2] * 5,
+        "job_id": [2, 1] * 5,
+    }).to_csv(tmp_path / "hired_employees.csv", index=False, header=False)
+    return tmp_path
+
+@pytest.fixture
+def service(blob_dir):
+    return DataIngestionService(blob_client=MockAzureBlobClient(str(blob_dir)))
+
+def test_run_upload_job_loads_files_in_order(service):
+    job_id = create_upload_job(service)
+
+    summary = run_upload_job(service, job_id, batch_size=4)
+
+    assert summary["departments"]["inserted"] == 2
+    assert summary["jobs"]["inserted"] == 2
+    assert summary["hired_employees"]["inserted"] == 10
+    assert summary["hired_employees"]["windows"] == 3
+
+    progress = get_upload_job(service, job_id)
+    assert progress["status"] == "SUCCESS"
+    assert progress["rows_done"] == progress["total_rows"] == 10
+    assert progress["percent"] == 100.0
+    assert progress["result"]["hired_employees"]["inserted"] == 10
+
+def test_run_upload_job_resumes_from_checkpoint(service, monkeypatch):
+    original = DataIngestionService._load_employees_bulk
+    calls = []
+
+    def crash_on_second_batch(self, batch, *args, **kwargs):
+        calls.append(batch["id"].tolist())
+        if len(calls) == 2:
+            raise RuntimeError("worker lost")
+        return original(self, batch, *args, **kwargs)
+
+    monkeypatch.setattr(DataIngestionService, "_load_employees_bulk", crash_on_second_batch)
+    job_id = create_upload_job(service)
+    with pytest.raises(RuntimeError):
+        run_upload_job(service, job_id, batch_size=4)
+
+    progress = get_upload_job(service, job_id)
+    assert progress["status"] == "FAILURE"
+    assert progress["rows_done"] == 4
+
+    # La reejecución no vuelve a leer las dimensiones ni el primer lote
+    calls.clear()
+    monkeypatch.setattr(DataIngestionService, "_load_employees_bulk", original)
+    monkeypatch.setattr(service, "load_departments", lambda: pytest.fail("departments already loaded"))
+    summary = run_upload_job(service, job_id, batch_size=4)
+
+    assert summary["departments"]["skipped"] is True
+    assert summary["hired_employees"]["processed"] == 6
+    assert summary["hired_employees"]["inserted"] == 6
+
+    session = SessionLocal()
+    assert session.query(HiredEmployee).count() == 10
+    checkpoint = session.get(IngestionCheckpoint, ("hired_employees.csv", service.blob_client.get_etag("hired_employees.csv")))
+    assert checkpoint.completed and checkpoint.rows_done == 10
+    session.close()
+
+    progress = get_upload_job(service, job_id)
+    assert progress["status"] == "SUCCESS"
+    assert progress["rows_done"] == 10
+
+def test_restart_ignores_checkpoints(service):
+    run_upload_job(service, create_upload_job(service), batch_size=5)
+
+    job_id = create_upload_job(service, restart=True)
+    summary = run_upload_job(service, job_id, batch_size=5)
+
+    assert "skipped" not in summary["hired_employees"]
+    assert summary["hired_employees"]["already_exists"] == 10
@@ -0,0 +1,82 @@
+import pytest
+import pandas as pd
+from unittest.mock import MagicMock
+from core.services import DataIngestionService
+from core.validation import validate_employees
+from infra.db.connection import SessionLocal
+from infra.db.models import Department, Job, HiredEmployee
+
+FIXTURE = "Documentation/data_challenge_files/hired_employees.csv"
+
+@pytest.fixture
+def service():
+    svc = DataIngestionService()
+    svc.blob_client = MagicMock()
+    return svc
+
+@pytest.fixture(autouse=True)
+def force_sqlite_session(monkeypatch):
+    from tests.conftest import SessionLocal as test_SessionLocal
+    monkeypatch.setattr("infra.db.connection.SessionLocal", test_SessionLocal)
+
+def _seed_dimensions(departments=range(1, 13), jobs=range(1, 184)):
+    session = SessionLocal()
+    session.add_all([Department(id=i, department=f"Dept {i}") for i in departments])
+    session.add_all([Job(id=i, job=f"Job {i}") for i in jobs])
+    session.commit()
+    session.close()
+
+def test_validate_employees_categorizes_rejections():
+    df = pd.DataFrame({
+        "id": [1, 2, 3, 4, 5, 1],
+        "name": [" Alice ", None, "Carol", "Dave", "Eve", "Alice again"],
+        "datetime": ["2021-01-01T10:00:00Z"] * 6,
+        "department_id": [1, 1, 1, 9, 1, 1],
+        "job_id": [1, 1, 1, 1, 1, 1],
+    })
+
+    clean, rejected = validate_employees(df, {1}, {1}, existing_ids={3})
+
+    assert clean["id"].tolist() == [1, 5]
+    assert clean["name"].tolist() == ["Alice", "Eve"]
+    assert str(clean["datetime"].dt.tz) == "UTC"
+    assert list(zip(rejected["id"], rejected["reason"])) == [
+        (2, "missing_fields"), (3, "exists"), (4, "invalid_fk"), (1, "duplicate")
+    ]
+
+def test_vectorized_path_matches_row_path_on_fixture(service):
+    _seed_dimensions()
+    with open(FIXTURE, "rb") as f:
+        csv_bytes = b"".join(f.readlines()[1:])  # el archivo de ejemplo trae header
+    service.blob_client.download_file.return_value = csv_bytes
+
+    row_summary = service.load_employees(limit=2000, skip_existing=True, bulk=False)
+    row_ids = {e.id for e in SessionLocal().query(HiredEmployee.id).all()}
+
+    session = SessionLocal()
+    session.query(HiredEmployee).delete()
+    session.commit()
+    bulk_summary = service.load_employees(limit=2000, skip_existing=True, bulk=True)
+    bulk_ids = {e.id for e in session.query(HiredEmployee.id).all()}
+    session.close()
+
+    assert bulk_summary == row_summary
+    assert bulk_ids == row_ids
+    assert row_summary["errors"] > 0
+
+def test_dirty_value_in_stream_only_rejects_its_row(tmp_path):
+    from tests.mocks.blob_client import MockAzureBlobClient
+    _seed_dimensions()
+    (tmp_path / "hired_employees.csv").write_text(
+        "1,Alice,2021-01-01T10:00:00Z,1,1\n"
+        "2,Bob,2021-01-01T10:00:00Z,abc,1\n"
+        "3,Carol,2021-01-01T10:00:00Z,1,1\n"
+    )
+    service = DataIngestionService(blob_client=MockAzureBlobClient(str(tmp_path)))
+
+    summaries = list(service.stream_employees(batch_size=10))
+
+    assert [(s["inserted"], s["errors"], s["error_ids"]) for s in summaries] == [(2, 1, [2])]
+    session = SessionLocal()
+    assert sorted(e.id for e in session.query(HiredEmployee.id)) == [1, 3]
+    session.close()